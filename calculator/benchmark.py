@@ -0,0 +1,75 @@
+# benchmark.py
+
+import random
+import sys
+import time
+from pkg.calculator import Calculator
+
+
+def make_expressions(count, terms=8, seed=0):
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        parts = [str(rng.randint(1, 99))]
+        for _ in range(terms - 1):
+            parts.append(rng.choice("+-*/"))
+            parts.append(str(rng.randint(1, 99)))
+        expressions.append(" ".join(parts))
+    return expressions
+
+
+def throughput(calculator, expressions, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for expression in expressions:
+            calculator.evaluate(expression)
+    return rounds * len(expressions) / (time.perf_counter() - started)
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def batch(rows=100000):
+    calculator = Calculator()
+    expressions = make_expressions(rows, terms=4, seed=1)
+    rng = random.Random(2)
+    x = [rng.uniform(-100, 100) for _ in range(rows)]
+    y = [rng.uniform(1, 100) for _ in range(rows)]
+
+    loop = rows / timed(lambda: [calculator.evaluate(expression) for expression in expressions])
+    many = rows / timed(lambda: calculator.evaluate_batch(expressions))
+    substituted = [f"{a} * 3 + {b} / 2" for a, b in zip(x, y)]
+    loop_vector = rows / timed(lambda: [calculator.evaluate(expression) for expression in substituted])
+    vector = rows / timed(lambda: calculator.evaluate_vector("x * 3 + y / 2", {"x": x, "y": y}))
+
+    print(f"\nBatch evaluation, {rows:,} rows")
+    print(f"evaluate() loop, distinct expressions: {loop:12,.0f} rows/s")
+    print(f"evaluate_batch():                      {many:12,.0f} rows/s  ({many / loop:.1f}x)")
+    print(f"evaluate() loop, values substituted:   {loop_vector:12,.0f} rows/s")
+    print(f"evaluate_vector():                     {vector:12,.0f} rows/s  ({vector / loop_vector:.0f}x)")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    expressions = make_expressions(500)
+
+    # Cold: every evaluation tokenizes and compiles
+    cold = throughput(Calculator(cache_size=0), expressions, rounds)
+
+    # Cached: the working set fits the cache, so only the first round compiles
+    calculator = Calculator(cache_size=len(expressions))
+    cached = throughput(calculator, expressions, rounds)
+    info = calculator.cache_info()
+
+    print(f"{len(expressions)} expressions x {rounds} rounds")
+    print(f"cold:   {cold:12,.0f} evaluations/s")
+    print(f"cached: {cached:12,.0f} evaluations/s  ({cached / cold:.1f}x, {info.hits} hits, {info.misses} misses)")
+
+    batch()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,31 @@
 # main.py
 
+import os
 import sys
 from pkg.calculator import Calculator
 from pkg.render import format_json_output
+from pkg.stream import stream_results
+
+# Output buffer for --stream; results are written in large blocks
+STREAM_BUFFER_BYTES = 1 << 20
+
+
+def stream(path):
+    calculator = Calculator()
+    out = open(sys.stdout.fileno(), "w", buffering=STREAM_BUFFER_BYTES, encoding="utf-8", closefd=False)
+    try:
+        if path in (None, "-"):
+            stream_results(calculator, sys.stdin, out)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                stream_results(calculator, f, out)
+        out.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head): send what's left to devnull
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
@@ -10,9 +33,14 @@ def main():
     if len(sys.argv) <= 1:
         print("Calculator App")
         print('Usage: python main.py "<expression>"')
+        print('       python main.py --stream [FILE]   (one expression per line, NDJSON results)')
         print('Example: python main.py "3 + 5"')
         return
 
+    if sys.argv[1] == "--stream":
+        stream(sys.argv[2] if len(sys.argv) > 2 else None)
+        return
+
     expression = " ".join(sys.argv[1:])
     try:
         result = calculator.evaluate(expression)
@@ -26,4 +54,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
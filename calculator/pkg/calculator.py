@@ -1,7 +1,15 @@
 # calculator.py
 
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 class Calculator:
-    def __init__(self):
+    def __init__(self, cache_size=256):
         self.operators = {
             "+": lambda a, b: a + b,
             "-": lambda a, b: a - b,
@@ -14,16 +22,185 @@ class Calculator:
             "*": 2,
             "/": 2,
         }
+        # Compiled programs keyed by normalized expression text, so a repeated
+        # expression skips tokenizing and the shunting-yard entirely
+        self._compile_cached = lru_cache(maxsize=cache_size)(self._compile_normalized)
 
     def evaluate(self, expression):
         if not expression or expression.isspace():
             return None
-        tokens = expression.strip().split()
-        return self._evaluate_infix(tokens)
+        return self.run(self.compile(expression))
+
+    def compile(self, expression, variables=()):
+        """Postfix program for an expression: a tuple of numbers, variable names and operator functions.
+
+        Tokens named in ``variables`` compile to references bound when the program runs.
+        """
+        return self._compile_cached(" ".join(expression.split()), tuple(sorted(variables)))
+
+    def cache_info(self):
+        return self._compile_cached.cache_info()
+
+    def clear_cache(self):
+        self._compile_cached.cache_clear()
+
+    def run(self, program, bindings=None):
+        values = []
+        push = values.append
+        pop = values.pop
+        for step in program:
+            if step.__class__ is float:
+                push(step)
+            elif step.__class__ is str:
+                push(bindings[step])
+            else:
+                b = pop()
+                push(step(pop(), b))
+        return values[0]
+
+    def evaluate_batch(self, expressions):
+        """Evaluate many expressions; returns (values, errors).
+
+        ``errors`` marks rows that are empty, invalid or divide by zero; their
+        value is NaN. With NumPy both are arrays, and rows with the same
+        operators in the same order ("1 + 2 * 3", "4 + 5 * 6") run as one
+        vectorized program over a table of their numbers: one compile per
+        operator sequence, not per row.
+        """
+        if np is None:
+            return self._evaluate_rows(lambda row: self._evaluate_row(expressions[row]), len(expressions))
+
+        values = np.full(len(expressions), np.nan)
+        errors = np.zeros(len(expressions), dtype=bool)
+        # Operator sequence -> (rows, number tokens of each row)
+        groups = {}
+        for row, expression in enumerate(expressions):
+            tokens = expression.split()
+            rows, numbers = groups.setdefault(tuple(tokens[1::2]), ([], []))
+            rows.append(row)
+            numbers.append(tokens[0::2])
+
+        for operators, (rows, numbers) in groups.items():
+            try:
+                table = self._number_table(operators, numbers)
+            except ValueError:
+                table = None
+            if table is None:
+                # Not "number operator number ...": unusual or invalid rows, one at a time
+                for row in rows:
+                    try:
+                        values[row] = self._evaluate_row(expressions[row])
+                    except (ValueError, ZeroDivisionError):
+                        errors[row] = True
+                continue
+
+            slots = [f"_{i}" for i in range(table.shape[1])]
+            template = " ".join(
+                token for pair in zip(slots, operators + ("",)) for token in pair
+            )
+            program = self.compile(template, variables=slots)
+            columns = dict(zip(slots, table.T))
+            result, failed = self._run_arrays(program, columns.__getitem__, len(rows))
+            values[rows] = result
+            errors[rows] = failed
+        return values, errors
+
+    def _number_table(self, operators, numbers):
+        """Rows x slots array of the groups' numbers, or None if the group isn't plain infix."""
+        if not all(operator in self.operators for operator in operators):
+            return None
+        width = len(operators) + 1
+        if any(len(row) != width for row in numbers):
+            return None
+        flat = [token for row in numbers for token in row]
+        return np.fromiter(map(float, flat), dtype=float, count=len(flat)).reshape(len(numbers), width)
+
+    def _evaluate_row(self, expression):
+        value = self.evaluate(expression)
+        if value is None:
+            raise ValueError("empty expression")
+        return value
+
+    def evaluate_vector(self, expression, bindings):
+        """Evaluate one expression over arrays of variable values; returns (values, errors).
+
+        ``bindings`` maps each variable name to a sequence (or a scalar), and
+        row i uses the i-th value of each; length-1 sequences and scalars
+        apply to every row, and any other lengths must match (ValueError
+        otherwise). An invalid expression raises ValueError; rows that
+        divide by zero are marked in ``errors`` (NaN value). As with
+        evaluate_batch, both are arrays with NumPy and lists without it.
+        """
+        program = self.compile(expression, variables=bindings)
+        if np is None:
+            columns = {}
+            scalars = {}
+            for name, value in bindings.items():
+                if hasattr(value, "__len__") and len(value) != 1:
+                    columns[name] = value
+                else:
+                    scalars[name] = float(value[0] if hasattr(value, "__len__") else value)
+            size = self._vector_size(len(value) for value in columns.values())
+            def evaluate_row(row):
+                values = dict(scalars)
+                for name, column in columns.items():
+                    values[name] = float(column[row])
+                return self.run(program, values)
+            return self._evaluate_rows(evaluate_row, size)
+
+        arrays = {name: np.asarray(value, dtype=float) for name, value in bindings.items()}
+        if any(array.ndim > 1 for array in arrays.values()):
+            raise ValueError("bindings must be one-dimensional")
+        size = self._vector_size(len(array) for array in arrays.values() if array.ndim == 1)
+        return self._run_arrays(program, lambda step: arrays[step] if step.__class__ is str else step, size)
 
-    def _evaluate_infix(self, tokens):
+    def _vector_size(self, lengths):
+        """Row count for bindings of these lengths; length 1 applies to every row."""
+        sizes = set(lengths) - {1}
+        if len(sizes) > 1:
+            raise ValueError(f"bindings have mismatched lengths {sorted(sizes)} (must match, or be 1)")
+        return sizes.pop() if sizes else 1
+
+    def _run_arrays(self, program, operand, size):
+        divide = self.operators["/"]
+        errors = np.zeros(size, dtype=bool)
+        values = []
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for step in program:
+                if callable(step):
+                    b = values.pop()
+                    a = values.pop()
+                    if step is divide:
+                        # Rows where Python float division would raise
+                        errors |= b == 0
+                    values.append(step(a, b))
+                else:
+                    values.append(operand(step))
+        result = np.broadcast_to(np.asarray(values[0], dtype=float), (size,)).copy()
+        result[errors] = np.nan
+        return result, errors
+
+    def _evaluate_rows(self, evaluate_row, size):
         values = []
+        errors = []
+        for row in range(size):
+            try:
+                values.append(float(evaluate_row(row)))
+                errors.append(False)
+            except (ValueError, ZeroDivisionError):
+                values.append(float("nan"))
+                errors.append(True)
+        return values, errors
+
+    def _compile_normalized(self, expression, variables):
+        return self._compile_infix(expression.split(), variables)
+
+    def _compile_infix(self, tokens, variables=()):
+        program = []
         operators = []
+        # Operand count the program leaves on the stack so far; checked while
+        # compiling so a program never runs out of operands
+        depth = 0
 
         for token in tokens:
             if token in self.operators:
@@ -32,30 +209,30 @@ class Calculator:
                     and operators[-1] in self.operators
                     and self.precedence[operators[-1]] >= self.precedence[token]
                 ):
-                    self._apply_operator(operators, values)
+                    depth = self._emit_operator(operators, program, depth)
                 operators.append(token)
+            elif token in variables:
+                program.append(token)
+                depth += 1
             else:
                 try:
-                    values.append(float(token))
+                    program.append(float(token))
                 except ValueError:
                     raise ValueError(f"invalid token: {token}")
+                depth += 1
 
         while operators:
-            self._apply_operator(operators, values)
+            depth = self._emit_operator(operators, program, depth)
 
-        if len(values) != 1:
+        if depth != 1:
             raise ValueError("invalid expression")
 
-        return values[0]
-
-    def _apply_operator(self, operators, values):
-        if not operators:
-            return
+        return tuple(program)
 
+    def _emit_operator(self, operators, program, depth):
         operator = operators.pop()
-        if len(values) < 2:
+        if depth < 2:
             raise ValueError(f"not enough operands for operator {operator}")
 
-        b = values.pop()
-        a = values.pop()
-        values.append(self.operators[operator](a, b))
\ No newline at end of file
+        program.append(self.operators[operator])
+        return depth - 1
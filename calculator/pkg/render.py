@@ -3,14 +3,27 @@
 import json
 
 
-def format_json_output(expression: str, result: float, indent: int = 2) -> str:
+_compact = json.JSONEncoder(separators=(",", ":"))
+
+
+def _result_to_dump(result):
     if isinstance(result, float) and result.is_integer():
-        result_to_dump = int(result)
-    else:
-        result_to_dump = result
+        return int(result)
+    return result
+
 
+def format_json_output(expression: str, result: float, indent: int = 2) -> str:
     output_data = {
         "expression": expression,
-        "result": result_to_dump,
+        "result": _result_to_dump(result),
     }
-    return json.dumps(output_data, indent=indent)
\ No newline at end of file
+    return json.dumps(output_data, indent=indent)
+
+
+def format_json_line(expression: str, result: float = None, error: str = None) -> str:
+    output_data = {"expression": expression}
+    if error is None:
+        output_data["result"] = _result_to_dump(result)
+    else:
+        output_data["error"] = error
+    return _compact.encode(output_data) + "\n"
@@ -0,0 +1,40 @@
+# stream.py
+
+from itertools import islice
+from pkg.render import format_json_line
+
+# Lines evaluated (and written) together; bounds memory for any input size
+CHUNK_LINES = 4096
+
+
+def stream_results(calculator, lines, out, chunk_lines=CHUNK_LINES):
+    """Evaluate one expression per line, writing an NDJSON result line for each.
+
+    Blank lines are skipped. Each chunk of lines goes through
+    Calculator.evaluate_batch; only failed rows are evaluated again, one at a
+    time, for their error message. Returns (evaluated, failed) counts.
+    """
+    evaluated = failed = 0
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            return evaluated, failed
+        expressions = [line.strip() for line in chunk]
+        expressions = [expression for expression in expressions if expression]
+        values, errors = calculator.evaluate_batch(expressions)
+
+        output = []
+        for expression, value, error in zip(expressions, values, errors):
+            if not error:
+                output.append(format_json_line(expression, float(value)))
+                continue
+            try:
+                calculator.evaluate(expression)
+                message = "invalid expression"
+            except Exception as e:
+                message = str(e)
+            output.append(format_json_line(expression, error=message))
+            failed += 1
+        out.write("".join(output))
+        evaluated += len(expressions)
@@ -1,7 +1,13 @@
 # tests.py
 
+import io
+import json
+import math
 import unittest
+from unittest import mock
+import pkg.calculator
 from pkg.calculator import Calculator
+from pkg.stream import stream_results
 
 
 class TestCalculator(unittest.TestCase):
@@ -44,6 +50,82 @@ class TestCalculator(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.calculator.evaluate("+ 3")
 
+    def test_repeated_expression_uses_compiled_program(self):
+        self.assertEqual(self.calculator.evaluate("2 * 3 + 4"), 10)
+        self.assertEqual(self.calculator.evaluate("  2 *  3 + 4 "), 10)
+        info = self.calculator.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_compiled_program_is_postfix(self):
+        program = self.calculator.compile("3 + 4 * 2")
+        self.assertEqual(program[:3], (3.0, 4.0, 2.0))
+        self.assertEqual(self.calculator.run(program), 11)
+
+    def test_invalid_expression_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.calculator.evaluate("3 $ 5")
+        self.assertEqual(self.calculator.cache_info().currsize, 0)
+
+    def test_evaluate_batch(self):
+        values, errors = self.calculator.evaluate_batch(["1 + 2", "3 + 4 * 2", "1 / 0", "", "2 $ 3", "10 / 4"])
+        self.assertEqual(list(errors), [False, False, True, True, True, False])
+        self.assertEqual(values[0], 3)
+        self.assertEqual(values[1], 11)
+        self.assertEqual(values[5], 2.5)
+        self.assertTrue(math.isnan(values[2]))
+
+    def test_evaluate_vector(self):
+        values, errors = self.calculator.evaluate_vector("x * 2 + y / z", {"x": [1, 2, 3], "y": [4, 5, 6], "z": [1, 0, 2]})
+        self.assertEqual(list(errors), [False, True, False])
+        self.assertEqual(values[0], 6)
+        self.assertEqual(values[2], 9)
+
+    def test_evaluate_vector_invalid_expression(self):
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate_vector("x + w", {"x": [1, 2]})
+
+    def test_evaluate_vector_without_numpy(self):
+        # The pure-Python fallback broadcasts and validates like the NumPy path
+        for numpy in (pkg.calculator.np, None):
+            with self.subTest(numpy=numpy is not None), mock.patch.object(pkg.calculator, "np", numpy):
+                values, errors = self.calculator.evaluate_vector("x / y", {"x": [1, 2, 3], "y": [1]})
+                self.assertEqual(list(values), [1, 2, 3])
+                values, errors = self.calculator.evaluate_vector("x / y + z", {"x": [1, 2], "y": [0, 4], "z": 1})
+                self.assertEqual(list(errors), [True, False])
+                self.assertEqual(values[1], 1.5)
+                with self.assertRaisesRegex(ValueError, "mismatched lengths"):
+                    self.calculator.evaluate_vector("x + y", {"x": [1, 2, 3], "y": [1, 2]})
+
+    def test_cache_disabled(self):
+        calculator = Calculator(cache_size=0)
+        self.assertEqual(calculator.evaluate("1 + 1"), 2)
+        self.assertEqual(calculator.evaluate("1 + 1"), 2)
+        self.assertEqual(calculator.cache_info().hits, 0)
+
+
+class TestStream(unittest.TestCase):
+    def test_stream_results(self):
+        out = io.StringIO()
+        lines = ["3 + 5\n", "\n", "10 / 4\n", "1 / 0\n", "2 $ 3\n"]
+        counts = stream_results(Calculator(), lines, out, chunk_lines=2)
+        self.assertEqual(counts, (4, 2))
+        self.assertEqual(
+            [json.loads(line) for line in out.getvalue().splitlines()],
+            [
+                {"expression": "3 + 5", "result": 8},
+                {"expression": "10 / 4", "result": 2.5},
+                {"expression": "1 / 0", "error": "float division by zero"},
+                {"expression": "2 $ 3", "error": "invalid token: $"},
+            ],
+        )
+
+    def test_stream_output_is_compact(self):
+        out = io.StringIO()
+        stream_results(Calculator(), ["1 + 1"], out)
+        self.assertEqual(out.getvalue(), '{"expression":"1 + 1","result":2}\n')
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Batch Runner for CodeAgent
+==========================
+Runs a queue of tasks from a JSONL file concurrently, each in its own
+working directory, and writes one structured result record per task.
+
+Each task line needs a prompt, given as "prompt", "task", or "title" + "body"
+(so a requests.jsonl backlog works as-is). An id is taken from "request_id"
+or "id", and "working_directory" overrides the per-task directory.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+
+console = Console()
+
+
+@dataclass
+class BatchTask:
+    """One task from the queue."""
+    task_id: str
+    prompt: str
+    working_directory: str
+
+
+# =============================================================================
+# TASK LOADING
+# =============================================================================
+
+def load_tasks(path: str, workdir_root: str) -> List[BatchTask]:
+    """Read tasks from a JSONL file."""
+    tasks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            data = json.loads(line)
+            task_id = str(data.get("request_id") or data.get("id") or f"task-{line_no}")
+            prompt = data.get("prompt") or data.get("task") or "\n\n".join(
+                p for p in [data.get("title"), data.get("body")] if p
+            )
+            if not prompt:
+                raise ValueError(f"{path}:{line_no}: task has no prompt")
+
+            working_directory = data.get("working_directory") or os.path.join(
+                workdir_root, re.sub(r"[^A-Za-z0-9_.-]", "_", task_id)
+            )
+            tasks.append(BatchTask(task_id, prompt, os.path.abspath(working_directory)))
+    return tasks
+
+
+def prepare_working_directory(task: BatchTask, template: Optional[str] = None):
+    """Create a task's working directory, seeding it from a template if empty."""
+    os.makedirs(task.working_directory, exist_ok=True)
+    if template and not os.listdir(task.working_directory):
+        shutil.copytree(
+            template,
+            task.working_directory,
+            dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns(".git", "__pycache__", ".venv", "venv"),
+        )
+
+
+# =============================================================================
+# CONCURRENCY
+# =============================================================================
+
+class BoundedProvider:
+    """Wraps a provider so at most ``max_inflight`` model requests run at once."""
+
+    def __init__(self, provider: Any, max_inflight: int):
+        self.provider = provider
+        self._semaphore = threading.BoundedSemaphore(max_inflight)
+
+    def generate_content(self, *args, **kwargs) -> Any:
+        with self._semaphore:
+            return self.provider.generate_content(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+
+class ResultWriter:
+    """Thread-safe JSONL writer for per-task result records."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+def run_batch(
+    tasks: List[BatchTask],
+    run_task: Callable[[BatchTask], Dict[str, Any]],
+    concurrency: int,
+    output_path: str,
+    template: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run tasks on a thread pool and write a result record as each finishes.
+
+    Args:
+        tasks: Tasks to run
+        run_task: Runs one task in its working directory, returns a summary dict
+        concurrency: Number of tasks running at once
+        output_path: JSONL file receiving one record per task
+        template: Optional directory copied into each empty working directory
+
+    Returns:
+        Batch summary with counts, elapsed time and throughput
+    """
+    writer = ResultWriter(output_path)
+    counts = {"completed": 0, "incomplete": 0, "error": 0}
+
+    def execute(task: BatchTask) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record = {"task_id": task.task_id, "working_directory": task.working_directory}
+        try:
+            prepare_working_directory(task, template)
+            record.update(run_task(task))
+        except Exception as e:
+            record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    console.print(f"[bold cyan]Running {len(tasks)} task(s), {concurrency} at a time[/bold cyan]\n")
+    batch_started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="gent-task") as executor:
+        futures = {executor.submit(execute, task): task for task in tasks}
+        for future in as_completed(futures):
+            record = future.result()
+            writer.write(record)
+
+            status = record.get("status", "error")
+            counts[status] = counts.get(status, 0) + 1
+            style = {"completed": "green", "incomplete": "yellow"}.get(status, "red")
+            console.print(
+                f"[{style}]■ {record['task_id']}: {status} "
+                f"({record['elapsed_seconds']:.1f}s)[/{style}]"
+            )
+
+    elapsed = time.perf_counter() - batch_started
+    summary = {
+        "tasks": len(tasks),
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "tasks_per_hour": round(len(tasks) / elapsed * 3600, 2) if elapsed > 0 else 0.0,
+    }
+
+    console.print(f"\n[bold]Batch Summary:[/bold]")
+    console.print(f"  • Tasks: {summary['tasks']}")
+    console.print(f"  • Completed: {summary['completed']}")
+    console.print(f"  • Incomplete: {summary['incomplete']}")
+    console.print(f"  • Errors: {summary['error']}")
+    console.print(f"  • Wall time: {elapsed:.1f}s")
+    console.print(f"  • Throughput: {summary['tasks_per_hour']:.1f} tasks/hour")
+    console.print(f"  • Results: {output_path}")
+    return summary
+
+
+def parse_batch_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the options of ``codeagent --batch``."""
+    parser = argparse.ArgumentParser(prog="codeagent --batch", description="Run a queue of tasks concurrently.")
+    parser.add_argument("--batch", dest="tasks_file", required=True, help="JSONL file of tasks")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tasks running at once (default: 4)")
+    parser.add_argument("--max-inflight", type=int, default=None,
+                        help="Model requests in flight at once (default: same as --concurrency)")
+    parser.add_argument("--workdir-root", default="gent-batch", help="Parent of per-task working directories")
+    parser.add_argument("--template", default=None, help="Directory copied into each new working directory")
+    parser.add_argument("--output", default=None, help="Result JSONL file (default: <workdir-root>/results.jsonl)")
+    parser.add_argument("--verbose", action="store_true")
+    options = parser.parse_args(argv)
+
+    if options.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if options.max_inflight is None:
+        options.max_inflight = options.concurrency
+    if options.max_inflight < 1:
+        parser.error("--max-inflight must be at least 1")
+    if options.output is None:
+        options.output = os.path.join(options.workdir_root, "results.jsonl")
+    return options
@@ -0,0 +1,314 @@
+"""
+Offline Benchmark for the Agent Loop
+====================================
+Replays recorded cassettes (see codeagent/replay.py) through
+process_request with no network access and reports, per cassette:
+
+- wall time of the whole task
+- tool time (native function execution)
+- conversion time (request building + response conversion)
+- loop overhead (wall time minus tool and replayed model time)
+- peak Python memory (tracemalloc)
+
+Each run happens in a fresh copy of the cassette's fixture directory. The
+bundled cassettes use a frozen copy of the calculator in
+``benchmarks/fixtures/``, so changes to ``calculator/`` itself don't
+invalidate them. Results can be saved as JSON and compared with a
+baseline, exiting non-zero on a regression, so loop overhead can be
+checked in CI.
+
+Usage:
+    python -m codeagent.benchmark                      # all bundled cassettes
+    python -m codeagent.benchmark my.jsonl --repeat 10
+    python -m codeagent.benchmark --output bench.json --baseline base.json
+    python -m codeagent.benchmark --rerecord           # regenerate bundled cassettes
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from codeagent.replay import RecordingProvider, ReplayProvider
+from codeagent.tracing import get_tracer, start_tracing
+
+console = Console()
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASSETTE_DIR = os.path.join(REPO_ROOT, "benchmarks", "cassettes")
+
+# Differences below this many seconds are never reported as regressions
+NOISE_FLOOR_SECONDS = 0.005
+
+
+# =============================================================================
+# SCRIPTED TASKS
+# =============================================================================
+# Model turns for the bundled cassettes. They are recorded through the real
+# OpenRouterProvider against FakeOpenAIServer, so the cassettes hold genuine
+# request fingerprints; re-record them (--rerecord) after changing the
+# system prompt, tool schemas or request format.
+
+SCRIPTED_TASKS: Dict[str, Dict[str, Any]] = {
+    "calculator_run_tests": {
+        "task": "Run the calculator test suite and report any failures.",
+        "fixture": "benchmarks/fixtures/calculator",
+        "script": [
+            {"tool_calls": [{"name": "get_files_info", "arguments": {"directory": "."}}]},
+            {"tool_calls": [{"name": "get_file_content", "arguments": {"file_path": "tests.py"}}]},
+            {"tool_calls": [
+                {"name": "get_files_info", "arguments": {"directory": "pkg"}},
+                {"name": "get_file_content", "arguments": {"file_path": "pkg/calculator.py"}},
+            ]},
+            {"tool_calls": [{"name": "run_python_file", "arguments": {"file_path": "tests.py"}}]},
+            {"content": "All calculator tests pass; no failures to report."},
+        ],
+    },
+    "calculator_write_readme": {
+        "task": "Document the calculator CLI in a README.md and check the usage example works.",
+        "fixture": "benchmarks/fixtures/calculator",
+        "script": [
+            {"tool_calls": [{"name": "get_files_info", "arguments": {"directory": "."}}]},
+            {"tool_calls": [{"name": "get_file_content", "arguments": {"file_path": "main.py"}}]},
+            {"tool_calls": [{"name": "run_python_file", "arguments": {"file_path": "main.py", "args": ["3 + 5"]}}]},
+            {"tool_calls": [{"name": "write_file", "arguments": {
+                "file_path": "README.md",
+                "content": (
+                    "# Calculator\n\n"
+                    "Evaluates infix arithmetic (`+ - * /`, standard precedence) and prints JSON.\n\n"
+                    "```bash\npython main.py \"3 + 5\"\n```\n\n"
+                    "Run the tests with `python tests.py`.\n"
+                ),
+            }}]},
+            {"tool_calls": [{"name": "get_file_content", "arguments": {"file_path": "README.md"}}]},
+            {"content": "Added README.md describing usage; `python main.py \"3 + 5\"` prints the JSON result."},
+        ],
+    },
+}
+
+
+def _quiet_console() -> Console:
+    """Console that still renders everything, into memory."""
+    return Console(file=io.StringIO(), width=120, force_terminal=True)
+
+
+def _prepare_fixture(fixture: Optional[str], destination: str):
+    if fixture:
+        source = fixture if os.path.isabs(fixture) else os.path.join(REPO_ROOT, fixture)
+        shutil.copytree(
+            source,
+            destination,
+            dirs_exist_ok=True,
+            ignore=shutil.ignore_patterns("__pycache__", ".git"),
+        )
+
+
+def _run_task(provider: Any, task: str, working_directory: str) -> Dict[str, Any]:
+    """process_request with output rendered off-screen, sessions and model stats off."""
+    from codeagent import main as agent
+
+    saved = agent.console, agent.SESSIONS_ENABLED, agent.MODEL_STATS_ENABLED
+    agent.console, agent.SESSIONS_ENABLED, agent.MODEL_STATS_ENABLED = _quiet_console(), False, False
+    try:
+        return agent.process_request(provider, task, working_directory)
+    finally:
+        agent.console, agent.SESSIONS_ENABLED, agent.MODEL_STATS_ENABLED = saved
+
+
+def record_scripted(name: str, path: str):
+    """Record one of SCRIPTED_TASKS to a cassette via the fake server."""
+    from codeagent.model_provider import OpenRouterProvider
+    # The scripted server is test tooling; it lives in the checkout's tests/
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from tests.fake_openai import FakeOpenAIServer
+
+    spec = SCRIPTED_TASKS[name]
+    with FakeOpenAIServer(spec["script"]) as server, tempfile.TemporaryDirectory() as workdir:
+        _prepare_fixture(spec["fixture"], workdir)
+        provider = OpenRouterProvider("benchmark", "scripted/model", base_url=server.url)
+        recorder = RecordingProvider(provider, path, name=name, task=spec["task"], fixture=spec["fixture"])
+        _run_task(recorder, spec["task"], workdir)
+    console.print(f"[green]✓ Recorded {name} ({len(recorder.cassette.interactions)} calls) → {path}[/green]")
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_cassette(path: str, repeat: int = 5, fixture: Optional[str] = None) -> Dict[str, Any]:
+    """Replay a cassette ``repeat`` times; return median timings and peak memory.
+
+    One unmeasured warm-up run comes first, so lazy imports (pygments
+    lexers, the agent module itself) don't count against the first run.
+    """
+    tracer = get_tracer()
+    runs = []
+
+    for run in range(repeat + 1):
+        provider = ReplayProvider.load(path)
+        meta = provider.cassette.meta
+        task = meta.get("task") or "Replay recorded task"
+
+        with tempfile.TemporaryDirectory() as workdir:
+            _prepare_fixture(fixture or meta.get("fixture"), workdir)
+
+            tracer.reset()
+            start_tracing()
+            tracemalloc.start()
+            started = time.perf_counter()
+            try:
+                result = _run_task(provider, task, workdir)
+            finally:
+                wall = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                tracer.stop()
+
+        if run == 0:
+            continue
+
+        spans: Dict[str, float] = {}
+        for event in tracer.events:
+            if event.get("ph") == "X":
+                spans[event["name"]] = spans.get(event["name"], 0.0) + event["dur"] / 1e6
+
+        tool = result.get("tool_seconds") or 0.0
+        model = result.get("model_seconds") or 0.0
+        runs.append({
+            "wall_s": wall,
+            "tool_s": tool,
+            "model_s": model,
+            "conversion_s": spans.get("convert_request", 0.0) + spans.get("convert_response", 0.0),
+            "render_s": spans.get("render_diff", 0.0) + spans.get("render_result", 0.0),
+            "overhead_s": max(0.0, wall - tool - model),
+            "peak_memory_kb": peak / 1024,
+            "status": "exhausted" if provider.exhausted else result.get("status"),
+            "iterations": result.get("iterations"),
+            "mismatches": len(provider.mismatches),
+        })
+
+    def median(key):
+        return round(statistics.median(r[key] for r in runs), 6)
+
+    return {
+        "cassette": os.path.basename(path),
+        "runs": repeat,
+        "status": runs[-1]["status"],
+        "iterations": runs[-1]["iterations"],
+        "mismatches": max(r["mismatches"] for r in runs),
+        "wall_s": median("wall_s"),
+        "tool_s": median("tool_s"),
+        "conversion_s": median("conversion_s"),
+        "render_s": median("render_s"),
+        "overhead_s": median("overhead_s"),
+        "peak_memory_kb": round(median("peak_memory_kb"), 1),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Describe every overhead or memory regression beyond ``max_regression``."""
+    previous = {r["cassette"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result["cassette"])
+        if not before:
+            continue
+        for key, floor in (("overhead_s", NOISE_FLOOR_SECONDS), ("peak_memory_kb", 64.0)):
+            limit = before[key] * (1 + max_regression)
+            if result[key] > limit and result[key] - before[key] > floor:
+                regressions.append(
+                    f"{result['cassette']}: {key} {before[key]:.4g} → {result[key]:.4g} "
+                    f"(+{(result[key] / before[key] - 1) * 100 if before[key] else 100:.0f}%)"
+                )
+    return regressions
+
+
+def render_results(results: List[Dict[str, Any]]):
+    table = Table(title="Agent loop benchmark (median of runs)", show_header=True, header_style="bold magenta")
+    table.add_column("Cassette", style="cyan", no_wrap=True)
+    table.add_column("Status")
+    table.add_column("Iter", justify="right")
+    table.add_column("Wall", justify="right")
+    table.add_column("Tools", justify="right")
+    table.add_column("Conversion", justify="right")
+    table.add_column("Rendering", justify="right")
+    table.add_column("Overhead", justify="right", style="bold")
+    table.add_column("Peak mem", justify="right")
+    table.add_column("Mismatch", justify="right")
+
+    for r in results:
+        style = "green" if r["status"] == "completed" and not r["mismatches"] else "yellow"
+        table.add_row(
+            r["cassette"],
+            f"[{style}]{r['status']}[/{style}]",
+            str(r["iterations"]),
+            f"{r['wall_s'] * 1000:.1f}ms",
+            f"{r['tool_s'] * 1000:.1f}ms",
+            f"{r['conversion_s'] * 1000:.2f}ms",
+            f"{r['render_s'] * 1000:.1f}ms",
+            f"{r['overhead_s'] * 1000:.1f}ms",
+            f"{r['peak_memory_kb']:.0f}KB",
+            str(r["mismatches"]),
+        )
+    console.print(table)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m codeagent.benchmark", description="Replay cassettes and time the agent loop.")
+    parser.add_argument("cassettes", nargs="*", help=f"Cassette files (default: {CASSETTE_DIR}/*.jsonl)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per cassette (default: 5)")
+    parser.add_argument("--fixture", default=None, help="Directory copied into each run (overrides the cassette's)")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative increase in overhead/memory (default: 0.25)")
+    parser.add_argument("--rerecord", action="store_true", help="Regenerate the bundled scripted cassettes")
+    options = parser.parse_args(argv)
+
+    if options.rerecord:
+        for name in SCRIPTED_TASKS:
+            record_scripted(name, os.path.join(CASSETTE_DIR, f"{name}.jsonl"))
+
+    paths = options.cassettes or sorted(glob.glob(os.path.join(CASSETTE_DIR, "*.jsonl")))
+    if not paths:
+        console.print("[red]No cassettes found[/red]")
+        return 1
+
+    results = [run_cassette(path, options.repeat, options.fixture) for path in paths]
+    render_results(results)
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        console.print(f"[dim]Results written to {options.output}[/dim]")
+
+    failed = [r["cassette"] for r in results if r["status"] != "completed" or r["mismatches"]]
+    for name in failed:
+        console.print(f"[yellow]⚠ {name} did not replay cleanly (re-record it?)[/yellow]")
+
+    if options.baseline:
+        with open(options.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), options.max_regression)
+        for line in regressions:
+            console.print(f"[red]✗ Regression: {line}[/red]")
+        if regressions:
+            return 1
+        console.print("[green]✓ No regressions against baseline[/green]")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Blob Store for CodeAgent
+========================
+Side store for tool output too large to keep in the conversation. Payloads
+are content-addressed files under GENT_HOME/blobs, so identical outputs
+share one blob and handles stay valid across resumed sessions. Blobs older
+than GENT_BLOB_MAX_AGE_DAYS are pruned when the store is first opened.
+
+Text blobs are stored as <handle>.txt; binary ones (images and other
+non-text MCP content) keep an extension matching their media type, so the
+file can be opened or passed to other tools as is.
+"""
+
+import glob
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from codeagent.config import BLOB_DIR, BLOB_MAX_AGE_DAYS
+
+_HANDLE = re.compile(r"^[0-9a-f]{16}$")
+
+
+class BlobStore:
+    """Content-addressed text blobs on disk, referenced by 16-hex-digit handles."""
+
+    def __init__(self, directory: str = BLOB_DIR, max_age_days: float = BLOB_MAX_AGE_DAYS):
+        self.directory = directory
+        self.max_age_days = max_age_days
+        self._pruned = False
+        self._lock = threading.Lock()
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.txt")
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its handle."""
+        return self.put_bytes(text.encode("utf-8"), ".txt")
+
+    def put_bytes(self, data: bytes, suffix: str = ".bin") -> str:
+        """Store binary ``data`` as <handle><suffix> and return its handle."""
+        handle = hashlib.sha256(data).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{handle}{suffix}")
+        with self._lock:
+            if not self._pruned:
+                self._pruned = True
+                self.prune()
+            if not os.path.exists(path):
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            else:
+                # Refresh so blobs still in use are not pruned
+                os.utime(path)
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        """Text for ``handle``, or None if it is unknown (or not a handle)."""
+        if not _HANDLE.match(handle or ""):
+            return None
+        try:
+            with open(self._path(handle), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def locate(self, handle: str) -> Optional[str]:
+        """Path of the blob for ``handle`` (text or binary), or None."""
+        if not _HANDLE.match(handle or ""):
+            return None
+        matches = glob.glob(os.path.join(self.directory, f"{handle}.*"))
+        matches = [path for path in matches if not path.endswith(".tmp")]
+        return matches[0] if matches else None
+
+    def prune(self):
+        """Remove blobs not written or reused within ``max_age_days``."""
+        cutoff = time.time() - self.max_age_days * 86400
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def suffix_for(mime_type: Optional[str]) -> str:
+    """File extension for a media type (".bin" if unknown)."""
+    if mime_type == "image/jpeg":
+        return ".jpg"  # guess_extension may give .jpe
+    return (mimetypes.guess_extension(mime_type or "") or ".bin") if mime_type else ".bin"
+
+
+_blob_store = BlobStore()
+
+
+def get_blob_store() -> BlobStore:
+    return _blob_store
@@ -0,0 +1,152 @@
+"""
+Thin CLI Client for CodeAgent
+=============================
+Entry point of the `codeagent` command. When a daemon (`codeagent --daemon`)
+is listening, one-shot tasks are sent to it over its Unix socket and the
+output streamed back; this module imports only the standard library (not
+even codeagent.config, which loads .env), so that path starts in
+milliseconds. The daemon settings it needs (GENT_DAEMON_SOCKET, GENT_HOME,
+GENT_NO_DAEMON) are therefore read from the environment only. Anything the daemon doesn't handle
+(interactive mode, batch, replay/record, tracing, other flags), or no
+running daemon, falls back to running the agent in-process.
+
+  codeagent --daemon-status   show whether a daemon is running
+  codeagent --daemon-stop     stop it
+  codeagent --mcp-server      serve Gent's tools over MCP (codeagent.mcp_server)
+"""
+
+import json
+import os
+import re
+import shutil
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+# Same defaults as codeagent.config
+DAEMON_SOCKET = os.getenv(
+    "GENT_DAEMON_SOCKET",
+    os.path.join(os.getenv("GENT_HOME", os.path.join(os.path.expanduser("~"), ".gent")), "daemon.sock"),
+)
+DAEMON_DISABLED = os.getenv("GENT_NO_DAEMON", "").lower() in ["true", "1", "yes"]
+
+# Flags the daemon accepts; any other flag means running in-process
+FORWARDED_FLAGS = {"--verbose", "--resume"}
+
+
+def _connect(timeout: Optional[float] = None) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(DAEMON_SOCKET)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(message: Dict[str, Any], timeout: Optional[float] = 5) -> Optional[Dict[str, Any]]:
+    """One request/response exchange with the daemon (None if none is running)."""
+    sock = _connect(timeout)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(message) + "\n").encode("utf-8"))
+        f.flush()
+        line = f.readline()
+    return json.loads(line) if line else None
+
+
+def build_task(args: List[str]) -> Optional[Dict[str, Any]]:
+    """Daemon task request for these CLI args, or None if they need the in-process agent."""
+    args = list(args)
+    if not args or any(a.startswith("--") and a not in FORWARDED_FLAGS for a in args):
+        return None
+
+    resume = None
+    if "--resume" in args:
+        idx = args.index("--resume")
+        args.pop(idx)
+        resume = "latest"
+        if idx < len(args) and re.fullmatch(r"\d{8}-\d{6}-[0-9a-f]{6}|latest", args[idx]):
+            resume = args.pop(idx)
+
+    verbose = "--verbose" in args
+    prompt = " ".join(a for a in args if a != "--verbose").strip()
+    if not prompt and not resume:
+        return None
+    return {
+        "type": "task",
+        "prompt": prompt,
+        "cwd": os.getcwd(),
+        "verbose": verbose,
+        "resume": resume,
+        "color": sys.stdout.isatty(),
+        "width": shutil.get_terminal_size().columns,
+    }
+
+
+def run_remote(task: Dict[str, Any]) -> Optional[int]:
+    """Run ``task`` on the daemon, streaming its output; None if no daemon is running."""
+    sock = _connect()
+    if sock is None:
+        return None
+
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(task) + "\n").encode("utf-8"))
+        f.flush()
+        try:
+            for line in f:
+                message = json.loads(line)
+                kind = message.get("type")
+                if kind == "output":
+                    sys.stdout.write(message["text"])
+                    sys.stdout.flush()
+                elif kind == "result":
+                    return 0 if message["result"].get("status") == "completed" else 1
+                elif kind == "error":
+                    sys.stderr.write(f"Error: {message.get('message')}\n")
+                    return 1
+        except KeyboardInterrupt:
+            # Closing the socket abandons the task on the daemon side
+            return 130
+    sys.stderr.write("Error: daemon closed the connection\n")
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+
+    if "--daemon-status" in args:
+        pong = _request({"type": "ping"})
+        if pong is None:
+            print(f"No daemon listening on {DAEMON_SOCKET}")
+            sys.exit(1)
+        print(f"Daemon pid {pong['pid']} on {DAEMON_SOCKET}: model {pong['model']}, "
+              f"up {pong['uptime_s']}s, {pong['tasks']} task(s) run")
+        return
+    if "--daemon-stop" in args:
+        if _request({"type": "shutdown"}) is None:
+            print(f"No daemon listening on {DAEMON_SOCKET}")
+            sys.exit(1)
+        print("Daemon stopped")
+        return
+
+    if "--mcp-server" in args:
+        # No model or MCP client setup needed, and stdout belongs to the protocol
+        from codeagent.mcp_server import main as serve
+        serve(args)
+        return
+
+    task = None if DAEMON_DISABLED else build_task(args)
+    if task is not None:
+        code = run_remote(task)
+        if code is not None:
+            sys.exit(code)
+
+    from codeagent.main import main as run_local
+    run_local()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,119 @@
-MAX_FILE_CHARS = 10000
\ No newline at end of file
+import os
+
+# Settings below read the environment, so pick up .env before they're evaluated
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Maximum characters returned by get_file_content before truncation
+MAX_FILE_CHARS = 10000
+
+# Root directory for Gent's on-disk state (sessions, caches)
+GENT_HOME = os.getenv("GENT_HOME", os.path.join(os.path.expanduser("~"), ".gent"))
+
+# Conversation sessions are persisted unless explicitly disabled
+SESSIONS_ENABLED = os.getenv("GENT_DISABLE_SESSIONS", "").lower() not in ["true", "1", "yes"]
+SESSIONS_DIR = os.path.join(GENT_HOME, "sessions")
+
+# Shared HTTP transport for OpenRouter (connection pool, keep-alive, timeouts)
+HTTP_MAX_CONNECTIONS = int(os.getenv("GENT_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GENT_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("GENT_HTTP_KEEPALIVE_EXPIRY", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("GENT_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("GENT_HTTP_READ_TIMEOUT", "600"))
+HTTP2_ENABLED = os.getenv("GENT_HTTP2", "true").lower() in ["true", "1", "yes"]
+
+# OpenRouter endpoint (point at a local OpenAI-compatible server for testing)
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Retries with exponential backoff + jitter on 429/5xx and connection errors
+MODEL_MAX_RETRIES = int(os.getenv("GENT_MAX_RETRIES", "4"))
+MODEL_RETRY_BASE_DELAY = float(os.getenv("GENT_RETRY_BASE_DELAY", "1.0"))
+MODEL_RETRY_MAX_DELAY = float(os.getenv("GENT_RETRY_MAX_DELAY", "30"))
+
+# Optional hedged request to a fallback model when the primary is slower
+# than this latency percentile of its recent calls (0 disables hedging)
+FALLBACK_MODEL = os.getenv("GENT_FALLBACK_MODEL", "")
+HEDGE_PERCENTILE = float(os.getenv("GENT_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("GENT_HEDGE_MIN_SAMPLES", "5"))
+
+# Async provider: concurrent model requests per process, and an optional
+# per-model requests-per-minute budget (0 = unlimited)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GENT_MAX_CONCURRENT_REQUESTS", "8"))
+MODEL_REQUESTS_PER_MINUTE = int(os.getenv("GENT_MODEL_RPM", "0"))
+
+# Prompt-prefix cache hints: "auto" sends cache_control breakpoints only to
+# models that need them (Anthropic, Gemini), "on" always, "off" never
+PROMPT_CACHE_MODE = os.getenv("GENT_PROMPT_CACHE", "auto").lower()
+
+# Telemetry: optional JSONL sink for per-iteration events, and streaming
+# responses so time-to-first-token can be measured
+TELEMETRY_FILE = os.getenv("GENT_TELEMETRY_FILE", "")
+STREAM_RESPONSES = os.getenv("GENT_STREAM", "false").lower() in ["true", "1", "yes"]
+
+# Tracing: write a Chrome trace-event JSON file at exit (same as --trace FILE),
+# and the sampling interval used by --profile
+TRACE_FILE = os.getenv("GENT_TRACE_FILE", "")
+PROFILE_INTERVAL_MS = float(os.getenv("GENT_PROFILE_INTERVAL_MS", "5"))
+
+# write_file previews: context lines around each hunk, rendered line budget,
+# rendered size above which syntax highlighting is skipped, and limits beyond
+# which only a summary is shown. Quiet mode (--quiet) drops previews entirely.
+PREVIEW_CONTEXT_LINES = int(os.getenv("GENT_PREVIEW_CONTEXT", "3"))
+PREVIEW_MAX_LINES = int(os.getenv("GENT_PREVIEW_MAX_LINES", "80"))
+PREVIEW_HIGHLIGHT_MAX_CHARS = int(os.getenv("GENT_PREVIEW_HIGHLIGHT_CHARS", "8000"))
+PREVIEW_DIFF_MAX_LINES = int(os.getenv("GENT_PREVIEW_DIFF_MAX_LINES", "100000"))
+PREVIEW_DIFF_MAX_BYTES = int(os.getenv("GENT_PREVIEW_DIFF_MAX_BYTES", str(2 * 1024 * 1024)))
+QUIET_MODE = os.getenv("GENT_QUIET", "").lower() in ["true", "1", "yes"]
+
+# Automatic model selection (--auto-model): policy, minimum context window,
+# blended price budget per 1M tokens, and where measured stats are kept
+MODEL_POLICY = os.getenv("GENT_MODEL_POLICY", "cheapest-fits-context")
+MODEL_MIN_CONTEXT = int(os.getenv("GENT_MIN_CONTEXT", "32000"))
+MODEL_MAX_PRICE = float(os.getenv("GENT_MAX_PRICE", "1.0"))
+MODEL_STATS_ENABLED = os.getenv("GENT_DISABLE_MODEL_STATS", "").lower() not in ["true", "1", "yes"]
+MODEL_STATS_FILE = os.path.join(GENT_HOME, "model_stats.json")
+
+# Tiered routing: exploration/verification turns go to this cheaper model
+# (same as --cheap-model), edits and debugging to the selected model
+CHEAP_MODEL = os.getenv("GENT_CHEAP_MODEL", "")
+
+# Read cache shared by get_file_content and the background prefetcher, which
+# warms it with files the next turn is likely to read (GENT_PREFETCH=false
+# disables prefetching; the cache itself is always on)
+PREFETCH_ENABLED = os.getenv("GENT_PREFETCH", "true").lower() in ["true", "1", "yes"]
+PREFETCH_MAX_FILES = int(os.getenv("GENT_PREFETCH_MAX_FILES", "8"))
+READ_CACHE_MAX_BYTES = int(os.getenv("GENT_READ_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+READ_CACHE_MAX_FILE_BYTES = int(os.getenv("GENT_READ_CACHE_MAX_FILE_BYTES", str(1024 * 1024)))
+
+# Tool output shaping: results are compacted before entering the conversation,
+# and anything still longer than TOOL_OUTPUT_MAX_CHARS is stored in the blob
+# store, leaving its head and tail plus a handle for read_tool_output
+TOOL_OUTPUT_SHAPING = os.getenv("GENT_SHAPE_TOOL_OUTPUT", "true").lower() in ["true", "1", "yes"]
+TOOL_OUTPUT_MAX_CHARS = int(os.getenv("GENT_TOOL_OUTPUT_MAX_CHARS", "8000"))
+BLOB_DIR = os.path.join(GENT_HOME, "blobs")
+BLOB_MAX_AGE_DAYS = float(os.getenv("GENT_BLOB_MAX_AGE_DAYS", "7"))
+
+# Background daemon (codeagent --daemon): Unix socket the thin client sends
+# tasks to; GENT_NO_DAEMON=true makes the client always run tasks in-process
+DAEMON_SOCKET = os.getenv("GENT_DAEMON_SOCKET", os.path.join(GENT_HOME, "daemon.sock"))
+DAEMON_DISABLED = os.getenv("GENT_NO_DAEMON", "").lower() in ["true", "1", "yes"]
+
+# MCP servers whose tool schemas are cached connect on first use
+# (GENT_MCP_LAZY=false connects all at startup); servers idle this many
+# seconds are disconnected (0 keeps them connected)
+MCP_LAZY_CONNECT = os.getenv("GENT_MCP_LAZY", "true").lower() in ["true", "1", "yes"]
+MCP_IDLE_TIMEOUT = float(os.getenv("GENT_MCP_IDLE_TIMEOUT", "300"))
+MCP_SCHEMA_CACHE = os.path.join(GENT_HOME, "mcp_tools.json")
+
+# MCP health: connected servers are pinged at this interval (0 disables), and
+# a server that drops is reconnected with exponential backoff between these
+MCP_PING_INTERVAL = float(os.getenv("GENT_MCP_PING_INTERVAL", "30"))
+MCP_RECONNECT_BASE_DELAY = float(os.getenv("GENT_MCP_RECONNECT_BASE_DELAY", "1"))
+MCP_RECONNECT_MAX_DELAY = float(os.getenv("GENT_MCP_RECONNECT_MAX_DELAY", "60"))
+
+# MCP concurrency: requests kept in flight per server session (JSON-RPC ids
+# let one session carry several; further calls queue)
+MCP_MAX_CONCURRENCY = int(os.getenv("GENT_MCP_MAX_CONCURRENCY", "8"))
@@ -0,0 +1,216 @@
+"""
+Agent Daemon for CodeAgent
+==========================
+`codeagent --daemon` keeps one process warm: the model provider (and its
+catalogue/pricing), MCP server sessions, the file index and read cache.
+The thin client (codeagent.client) sends tasks over a Unix domain socket
+and streams the task's console output back, so a one-shot
+`codeagent "<task>"` skips interpreter startup, imports, the catalogue
+fetch and MCP server spawns.
+
+Protocol: newline-delimited JSON, one request per connection.
+  client → {"type": "task", "prompt", "cwd", "verbose", "resume", "color", "width"}
+  daemon → {"type": "output", "text"}*  then  {"type": "result", "result"}
+                                              or {"type": "error", "message"}
+  client → {"type": "ping"}      daemon → {"type": "pong", "pid", "model", "uptime_s", "tasks"}
+  client → {"type": "shutdown"}  daemon → {"type": "ok"}
+
+Tasks from concurrent clients run concurrently, each with its output routed
+to its own client.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from rich.console import Console
+
+from codeagent.config import DAEMON_SOCKET
+
+
+class ClientDisconnected(BaseException):
+    """The task's client went away.
+
+    A BaseException (like KeyboardInterrupt), so the agent loop's error
+    recovery does not retry the task for a client that is no longer there.
+    """
+
+
+class ConsoleProxy:
+    """Stand-in for a module-level console that prints to the current task's client."""
+
+    def __init__(self, default: Console):
+        self._default = default
+        self._local = threading.local()
+
+    def bind(self, console: Optional[Console]):
+        self._local.console = console
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, "console", None) or self._default, name)
+
+
+class _ClientStream:
+    """File-like object a task's Console writes to; each write becomes an output message."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]):
+        data = (json.dumps(message, default=str) + "\n").encode("utf-8")
+        try:
+            with self._lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+        except OSError as e:
+            raise ClientDisconnected() from e
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send({"type": "output", "text": text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def connect(path: str = DAEMON_SOCKET, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Connected socket to a running daemon, or None."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        self.server.agent_daemon.dispatch(request, _ClientStream(self.wfile))
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AgentDaemon:
+    """Runs tasks from socket clients against one warm provider and MCP setup."""
+
+    def __init__(self, client_provider: Any, socket_path: str = DAEMON_SOCKET):
+        from codeagent import main as agent
+        from codeagent import model_provider, routing
+
+        self.agent = agent
+        self.client_provider = client_provider
+        self.socket_path = socket_path
+        self.started = time.monotonic()
+        self.tasks = 0
+        self._server: Optional[_Server] = None
+
+        # Route the agent's prints to whichever client the printing thread serves
+        self.console = agent.console
+        self.proxy = ConsoleProxy(agent.console)
+        agent.console = self.proxy
+        model_provider.console = self.proxy
+        routing.console = self.proxy
+
+    def dispatch(self, request: Dict[str, Any], stream: _ClientStream):
+        kind = request.get("type")
+        try:
+            if kind == "ping":
+                stream.send({
+                    "type": "pong",
+                    "pid": os.getpid(),
+                    "model": getattr(self.client_provider, "model_id", None),
+                    "uptime_s": round(time.monotonic() - self.started, 1),
+                    "tasks": self.tasks,
+                })
+            elif kind == "shutdown":
+                stream.send({"type": "ok"})
+                threading.Thread(target=self._server.shutdown, daemon=True).start()
+            elif kind == "task":
+                self.run_task(request, stream)
+            else:
+                stream.send({"type": "error", "message": f"Unknown request type: {kind}"})
+        except ClientDisconnected:
+            self.console.print("[dim]Client disconnected; task abandoned[/dim]")
+
+    def run_task(self, request: Dict[str, Any], stream: _ClientStream):
+        from codeagent.session_store import SessionStore
+
+        cwd = request.get("cwd") or os.getcwd()
+        prompt = request.get("prompt", "")
+        color = bool(request.get("color"))
+        self.tasks += 1
+        self.console.print(f"[dim]Task {self.tasks} in {cwd}: {prompt[:80]}[/dim]")
+
+        self.proxy.bind(Console(
+            file=stream,
+            force_terminal=color,
+            color_system="auto" if color else None,
+            width=request.get("width") or 100,
+        ))
+        try:
+            session = None
+            if request.get("resume"):
+                try:
+                    session = SessionStore.open(cwd, request["resume"])
+                except (OSError, ValueError) as e:
+                    stream.send({"type": "error", "message": f"Could not resume session: {e}"})
+                    return
+            result = self.agent.process_request(
+                self.client_provider, prompt, cwd, bool(request.get("verbose")), session=session
+            )
+            stream.send({"type": "result", "result": result})
+        except Exception as e:
+            stream.send({"type": "error", "message": str(e)})
+        finally:
+            self.proxy.bind(None)
+
+    def serve(self):
+        """Listen until shut down (client request or Ctrl-C); removes the socket on exit."""
+        probe = connect(self.socket_path, timeout=1)
+        if probe:
+            probe.close()
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale, from a daemon that died
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        old_umask = os.umask(0o077)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.agent_daemon = self
+
+        self.console.print(f"[bold green]Gent daemon listening on {self.socket_path}[/bold green] [dim](pid {os.getpid()})[/dim]")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self.console.print("[dim]Gent daemon stopped[/dim]")
@@ -0,0 +1,225 @@
+"""
+Write Previews for CodeAgent
+============================
+Bounded, cheap rendering of what a write_file call changes.
+
+Lines are interned to integers and the common prefix/suffix is trimmed
+before difflib runs, so only the changed middle of a file is diffed. Only
+changed hunks (with context) are rendered, capped at a line budget, and
+syntax highlighting is skipped when the rendered preview is large.
+"""
+
+import difflib
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from rich.console import Console
+from rich.syntax import Syntax
+from rich.text import Text
+
+from codeagent.config import (
+    PREVIEW_CONTEXT_LINES,
+    PREVIEW_DIFF_MAX_BYTES,
+    PREVIEW_DIFF_MAX_LINES,
+    PREVIEW_HIGHLIGHT_MAX_CHARS,
+    PREVIEW_MAX_LINES,
+)
+
+LANGUAGES = {
+    "py": "python",
+    "js": "javascript",
+    "html": "html",
+    "css": "css",
+    "json": "json",
+    "md": "markdown",
+    "txt": "text",
+}
+
+
+@dataclass
+class Hunk:
+    """One changed region: (tag, line) pairs with tag " ", "-" or "+"."""
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class LineDiff:
+    hunks: List[Hunk]
+    added: int
+    removed: int
+    # True when the changed region was too large to diff line by line
+    coarse: bool = False
+
+
+# =============================================================================
+# DIFF
+# =============================================================================
+
+def line_diff(old_text: str, new_text: str, context: int = PREVIEW_CONTEXT_LINES,
+              max_lines: int = PREVIEW_DIFF_MAX_LINES) -> LineDiff:
+    """Diff two texts line by line into hunks with ``context`` lines around changes."""
+    if old_text == new_text:
+        return LineDiff([], 0, 0)
+
+    old = old_text.splitlines()
+    new = new_text.splitlines()
+
+    # Trim the common prefix and suffix; edits are usually local
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_mid = old[prefix:len(old) - suffix]
+    new_mid = new[prefix:len(new) - suffix]
+
+    if len(old_mid) + len(new_mid) > max_lines:
+        # Too big to diff cheaply: one coarse hunk covering the changed region
+        start = max(0, prefix - context)
+        hunk = Hunk(start + 1, len(old) - suffix - start, start + 1, len(new) - suffix - start)
+        hunk.lines = [(" ", line) for line in old[start:prefix]]
+        return LineDiff([hunk], len(new_mid), len(old_mid), coarse=True)
+
+    # Diff only the changed middle plus enough of the common prefix/suffix
+    # for context, with lines interned to ints so the matcher compares and
+    # hashes small keys
+    offset = prefix - min(prefix, context)
+    tail = min(suffix, context)
+    old_view = old[offset:len(old) - suffix + tail]
+    new_view = new[offset:len(new) - suffix + tail]
+    ids: Dict[str, int] = {}
+    a = [ids.setdefault(line, len(ids)) for line in old_view]
+    b = [ids.setdefault(line, len(ids)) for line in new_view]
+
+    hunks = []
+    added = removed = 0
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for group in matcher.get_grouped_opcodes(context):
+        first, last = group[0], group[-1]
+        hunk = Hunk(
+            old_start=offset + first[1] + 1,
+            old_count=last[2] - first[1],
+            new_start=offset + first[3] + 1,
+            new_count=last[4] - first[3],
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                hunk.lines.extend((" ", line) for line in old_view[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                hunk.lines.extend(("-", line) for line in old_view[i1:i2])
+                removed += i2 - i1
+            if tag in ("replace", "insert"):
+                hunk.lines.extend(("+", line) for line in new_view[j1:j2])
+                added += j2 - j1
+        hunks.append(hunk)
+
+    return LineDiff(hunks, added, removed)
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+_STYLES = {"-": "red", "+": "green", " ": "dim"}
+
+# Longer lines (minified files, data blobs) are cut in previews
+MAX_LINE_CHARS = 400
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + " …"
+
+
+def _diff_text(diff: LineDiff, max_lines: int) -> Tuple[str, int]:
+    """Unified-diff text of the hunks, capped at ``max_lines``; returns (text, hidden)."""
+    out: List[str] = []
+    total = sum(len(h.lines) + 1 for h in diff.hunks)
+    for hunk in diff.hunks:
+        if len(out) >= max_lines:
+            break
+        out.append(f"@@ -{hunk.old_start},{hunk.old_count} +{hunk.new_start},{hunk.new_count} @@")
+        for tag, line in hunk.lines:
+            if len(out) >= max_lines:
+                break
+            out.append(f"{tag}{_clip(line)}")
+    return "\n".join(out), max(0, total - len(out))
+
+
+def _plain_diff(text: str) -> Text:
+    rendered = Text()
+    for line in text.split("\n"):
+        style = "cyan" if line.startswith("@@") else _STYLES.get(line[:1], "")
+        rendered.append(line + "\n", style=style)
+    return rendered
+
+
+def language_for(file_path: str) -> str:
+    ext = file_path.rsplit(".", 1)[-1] if "." in file_path else "text"
+    return LANGUAGES.get(ext, "text")
+
+
+def render_write_preview(console: Console, file_path: str, full_path: str, new_content: str):
+    """Print a bounded preview of a write: changed hunks, or the head of a new file."""
+    old_content = None
+    if os.path.isfile(full_path):
+        size = os.path.getsize(full_path)
+        if size > PREVIEW_DIFF_MAX_BYTES:
+            console.print(f"[yellow]📝 Modifying {file_path}[/yellow] [dim]({size} bytes, preview skipped)[/dim]\n")
+            return
+        try:
+            with open(full_path, "r", encoding="utf-8") as f:
+                old_content = f.read()
+        except (OSError, UnicodeDecodeError):
+            console.print(f"[yellow]📝 Modifying {file_path}[/yellow] [dim](unreadable, preview skipped)[/dim]\n")
+            return
+
+    if old_content is None:
+        console.print(f"[green]📄 Creating {file_path}[/green]")
+        lines = new_content.splitlines()
+        head = "\n".join(_clip(line) for line in lines[:PREVIEW_MAX_LINES])
+        console.print(f"\n[bold]New file content[/bold] [dim]({len(lines)} lines)[/dim]")
+        if len(head) <= PREVIEW_HIGHLIGHT_MAX_CHARS:
+            console.print(Syntax(head, language_for(file_path), theme="monokai", line_numbers=True))
+        else:
+            console.print(Text(head))
+        if len(lines) > PREVIEW_MAX_LINES:
+            console.print(f"[dim]... {len(lines) - PREVIEW_MAX_LINES} more lines[/dim]")
+        console.print()
+        return
+
+    console.print(f"[yellow]📝 Modifying {file_path}[/yellow]")
+    diff = line_diff(old_content, new_content)
+    if not diff.hunks:
+        console.print("[dim]No changes[/dim]\n")
+        return
+
+    if diff.coarse:
+        hunk = diff.hunks[0]
+        console.print(
+            f"\n[bold]Changes:[/bold] lines {hunk.old_start}-{hunk.old_start + hunk.old_count - 1} "
+            f"({diff.removed} lines → {diff.added} lines) [dim]too large to diff[/dim]\n"
+        )
+        return
+
+    console.print(
+        f"\n[bold]Changes:[/bold] [green]+{diff.added}[/green] [red]-{diff.removed}[/red] "
+        f"[dim]in {len(diff.hunks)} hunk(s)[/dim]"
+    )
+
+    text, hidden = _diff_text(diff, PREVIEW_MAX_LINES)
+    if len(text) <= PREVIEW_HIGHLIGHT_MAX_CHARS:
+        console.print(Syntax(text, "diff", theme="monokai"))
+    else:
+        console.print(_plain_diff(text))
+    if hidden:
+        console.print(f"[dim]... {hidden} more diff lines[/dim]")
+    console.print()
+
@@ -0,0 +1,261 @@
+"""
+Read Cache and File Index for CodeAgent
+=======================================
+ReadCache keeps the text of recently read files, validated on every lookup
+by (mtime_ns, size) so an edited file is never served stale. get_file_content
+reads through it, and the prefetcher warms it in the background.
+
+FileIndex maps the working directory's Python modules and files by name,
+shared across tasks for a short TTL, so imports and test files can be
+resolved without walking the tree again.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from codeagent.config import READ_CACHE_MAX_BYTES, READ_CACHE_MAX_FILE_BYTES
+
+# Seconds an index is reused before the tree is walked again (new files)
+FILE_INDEX_TTL = 30.0
+
+# Directories never indexed (or prefetched from)
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", "env",
+             ".mypy_cache", ".pytest_cache", ".tox", "build", "dist"}
+
+
+# Counters of the task reading in this context (see count_reads). The cache
+# is shared by concurrent tasks, so per-task rates can't come from its totals
+_task_counters: ContextVar[Optional[Dict[str, int]]] = ContextVar("gent_read_counters", default=None)
+
+
+def new_counters() -> Dict[str, int]:
+    return {"reads": 0, "hits": 0, "prefetch_hits": 0, "prefetched": 0, "stale": 0}
+
+
+@contextmanager
+def count_reads(counters: Optional[Dict[str, int]]):
+    """Also count reads made in this context (thread or task) into ``counters``."""
+    token = _task_counters.set(counters)
+    try:
+        yield counters
+    finally:
+        _task_counters.reset(token)
+
+
+class ReadCache:
+    """LRU of file contents keyed by absolute path, bounded by total characters."""
+
+    def __init__(self, max_bytes: int = READ_CACHE_MAX_BYTES, max_file_bytes: int = READ_CACHE_MAX_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+        # path -> (mtime_ns, size, content, prefetched and not yet read). The
+        # last field is the prefetching task's counters, or True without any
+        self._entries: "OrderedDict[str, Tuple[int, int, str, object]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = new_counters()
+
+    def _count(self, key: str, task: Optional[Dict[str, int]]):
+        self.stats[key] += 1
+        if task is not None:
+            task[key] += 1
+
+    def read(self, path: str) -> str:
+        """Contents of ``path`` (UTF-8), from the cache when the file is unchanged."""
+        st = os.stat(path)
+        task = _task_counters.get()
+        with self._lock:
+            self._count("reads", task)
+            entry = self._entries.get(path)
+            if entry is not None:
+                if entry[:2] == (st.st_mtime_ns, st.st_size):
+                    self._count("hits", task)
+                    if entry[3]:
+                        # Credited to whichever task prefetched it
+                        self._count("prefetch_hits", entry[3] if isinstance(entry[3], dict) else None)
+                        self._entries[path] = (entry[0], entry[1], entry[2], False)
+                    self._entries.move_to_end(path)
+                    return entry[2]
+                self._count("stale", task)
+                self._drop(path)
+
+        content = self._load(path)
+        self._store(path, st, content, prefetched=False)
+        return content
+
+    def warm(self, path: str, counters: Optional[Dict[str, int]] = None) -> bool:
+        """Load ``path`` into the cache unless already current; True if it was loaded.
+
+        ``counters`` (a prefetcher's) is credited with the prefetch and, if
+        the file is then read, the prefetch hit.
+        """
+        try:
+            st = os.stat(path)
+            if st.st_size > self.max_file_bytes:
+                return False
+            with self._lock:
+                entry = self._entries.get(path)
+                if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                    return False
+            content = self._load(path)
+        except (OSError, UnicodeDecodeError):
+            return False
+        if self._store(path, st, content, prefetched=counters if counters is not None else True):
+            with self._lock:
+                self._count("prefetched", counters)
+            return True
+        return False
+
+    def peek(self, path: str) -> Optional[str]:
+        """Cached contents if current, without counting a read."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                return entry[2]
+        return None
+
+    def invalidate(self, path: str):
+        with self._lock:
+            self._drop(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    @staticmethod
+    def _load(path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _store(self, path: str, st: os.stat_result, content: str, prefetched: object) -> bool:
+        if st.st_size > self.max_file_bytes:
+            return False
+        with self._lock:
+            current = self._entries.get(path)
+            if prefetched and current is not None and current[:2] == (st.st_mtime_ns, st.st_size):
+                # Read for real while the prefetch was loading
+                return False
+            self._drop(path)
+            self._entries[path] = (st.st_mtime_ns, st.st_size, content, prefetched)
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2])
+        return True
+
+    def _drop(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= len(entry[2])
+
+
+_read_cache = ReadCache()
+
+
+def get_read_cache() -> ReadCache:
+    """The process-wide read cache shared by tools and the prefetcher."""
+    return _read_cache
+
+
+# =============================================================================
+# FILE INDEX
+# =============================================================================
+
+class FileIndex:
+    """Python modules and file names under a root directory."""
+
+    def __init__(self, root: str, max_files: int = 20000):
+        self.root = os.path.abspath(root)
+        self.modules: Dict[str, str] = {}
+        self.by_name: Dict[str, List[str]] = {}
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                self.by_name.setdefault(name, []).append(path)
+                if name.endswith(".py"):
+                    self.modules.setdefault(self._module_name(path), path)
+                count += 1
+                if count >= max_files:
+                    return
+
+    def _module_name(self, path: str) -> str:
+        rel = os.path.relpath(path, self.root)[:-3].replace(os.sep, ".")
+        return rel[:-len(".__init__")] if rel.endswith(".__init__") else rel
+
+    def package_of(self, path: str) -> str:
+        """Dotted package containing ``path`` ("" at the root)."""
+        module = self._module_name(path)
+        return module if os.path.basename(path) == "__init__.py" else module.rpartition(".")[0]
+
+    def resolve_module(self, module: str, importer: Optional[str] = None, level: int = 0) -> Optional[str]:
+        """File for an imported module; ``level`` is the number of leading dots."""
+        candidates = []
+        if importer:
+            package = self.package_of(importer)
+            for _ in range(max(level - 1, 0)):
+                package = package.rpartition(".")[0]
+            # Relative imports, and scripts importing siblings directly
+            if package:
+                candidates.append(f"{package}.{module}" if module else package)
+        if level == 0:
+            candidates.append(module)
+        for name in candidates:
+            path = self.modules.get(name)
+            if path:
+                return path
+            # "pkg.name" where name is an attribute of pkg, not a submodule
+            if "." in name:
+                path = self.modules.get(name.rpartition(".")[0])
+                if path:
+                    return path
+        return None
+
+    def tests_for(self, path: str) -> List[str]:
+        """Test files that likely cover ``path``."""
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if stem.startswith("test_") or stem.endswith("_test") or stem == "tests":
+            return []
+        found = []
+        for name in (f"test_{stem}.py", f"{stem}_test.py"):
+            found.extend(self.by_name.get(name, []))
+        # Single-file suites next to (or one level above) the module
+        directory = os.path.dirname(os.path.abspath(path))
+        for candidate in (directory, os.path.dirname(directory)):
+            for name in ("tests.py", "test.py"):
+                test_path = os.path.join(candidate, name)
+                if test_path in self.by_name.get(name, []):
+                    found.append(test_path)
+        return found
+
+
+_indexes: Dict[str, Tuple[float, FileIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(root: str) -> FileIndex:
+    """Index of ``root``, shared across tasks and rebuilt after FILE_INDEX_TTL."""
+    root = os.path.abspath(root)
+    with _indexes_lock:
+        cached = _indexes.get(root)
+    if cached and time.monotonic() - cached[0] < FILE_INDEX_TTL:
+        return cached[1]
+    index = FileIndex(root)
+    with _indexes_lock:
+        _indexes[root] = (time.monotonic(), index)
+    return index
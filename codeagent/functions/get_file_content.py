@@ -2,6 +2,7 @@ import os
 from google.genai import types
 
 from codeagent.config import MAX_FILE_CHARS
+from codeagent.file_cache import get_read_cache
 
 def get_file_content(working_directory, file_path):
     try:
@@ -15,8 +16,9 @@ def get_file_content(working_directory, file_path):
         if not os.path.isfile(abs_full_path):
             return f'Error: File not found or is not a regular file: "{file_path}"'
         
-        with open(abs_full_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Served from the read cache when the file is unchanged (and often
+        # already warmed by the prefetcher)
+        content = get_read_cache().read(abs_full_path)
         
         if len(content) > MAX_FILE_CHARS:
             content = content[:MAX_FILE_CHARS]
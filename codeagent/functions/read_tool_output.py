@@ -0,0 +1,51 @@
+from google.genai import types
+
+from codeagent.blob_store import get_blob_store
+from codeagent.config import TOOL_OUTPUT_MAX_CHARS
+from codeagent.output_shaping import describe_blob
+
+
+def read_tool_output(working_directory, handle, offset=0, length=TOOL_OUTPUT_MAX_CHARS):
+    try:
+        text = get_blob_store().get(handle)
+        if text is None:
+            path = get_blob_store().locate(handle)
+            if path is None:
+                return f'Error: Unknown tool output handle "{handle}"'
+            return describe_blob(handle, path)
+        
+        offset = max(0, int(offset))
+        length = max(1, min(int(length), TOOL_OUTPUT_MAX_CHARS))
+        end = min(len(text), offset + length)
+        
+        chunk = text[offset:end]
+        if end < len(text):
+            chunk += f'\n[... chars {offset}-{end} of {len(text)}; continue with offset={end}]'
+        return chunk
+    
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+schema_read_tool_output = types.FunctionDeclaration(
+    name="read_tool_output",
+    description=f"Reads part of a large tool output that was shortened in the conversation, by the handle given in its '[... chars omitted ...]' marker. Returns at most {TOOL_OUTPUT_MAX_CHARS} characters per call. For a binary output (an image not shown inline), returns its type, size, file path and a preview.",
+    parameters=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "handle": types.Schema(
+                type=types.Type.STRING,
+                description="The handle from the omitted-output marker.",
+            ),
+            "offset": types.Schema(
+                type=types.Type.INTEGER,
+                description="Character offset to start reading from. Defaults to 0.",
+            ),
+            "length": types.Schema(
+                type=types.Type.INTEGER,
+                description=f"Number of characters to read (max {TOOL_OUTPUT_MAX_CHARS}).",
+            ),
+        },
+        required=["handle"],
+    ),
+)
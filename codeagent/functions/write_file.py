@@ -2,6 +2,8 @@ import os
 
 from google.genai import types
 
+from codeagent.file_cache import get_read_cache
+
 
 def write_file(working_directory, file_path, content):
     try:
@@ -24,6 +26,7 @@ def write_file(working_directory, file_path, content):
         # Write the content to the file
         with open(abs_full_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        get_read_cache().invalidate(abs_full_path)
         
         return f'Successfully wrote to "{file_path}" ({len(content)} characters written)'
     
@@ -0,0 +1,243 @@
+"""
+Shared HTTP Transport for CodeAgent
+===================================
+One explicitly configured httpx client (keep-alive, HTTP/2, pool limits,
+timeouts) shared by the OpenRouter model client and the catalogue fetch,
+so connections are reused across generate_content calls and sessions.
+
+Connection setup (TCP connect + TLS handshake) is timed per request via
+httpcore trace hooks; a reused keep-alive connection records zero setup.
+"""
+
+import importlib.util
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+from codeagent.config import (
+    HTTP2_ENABLED,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_READ_TIMEOUT,
+)
+
+# HTTP/2 needs h2, installed with the httpx[http2] dependency; installs
+# without it (e.g. a bare pip install httpx) fall back to HTTP/1.1
+H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+# =============================================================================
+# CONNECTION TIMING
+# =============================================================================
+
+class _RequestTiming:
+    """Collects httpcore trace events for a single request."""
+
+    def __init__(self):
+        self.connect_started: Optional[float] = None
+        self.connect_finished: Optional[float] = None
+        self.http_version: Optional[str] = None
+
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            self.connect_started = now
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_finished = now
+        elif event_name.endswith("send_request_headers.started"):
+            self.http_version = "HTTP/2" if event_name.startswith("http2.") else "HTTP/1.1"
+
+    @property
+    def new_connection(self) -> bool:
+        return self.connect_started is not None
+
+    @property
+    def setup_seconds(self) -> float:
+        if self.connect_started is None or self.connect_finished is None:
+            return 0.0
+        return self.connect_finished - self.connect_started
+
+
+class TransportStats:
+    """Thread-safe counters for connection reuse and setup time."""
+
+    def __init__(self, history: int = 256):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.total_setup_seconds = 0.0
+        self.last_setup_seconds = 0.0
+        self.recent = deque(maxlen=history)
+
+    def record(self, url: str, timing: _RequestTiming, elapsed: float):
+        with self._lock:
+            self.requests += 1
+            if timing.new_connection:
+                self.new_connections += 1
+                self.total_setup_seconds += timing.setup_seconds
+            self.last_setup_seconds = timing.setup_seconds
+            self.recent.append({
+                "url": url,
+                "new_connection": timing.new_connection,
+                "setup_ms": round(timing.setup_seconds * 1000, 2),
+                "http_version": timing.http_version,
+                "headers_ms": round(elapsed * 1000, 2),
+            })
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": self.requests - self.new_connections,
+                "avg_setup_ms": round(self.total_setup_seconds / self.new_connections * 1000, 2)
+                if self.new_connections else 0.0,
+                "last_setup_ms": round(self.last_setup_seconds * 1000, 2),
+            }
+
+
+def _chain_trace(request: httpx.Request, timing: _RequestTiming, is_async: bool = False):
+    """Install our trace hook, keeping any hook the caller already set."""
+    existing = request.extensions.get("trace")
+
+    if is_async:
+        # httpcore requires a coroutine function on async transports
+        async def trace(event_name, info):
+            timing.trace(event_name, info)
+            if existing is not None:
+                await existing(event_name, info)
+    elif existing is None:
+        trace = timing.trace
+    else:
+        def trace(event_name, info):
+            timing.trace(event_name, info)
+            existing(event_name, info)
+
+    request.extensions["trace"] = trace
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTP transport that records per-request connection setup time."""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        timing = _RequestTiming()
+        _chain_trace(request, timing)
+        started = time.perf_counter()
+        try:
+            return super().handle_request(request)
+        finally:
+            self.stats.record(str(request.url), timing, time.perf_counter() - started)
+
+
+class AsyncInstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport that records per-request connection setup time."""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timing = _RequestTiming()
+        _chain_trace(request, timing, is_async=True)
+        started = time.perf_counter()
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.stats.record(str(request.url), timing, time.perf_counter() - started)
+
+
+# =============================================================================
+# SHARED CLIENT
+# =============================================================================
+
+_stats = TransportStats()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_client_lock = threading.Lock()
+
+
+def build_timeout() -> httpx.Timeout:
+    """Connect/read timeouts from config (write and pool reuse connect)."""
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_CONNECT_TIMEOUT,
+        pool=HTTP_CONNECT_TIMEOUT,
+    )
+
+
+def build_limits() -> httpx.Limits:
+    """Connection-pool limits from config."""
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide httpx client, creating it on first use."""
+    global _client
+
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            http2 = HTTP2_ENABLED and H2_AVAILABLE
+            _client = httpx.Client(
+                transport=InstrumentedTransport(_stats, http2=http2, limits=build_limits()),
+                timeout=build_timeout(),
+            )
+        return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async httpx client, creating it on first use.
+
+    Pooled connections belong to the event loop that opened them, so use
+    this client from a single event loop.
+    """
+    global _async_client
+
+    with _client_lock:
+        if _async_client is None or _async_client.is_closed:
+            http2 = HTTP2_ENABLED and H2_AVAILABLE
+            _async_client = httpx.AsyncClient(
+                transport=AsyncInstrumentedTransport(_stats, http2=http2, limits=build_limits()),
+                timeout=build_timeout(),
+            )
+        return _async_client
+
+
+def get_transport_stats() -> TransportStats:
+    """Connection reuse and setup-time statistics for the shared transport."""
+    return _stats
+
+
+def close_http_clients():
+    """Close the shared client and its pooled connections."""
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_http_clients():
+    """Close the shared async client (and the sync one)."""
+    global _async_client
+
+    with _client_lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+    close_http_clients()
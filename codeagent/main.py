@@ -1,8 +1,11 @@
 import os
+import re
 import sys
+import time
 import asyncio
+import concurrent.futures
+import threading
 from dotenv import load_dotenv
-import difflib
 
 # Allow nested event loops for MCP
 try:
@@ -13,13 +16,24 @@ except ImportError:
 
 # Import OpenRouter provider instead of Gemini
 from codeagent.model_provider import initialize_openrouter
+from codeagent.config import SESSIONS_ENABLED
+from codeagent.http_transport import close_http_clients, get_transport_stats
+from codeagent.session_store import SessionStore
+from codeagent.telemetry import TaskTelemetry, get_jsonl_sink, render_summary_table, set_default_sink
+from codeagent.tracing import export_chrome_trace, get_profiler, span, start_tracing, trace_summary
+from codeagent.config import CHEAP_MODEL, MODEL_POLICY, MODEL_STATS_ENABLED, PREFETCH_ENABLED, QUIET_MODE, TRACE_FILE
+from codeagent.file_cache import count_reads
+from codeagent.prefetch import Prefetcher
+from codeagent.output_shaping import shape_output
+from codeagent.tool_memo import ToolMemo
+from codeagent.routing import RoutedProvider
+from codeagent.model_selector import POLICIES, ModelStats
+from codeagent.diff_preview import render_write_preview
 
-from rich.syntax import Syntax
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.markdown import Markdown
-from rich.columns import Columns
 from rich import print as rprint
 
 # Import schemas - updated paths
@@ -27,12 +41,14 @@ from codeagent.functions.get_files_info import schema_get_files_info
 from codeagent.functions.get_file_content import schema_get_file_content
 from codeagent.functions.run_python_file import schema_run_python_file
 from codeagent.functions.write_file import schema_write_file
+from codeagent.functions.read_tool_output import schema_read_tool_output
 
 # Import actual functions - updated paths
 from codeagent.functions.get_files_info import get_files_info
 from codeagent.functions.get_file_content import get_file_content
 from codeagent.functions.run_python_file import run_python_file
 from codeagent.functions.write_file import write_file
+from codeagent.functions.read_tool_output import read_tool_output
 
 # Initialize rich console
 console = Console()
@@ -56,22 +72,24 @@ BANNER = """
 
 load_dotenv()
 
-# Initialize OpenRouter client (will prompt for model selection)
-try:
-    client = initialize_openrouter()
-except Exception as e:
-    console.print(f"[red]Failed to initialize OpenRouter: {e}[/red]")
-    sys.exit(1)
-
 # Global MCP integration instance
 mcp_integration = None
 
+# Headless runs (--quiet, batch mode) skip write_file previews
+quiet_mode = QUIET_MODE
+
+# Dedicated event loop for MCP sessions, so connections outlive individual
+# calls and can be shared by concurrently running tasks
+_mcp_loop = None
+_mcp_loop_lock = threading.Lock()
+
 # Map function names to actual functions
 FUNCTION_MAP = {
     "get_files_info": get_files_info,
     "get_file_content": get_file_content,
     "run_python_file": run_python_file,
     "write_file": write_file,
+    "read_tool_output": read_tool_output,
 }
 
 # Native function schemas
@@ -80,6 +98,7 @@ NATIVE_SCHEMAS = [
     schema_get_file_content,
     schema_run_python_file,
     schema_write_file,
+    schema_read_tool_output,
 ]
 
 
@@ -150,6 +169,7 @@ AVAILABLE NATIVE FUNCTIONS:
 - get_file_content(file_path): Read file contents  
 - run_python_file(file_path, args): Execute Python files
 - write_file(file_path, content): Write or overwrite files
+- read_tool_output(handle, offset): Read the omitted part of a shortened tool output
 
 AVAILABLE MCP TOOLS (when enabled):
 - context7 tools: Get up-to-date library documentation
@@ -211,37 +231,133 @@ If verification fails or errors occur:
 """
 
 
+def submit_mcp(coro):
+    """Schedule a coroutine on the shared MCP event loop; returns a concurrent Future."""
+    global _mcp_loop
+    
+    with _mcp_loop_lock:
+        if _mcp_loop is None:
+            _mcp_loop = asyncio.new_event_loop()
+            threading.Thread(target=_mcp_loop.run_forever, name="gent-mcp", daemon=True).start()
+    
+    return asyncio.run_coroutine_threadsafe(coro, _mcp_loop)
+
+
+def run_mcp(coro):
+    """Run a coroutine on the shared MCP event loop and wait for its result."""
+    return submit_mcp(coro).result()
+
+
+def print_mcp_stats():
+    """Per-server MCP availability and latency for the servers used so far."""
+    if not mcp_integration:
+        return
+    for name, stats in mcp_integration.get_server_stats().items():
+        if not (stats["calls"] or stats["errors"]):
+            continue
+        state = "up" if stats["available"] else f"down ({stats['last_error']})"
+        latency = f", p50 {stats['p50_ms']:.0f}ms / p95 {stats['p95_ms']:.0f}ms" if stats["p50_ms"] is not None else ""
+        console.print(
+            f"  • MCP {name}: {state}, {stats['calls']} call(s), {stats['errors']} error(s), "
+            f"{stats['retries']} retried, {stats['reconnects']} reconnect(s){latency}"
+        )
+
+
 async def call_mcp_function(function_name, function_args, verbose=False):
     """Call an MCP function and return the result."""
     if not mcp_integration:
         return {"error": "MCP integration not initialized"}
     
     try:
-        result = await mcp_integration.handle_function_call({
-            "name": function_name,
-            "args": function_args
-        })
-        
-        if verbose:
-            result_str = str(result)
-            if len(result_str) > 300:
-                console.print(f"[dim]  MCP Result: {result_str[:300]}...[/dim]")
-            else:
-                console.print(f"[dim]  MCP Result: {result_str}[/dim]")
-        
+        with span("call_mcp_function", "mcp", tool=function_name):
+            result = await mcp_integration.handle_function_call({
+                "name": function_name,
+                "args": function_args
+            })
         return {"result": result}
     
     except Exception as e:
-        error_msg = f"MCP Error: {str(e)}"
-        console.print(f"[red]{error_msg}[/red]")
-        return {"error": error_msg}
+        return {"error": f"MCP Error: {str(e)}"}
 
 
-def call_function(function_call_part, working_directory, verbose=False):
-    """Execute a function call from the LLM (sync wrapper for async calls)."""
+async def call_mcp_functions(function_calls, futures):
+    """Run a model turn's MCP calls concurrently, resolving each future as its call completes."""
+    try:
+        with span("call_mcp_functions", "mcp", calls=len(function_calls)):
+            async for index, result in mcp_integration.handle_function_calls(function_calls):
+                futures[index].set_result({"result": result})
+    except Exception as e:
+        for future in futures:
+            if not future.done():
+                future.set_result({"error": f"MCP Error: {str(e)}"})
+
+
+def start_mcp_calls(function_call_parts):
+    """Start a model turn's leading idempotent MCP calls at once, so they run concurrently.
+    
+    Only calls the manager reports as idempotent (lookups, reads) are
+    started early, and only those before the turn's first native or
+    non-idempotent call: a browser's navigate must finish before its click,
+    and an MCP read must see a write_file issued ahead of it. Everything
+    else runs one at a time in the model's order.
+    
+    Returns {part index: Future of the call's response}; empty unless two
+    or more calls qualify. Results are still consumed (and added to the
+    history) in the model's order.
+    """
+    if not mcp_integration:
+        return {}
+    
+    function_calls = []
+    for part in function_call_parts:
+        function_call = {"name": part.function_call.name, "args": dict(part.function_call.args)}
+        if not function_call["name"].startswith("mcp_") or not mcp_integration.is_idempotent(function_call):
+            break
+        function_calls.append(function_call)
+    if len(function_calls) < 2:
+        return {}
+    
+    futures = [concurrent.futures.Future() for _ in function_calls]
+    submit_mcp(call_mcp_functions(function_calls, futures))
+    return dict(enumerate(futures))
+
+
+def show_write_preview(file_path, new_content, working_directory):
+    """Show what a write_file call will change (changed hunks or new content)."""
+    render_write_preview(console, file_path, os.path.join(working_directory, file_path), new_content)
+
+
+def call_function(function_call_part, working_directory, verbose=False, session=None, memo=None, pending=None):
+    """Execute a function call from the LLM (sync wrapper for async calls).
+    
+    ``pending`` is the Future of an MCP call already started by start_mcp_calls.
+    """
     function_name = function_call_part.name
     function_args = dict(function_call_part.args)
     
+    # An identical earlier read in this task whose inputs are unchanged:
+    # answer with a short reference instead of repeating the payload
+    if memo:
+        reference = memo.lookup(function_name, function_args, working_directory)
+        if reference is not None:
+            console.print(f"[dim cyan]→ {function_name} (unchanged, deduplicated)[/dim cyan]")
+            from codeagent.model_provider import MockPart
+            return MockPart.from_function_response(name=function_name, response={"result": reference})
+    
+    # Reads logged by an earlier run of a resumed session: serve them while
+    # their inputs are unchanged (the memo dedupes repeats within this task)
+    if session:
+        cached = session.lookup_tool_call(function_name, function_args, working_directory)
+        if cached is not None:
+            console.print(f"[dim cyan]→ {function_name} (cached)[/dim cyan]")
+            from codeagent.model_provider import MockPart
+            part = MockPart.from_function_response(name=function_name, response=cached)
+            session.link_tool_result(part, function_name, function_args)
+            if memo:
+                version = memo.version(function_name, function_args, working_directory)
+                memo.record(function_name, function_args, version, cached.get("result"), 0.0)
+            return part
+    
     # Print function call
     if verbose:
         console.print(f"[cyan]→ Calling: {function_name}({function_args})[/cyan]")
@@ -250,16 +366,20 @@ def call_function(function_call_part, working_directory, verbose=False):
     
     # Check if it's an MCP function
     if function_name.startswith("mcp_"):
-        try:
-            result = asyncio.run(call_mcp_function(function_name, function_args, verbose))
-        except RuntimeError:
-            try:
-                import nest_asyncio
-                nest_asyncio.apply()
-                loop = asyncio.get_event_loop()
-                result = loop.run_until_complete(call_mcp_function(function_name, function_args, verbose))
-            except ImportError:
-                result = {"error": "Cannot run async MCP function. Install nest-asyncio: pip install nest-asyncio"}
+        if pending is not None:
+            result = pending.result()
+        else:
+            result = run_mcp(call_mcp_function(function_name, function_args, verbose))
+        if "error" in result:
+            console.print(f"[red]{result['error']}[/red]")
+        elif verbose:
+            result_str = str(result["result"])
+            if len(result_str) > 300:
+                console.print(f"[dim]  MCP Result: {result_str[:300]}...[/dim]")
+            else:
+                console.print(f"[dim]  MCP Result: {result_str}[/dim]")
+        if "result" in result:
+            result["result"] = shape_output(function_name, result["result"])
         
         from codeagent.model_provider import MockPart
         return MockPart.from_function_response(
@@ -276,97 +396,28 @@ def call_function(function_call_part, working_directory, verbose=False):
         )
     
     # Special handling for write_file to show diff
-    if function_name == "write_file":
+    if function_name == "write_file" and not quiet_mode:
         file_path = function_args.get("file_path", "")
-        new_content = function_args.get("content", "")
-        full_path = os.path.join(working_directory, file_path)
-        
-        old_content = ""
-        file_exists = os.path.exists(full_path) and os.path.isfile(full_path)
-        
-        if file_exists:
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    old_content = f.read()
-            except:
-                old_content = ""
-        
-        if file_exists:
-            console.print(f"[yellow]📝 Modifying {file_path}[/yellow]")
-        else:
-            console.print(f"[green]📄 Creating {file_path}[/green]")
-        
-        if file_exists and old_content:
-            old_lines = old_content.splitlines(keepends=True)
-            new_lines = new_content.splitlines(keepends=True)
-            
-            diff = list(difflib.unified_diff(
-                old_lines,
-                new_lines,
-                fromfile=f"{file_path} (before)",
-                tofile=f"{file_path} (after)",
-                lineterm=''
-            ))
-            
-            if diff:
-                console.print("\n[bold]Changes:[/bold]")
-                
-                # Create side-by-side view
-                old_content_display = old_content if len(old_content) < 1000 else old_content[:1000] + "\n... (truncated)"
-                new_content_display = new_content if len(new_content) < 1000 else new_content[:1000] + "\n... (truncated)"
-                
-                # Detect language
-                ext = file_path.split('.')[-1] if '.' in file_path else "text"
-                lang_map = {
-                    'py': 'python',
-                    'js': 'javascript',
-                    'html': 'html',
-                    'css': 'css',
-                    'json': 'json',
-                    'md': 'markdown',
-                    'txt': 'text'
-                }
-                language = lang_map.get(ext, 'text')
-                
-                # Create syntax highlighted panels
-                old_panel = Panel(
-                    Syntax(old_content_display, language, theme="monokai", line_numbers=True),
-                    title="[red]Before[/red]",
-                    border_style="red"
-                )
-                
-                new_panel = Panel(
-                    Syntax(new_content_display, language, theme="monokai", line_numbers=True),
-                    title="[green]After[/green]",
-                    border_style="green"
-                )
-                
-                # Display side by side
-                console.print(Columns([old_panel, new_panel], equal=True, expand=True))
-                console.print()
-        else:
-            console.print("\n[bold]New file content:[/bold]")
-            display_content = new_content if len(new_content) < 500 else new_content[:500] + "\n... (truncated)"
-            
-            ext = file_path.split('.')[-1] if '.' in file_path else "text"
-            lang_map = {
-                'py': 'python',
-                'js': 'javascript',
-                'html': 'html',
-                'css': 'css',
-                'json': 'json',
-                'md': 'markdown',
-                'txt': 'text'
-            }
-            language = lang_map.get(ext, 'text')
-            
-            syntax = Syntax(display_content, language, theme="monokai", line_numbers=True)
-            console.print(syntax)
-            console.print()
+        with span("render_diff", file=file_path):
+            show_write_preview(file_path, function_args.get("content", ""), working_directory)
     
-    function_args["working_directory"] = working_directory
+    call_args = dict(function_args)
+    call_args["working_directory"] = working_directory
     function = FUNCTION_MAP[function_name]
-    function_result = function(**function_args)
+    memo_version = memo.version(function_name, function_args, working_directory) if memo else None
+    started = time.perf_counter()
+    with span("run_tool", "tool", tool=function_name):
+        function_result = function(**call_args)
+    tool_seconds = time.perf_counter() - started
+    
+    # Compact the result before it enters (and is re-sent with) the history
+    raw_chars = len(function_result)
+    with span("shape_output", "tool", tool=function_name):
+        function_result = shape_output(function_name, function_result)
+    if verbose and len(function_result) < raw_chars:
+        console.print(f"[dim]  Shaped output: {raw_chars} → {len(function_result)} chars[/dim]")
+    if memo:
+        memo.record(function_name, function_args, memo_version, function_result, tool_seconds)
     
     if function_name == "write_file":
         if "Successfully wrote" in function_result:
@@ -382,147 +433,349 @@ def call_function(function_call_part, working_directory, verbose=False):
             console.print(f"[dim]  Result: {result_str}[/dim]")
     
     from codeagent.model_provider import MockPart
-    return MockPart.from_function_response(
+    part = MockPart.from_function_response(
         name=function_name,
         response={"result": function_result},
     )
+    
+    if session:
+        session.record_tool_call(function_name, function_args, {"result": function_result}, working_directory, part)
+        if function_name == "write_file":
+            session.record_file_write(function_args.get("file_path", ""), working_directory)
+    
+    return part
 
 
-def process_request(client_provider, user_prompt, working_directory, verbose=False):
-    """Process a single user request - continues until task is complete."""
-    from codeagent.model_provider import MockContent, MockPart
+def timed_call_function(function_call_part, working_directory, verbose, session, telemetry, memo=None, pending=None):
+    """call_function, recording its wall time per tool in the task telemetry."""
+    started = time.perf_counter()
+    with span("call_function", "tool", tool=function_call_part.name):
+        part = call_function(function_call_part, working_directory, verbose, session, memo, pending)
+    response = getattr(part.function_response, "response", None)
+    ok = not (isinstance(response, dict) and "error" in response)
+    telemetry.record_tool_call(function_call_part.name, time.perf_counter() - started, ok)
+    return part
+
+
+def process_request(client_provider, user_prompt, working_directory, verbose=False, session=None):
+    """Process a single user request - continues until task is complete.
     
-    messages = [
-        MockContent(role="user", parts=[MockPart(text=user_prompt)]),
-    ]
+    If ``session`` already holds messages (a resumed session), the conversation
+    continues from them and ``user_prompt`` is treated as an optional follow-up.
+    
+    Returns a summary dict (status, counts, modified files, final text).
+    """
+    from codeagent.model_provider import MockContent, MockPart
     
     max_iterations = 100
+    iteration = 0
     function_call_count = 0
     files_read = set()
     files_modified = set()
+    final_text = None
+    telemetry = TaskTelemetry(
+        user_prompt or (session.meta.get("task", "") if session else ""),
+        pricing=getattr(client_provider, "pricing", None),
+        sink=get_jsonl_sink(),
+    )
+    # Warms the read cache with likely next reads while the model thinks
+    prefetcher = Prefetcher(working_directory) if PREFETCH_ENABLED else None
+    # Answers repeated identical reads with a reference to the earlier result
+    memo = ToolMemo()
     
-    console.print(f"[bold cyan]Starting task: {user_prompt}[/bold cyan]\n")
+    messages = []
+    # Interrupted unless the loop below runs to its end (Ctrl-C, or the
+    # daemon's client disconnecting mid-task)
+    status = "interrupted"
     
-    available_functions = create_available_functions_tool()
+    try:
+        if session and session.messages:
+            messages = list(session.messages)
+            console.print(f"[bold cyan]Resuming session {session.session_id} ({len(messages)} messages)[/bold cyan]\n")
+        
+            changed = session.changed_files(working_directory)
+            if changed:
+                console.print(f"[yellow]Files changed since the session was saved: {', '.join(sorted(changed))}[/yellow]")
+        
+            # Finish the tool calls the last model turn issued before the interruption
+            pending = session.pending_function_calls()
+            if pending:
+                function_call_count += len(pending)
+                telemetry.begin_iteration(0)
+                messages.append(MockContent(
+                    role="tool",
+                    parts=[timed_call_function(p.function_call, working_directory, verbose, session, telemetry, memo)
+                           for p in pending]
+                ))
+        
+            if user_prompt:
+                messages.append(MockContent(role="user", parts=[MockPart(text=user_prompt)]))
+            elif not pending:
+                messages.append(MockContent(
+                    role="user",
+                    parts=[MockPart(text="Continue the task from where you left off. If you're done, provide a final summary.")]
+                ))
+        else:
+            messages = [
+                MockContent(role="user", parts=[MockPart(text=user_prompt)]),
+            ]
+            if session is None and SESSIONS_ENABLED:
+                try:
+                    session = SessionStore.create(working_directory, user_prompt)
+                except OSError as e:
+                    console.print(f"[yellow]Warning: Could not create session log: {e}[/yellow]")
+        
+            console.print(f"[bold cyan]Starting task: {user_prompt}[/bold cyan]\n")
     
-    for iteration in range(max_iterations):
-        try:
-            if verbose:
-                console.print(f"[dim]--- Iteration {iteration + 1} ---[/dim]")
+        if session and verbose:
+            console.print(f"[dim]Session: {session.session_id} (resume with: codeagent --resume {session.session_id})[/dim]")
+    
+        available_functions = create_available_functions_tool()
+        tools_version = mcp_integration.tools_version if mcp_integration else None
+    
+        for iteration in range(max_iterations):
+            if session:
+                with span("session_sync", "io"):
+                    session.sync(messages)
+            telemetry.begin_iteration(iteration + 1)
+            memo.turn = iteration + 1
+        
+            # An MCP server changed its tool list (list_changed notification or a
+            # reconnect): offer the new tools from the next request on
+            if mcp_integration and mcp_integration.tools_version != tools_version:
+                tools_version = mcp_integration.tools_version
+                available_functions = create_available_functions_tool()
+                if verbose:
+                    console.print("[dim]MCP tool list changed; tools refreshed[/dim]")
+        
+            try:
+                if verbose:
+                    console.print(f"[dim]--- Iteration {iteration + 1} ---[/dim]")
             
-            # Generate response using OpenRouter
-            response = client_provider.generate_content(
-                messages=messages,
-                tools=[available_functions],
-                system_instruction=system_prompt
-            )
+                # Generate response using OpenRouter
+                started = time.perf_counter()
+                with span("generate_content", "model", iteration=iteration + 1, messages=len(messages)):
+                    response = client_provider.generate_content(
+                        messages=messages,
+                        tools=[available_functions],
+                        system_instruction=system_prompt
+                    )
             
-            for candidate in response.candidates:
-                messages.append(candidate.content)
+                event = telemetry.record_model_call(
+                    response, getattr(client_provider, "model_id", None), time.perf_counter() - started
+                )
+                if verbose:
+                    if event["route"]:
+                        console.print(f"[dim]Route: {event['route']['phase']} → {event['model']}[/dim]")
+                    ttft = f", TTFT {event['ttft_s']:.2f}s" if event["ttft_s"] is not None else ""
+                    cost = f", ${event['cost_usd']:.4f}" if event["cost_usd"] is not None else ""
+                    console.print(
+                        f"[dim]Model: {event['model_latency_s']:.2f}s{ttft}; tokens: {event['prompt_tokens']} input "
+                        f"({event['cached_tokens']} cached), {event['completion_tokens']} output{cost}[/dim]"
+                    )
             
-            function_call_parts = []
+                for candidate in response.candidates:
+                    messages.append(candidate.content)
             
-            if response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        function_call_parts.append(part)
+                # Log the model turn before running its tools so an interrupted
+                # turn can be finished on resume
+                if session:
+                    session.sync(messages)
             
-            if function_call_parts:
-                function_call_count += len(function_call_parts)
-                function_response_parts = []
+                function_call_parts = []
+            
+                if response.candidates[0].content.parts:
+                    for part in response.candidates[0].content.parts:
+                        if hasattr(part, 'function_call') and part.function_call:
+                            function_call_parts.append(part)
+            
+                if function_call_parts:
+                    function_call_count += len(function_call_parts)
+                    function_response_parts = []
+                    # Leading idempotent MCP calls (e.g. several doc fetches) run concurrently
+                    pending_mcp = start_mcp_calls(function_call_parts)
                 
-                for part in function_call_parts:
-                    func_name = part.function_call.name
-                    func_args = dict(part.function_call.args)
+                    for index, part in enumerate(function_call_parts):
+                        func_name = part.function_call.name
+                        func_args = dict(part.function_call.args)
                     
-                    if func_name == "get_file_content":
-                        file_path = func_args.get("file_path", "")
-                        files_read.add(file_path)
-                    elif func_name == "write_file":
-                        file_path = func_args.get("file_path", "")
-                        files_modified.add(file_path)
+                        if func_name == "get_file_content":
+                            file_path = func_args.get("file_path", "")
+                            files_read.add(file_path)
+                        elif func_name == "write_file":
+                            file_path = func_args.get("file_path", "")
+                            files_modified.add(file_path)
                     
-                    result_part = call_function(part.function_call, working_directory, verbose)
-                    function_response_parts.append(result_part)
+                        with count_reads(prefetcher.counters if prefetcher else None):
+                            result_part = timed_call_function(
+                                part.function_call, working_directory, verbose, session, telemetry, memo,
+                                pending_mcp.get(index),
+                            )
+                        function_response_parts.append(result_part)
+                        if prefetcher:
+                            prefetcher.observe(func_name, func_args)
                 
-                combined_response = MockContent(
-                    role="tool",
-                    parts=function_response_parts
-                )
+                    combined_response = MockContent(
+                        role="tool",
+                        parts=function_response_parts
+                    )
                 
-                messages.append(combined_response)
+                    messages.append(combined_response)
                 
-                if verbose:
-                    console.print(f"[dim]Progress: {function_call_count} calls, {len(files_read)} files read, {len(files_modified)} files modified[/dim]")
+                    if verbose:
+                        console.print(f"[dim]Progress: {function_call_count} calls, {len(files_read)} files read, {len(files_modified)} files modified[/dim]")
                 
-                continue
+                    continue
             
-            if response.text:
-                is_asking = any(phrase in response.text.lower() for phrase in [
-                    "need more information",
-                    "please provide",
-                    "can you tell me",
-                    "what do you want",
-                ])
+                if response.text:
+                    is_asking = any(phrase in response.text.lower() for phrase in [
+                        "need more information",
+                        "please provide",
+                        "can you tell me",
+                        "what do you want",
+                    ])
                 
-                if is_asking and function_call_count == 0:
-                    if verbose:
-                        console.print("[yellow]Redirecting agent to take action...[/yellow]")
+                    if is_asking and function_call_count == 0:
+                        if verbose:
+                            console.print("[yellow]Redirecting agent to take action...[/yellow]")
                     
-                    messages.append(
-                        MockContent(
-                            role="user",
-                            parts=[MockPart(text="DO NOT ask questions. Start by calling get_files_info('.') to explore, then take action autonomously.")]
+                        messages.append(
+                            MockContent(
+                                role="user",
+                                parts=[MockPart(text="DO NOT ask questions. Start by calling get_files_info('.') to explore, then take action autonomously.")]
+                            )
                         )
-                    )
-                    continue
+                        continue
+                
+                    final_text = response.text
+                    console.print("\n[bold green]✓ Task Complete[/bold green]")
+                    if quiet_mode:
+                        console.print(response.text, markup=False)
+                    else:
+                        with span("render_result", "render"):
+                            console.print(Panel(Markdown(response.text), border_style="green"))
                 
-                console.print("\n[bold green]✓ Task Complete[/bold green]")
-                console.print(Panel(Markdown(response.text), border_style="green"))
+                    totals = telemetry.summary()
+                    console.print(f"\n[bold]Summary:[/bold]")
+                    console.print(f"  • Iterations: {iteration + 1}")
+                    console.print(f"  • Function calls: {function_call_count}")
+                    console.print(f"  • Files explored: {len(files_read)}")
+                    console.print(f"  • Files modified: {len(files_modified)}")
+                    if totals["prompt_tokens"]:
+                        console.print(
+                            f"  • Input tokens: {totals['prompt_tokens']} ({totals['cached_tokens']} cached, "
+                            f"{totals['cached_tokens'] / totals['prompt_tokens']:.0%})"
+                        )
+                    if totals["cost_usd"] is not None:
+                        console.print(f"  • Cost: ${totals['cost_usd']:.4f}")
+                    routing = totals["routing"]
+                    if routing:
+                        phases = ", ".join(f"{n} {phase}" for phase, n in sorted(routing["phases"].items()))
+                        saved = f", saved ${routing['savings_usd']:.4f}" if routing["savings_usd"] is not None else ""
+                        console.print(f"  • Routing: {phases}; {routing['escalations']} escalation(s){saved}")
                 
-                console.print(f"\n[bold]Summary:[/bold]")
-                console.print(f"  • Iterations: {iteration + 1}")
-                console.print(f"  • Function calls: {function_call_count}")
-                console.print(f"  • Files explored: {len(files_read)}")
-                console.print(f"  • Files modified: {len(files_modified)}")
+                    deduped = memo.stats()
+                    if deduped["hits"]:
+                        console.print(
+                            f"  • Repeated calls deduplicated: {deduped['hits']} "
+                            f"({deduped['chars_saved']} chars kept out of history)"
+                        )
                 
-                if files_modified:
-                    console.print(f"\n[bold cyan]Modified files:[/bold cyan]")
-                    for f in sorted(files_modified):
-                        console.print(f"  • {f}")
+                    if verbose and prefetcher:
+                        reads = prefetcher.stats()
+                        if reads["reads"]:
+                            console.print(
+                                f"  • Read cache: {reads['hits']}/{reads['reads']} hits ({reads['hit_rate']:.0%}), "
+                                f"{reads['prefetch_hits']} of {reads['prefetched']} prefetched files used"
+                            )
                 
-                break
+                    if verbose:
+                        print_mcp_stats()
+                
+                    if verbose:
+                        http = get_transport_stats().summary()
+                        console.print(
+                            f"  • HTTP: {http['requests']} requests, {http['new_connections']} new connections "
+                            f"(avg setup {http['avg_setup_ms']:.0f}ms), {http['reused_connections']} reused"
+                        )
+                
+                    if files_modified:
+                        console.print(f"\n[bold cyan]Modified files:[/bold cyan]")
+                        for f in sorted(files_modified):
+                            console.print(f"  • {f}")
+                
+                    break
             
-            if verbose:
-                console.print("[yellow]No response, continuing...[/yellow]")
+                if verbose:
+                    console.print("[yellow]No response, continuing...[/yellow]")
             
-            messages.append(
-                MockContent(
-                    role="user",
-                    parts=[MockPart(text="Continue with your analysis and implementation. If you're done, provide a final summary.")]
+                messages.append(
+                    MockContent(
+                        role="user",
+                        parts=[MockPart(text="Continue with your analysis and implementation. If you're done, provide a final summary.")]
+                    )
                 )
-            )
             
-        except Exception as e:
-            console.print(f"\n[red]Error: {e}[/red]")
-            if verbose:
-                import traceback
-                console.print(f"[dim]{traceback.format_exc()}[/dim]")
+            except Exception as e:
+                console.print(f"\n[red]Error: {e}[/red]")
+                if verbose:
+                    import traceback
+                    console.print(f"[dim]{traceback.format_exc()}[/dim]")
             
-            console.print("[yellow]Attempting to recover...[/yellow]")
-            messages.append(
-                MockContent(
-                    role="user",
-                    parts=[MockPart(text="There was an error. Please analyze what went wrong and try a different approach.")]
+                console.print("[yellow]Attempting to recover...[/yellow]")
+                messages.append(
+                    MockContent(
+                        role="user",
+                        parts=[MockPart(text="There was an error. Please analyze what went wrong and try a different approach.")]
+                    )
                 )
-            )
-            continue
+                continue
+        
+        status = "completed" if final_text is not None else "incomplete"
+    finally:
+        # Release the task's log file and prefetch thread however it ends
+        if session:
+            session.sync(messages)
+            session.close()
+        if prefetcher:
+            prefetcher.close()
+            telemetry.read_cache = prefetcher.stats()
+        telemetry.tool_memo = memo.stats()
+        totals = telemetry.finish(status)
     
-    if iteration == max_iterations - 1:
+    if MODEL_STATS_ENABLED:
+        try:
+            ModelStats().record_task(telemetry.iterations, status)
+        except OSError as e:
+            console.print(f"[yellow]Warning: Could not update model stats: {e}[/yellow]")
+    if verbose:
+        with span("render_summary", "render"):
+            render_summary_table(console, telemetry, totals)
+    
+    if final_text is None:
         console.print(f"\n[red]⚠ Safety limit reached ({max_iterations} iterations)[/red]")
         console.print("[yellow]The agent made significant progress but didn't complete. Summary:[/yellow]")
         console.print(f"  • Function calls: {function_call_count}")
         console.print(f"  • Files modified: {len(files_modified)}")
+        if session:
+            console.print(f"[dim]Continue with: codeagent --resume {session.session_id}[/dim]")
+    
+    return {
+        "status": status,
+        "iterations": iteration + 1,
+        "function_calls": function_call_count,
+        "files_read": sorted(files_read),
+        "files_modified": sorted(files_modified),
+        "prompt_tokens": totals["prompt_tokens"],
+        "cached_tokens": totals["cached_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "cost_usd": totals["cost_usd"],
+        "model_seconds": totals["model_s"],
+        "tool_seconds": totals["tool_s"],
+        "read_cache": totals["read_cache"],
+        "final_text": final_text,
+        "session_id": session.session_id if session else None,
+    }
 
 
 def interactive_mode(client_provider, working_directory):
@@ -531,8 +784,8 @@ def interactive_mode(client_provider, working_directory):
     console.print(BANNER.format(cwd=cwd_short), style="bold blue")
     
     if mcp_integration:
-        connected_servers = mcp_integration.get_connected_servers()
-        console.print(f"[green]🔌 MCP Servers: {', '.join(connected_servers)}[/green]")
+        available_servers = mcp_integration.get_available_servers()
+        console.print(f"[green]🔌 MCP Servers: {', '.join(available_servers)}[/green]")
     else:
         console.print("[yellow]⚠️  MCP not initialized (native functions only)[/yellow]")
     
@@ -569,6 +822,33 @@ def interactive_mode(client_provider, working_directory):
             break
 
 
+def batch_mode(client_provider, argv):
+    """Run a JSONL queue of tasks concurrently (headless)."""
+    from codeagent.batch import BoundedProvider, load_tasks, parse_batch_args, run_batch
+    
+    options = parse_batch_args(argv)
+    
+    # Headless: interleaved previews from concurrent tasks are just noise
+    global quiet_mode
+    if not options.verbose:
+        quiet_mode = True
+    try:
+        tasks = load_tasks(options.tasks_file, options.workdir_root)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Could not load tasks: {e}[/red]")
+        return
+    
+    # Every task shares one provider and the MCP connections; only the
+    # number of in-flight model requests is bounded
+    provider = BoundedProvider(client_provider, options.max_inflight)
+    
+    def run_task(task):
+        return process_request(provider, task.prompt, task.working_directory, options.verbose)
+    
+    run_batch(tasks, run_task, options.concurrency, options.output, options.template)
+    print_mcp_stats()
+
+
 async def initialize_mcp(servers=None):
     """Initialize MCP integration."""
     global mcp_integration
@@ -599,15 +879,16 @@ async def initialize_mcp(servers=None):
         mcp_integration = GentMCPIntegration()
         await mcp_integration.initialize(servers)
         
-        connected = mcp_integration.get_connected_servers()
-        if connected:
+        available = mcp_integration.get_available_servers()
+        if available:
             console.print("[green]✓ MCP integration ready![/green]")
-            console.print(f"[green]Connected servers: {', '.join(connected)}[/green]")
+            console.print(f"[green]MCP servers: {', '.join(available)}[/green]")
             
-            for server in connected:
+            for server in available:
                 info = mcp_integration.get_server_info(server)
                 if info:
-                    console.print(f"  • {server}: {info['tools']} tools available")
+                    state = "connected" if info["connected"] else "connects on first use"
+                    console.print(f"  • {server}: {info['tools']} tools available ({state})")
         else:
             console.print("[yellow]⚠️  No MCP servers connected[/yellow]")
             console.print("[yellow]Continuing with native functions only...[/yellow]")
@@ -634,20 +915,143 @@ async def shutdown_mcp():
             mcp_integration = None
 
 
+def write_trace(path):
+    """Export the recorded trace and print where the time went."""
+    try:
+        export_chrome_trace(path)
+    except OSError as e:
+        console.print(f"[yellow]Warning: Could not write trace: {e}[/yellow]")
+        return
+    
+    console.print(f"\n[bold]Trace written to {path}[/bold] [dim](open in https://ui.perfetto.dev)[/dim]")
+    for name, count, ms in trace_summary():
+        console.print(f"  • {name}: {ms:.0f}ms over {count} span(s)")
+    
+    profiler = get_profiler()
+    if profiler and profiler.samples:
+        console.print(f"\n[bold]Hottest frames ({len(profiler.samples)} samples):[/bold]")
+        for frame, count in profiler.top_functions(10):
+            console.print(f"  • {frame}: {count}")
+
+
+def pop_option(args, flag):
+    """Remove ``flag VALUE`` from args and return VALUE (None if absent)."""
+    if flag not in args:
+        return None
+    idx = args.index(flag)
+    args.pop(idx)
+    return args.pop(idx) if idx < len(args) else None
+
+
+def create_client(args):
+    """Model provider for this run: OpenRouter, or a cassette (--record/--replay)."""
+    from codeagent.replay import RecordingProvider, ReplayProvider
+    
+    replay_path = pop_option(args, "--replay")
+    record_path = pop_option(args, "--record")
+    # --cheap-model ID: route exploration/verification turns to a cheaper model
+    cheap_model = pop_option(args, "--cheap-model")
+    
+    # --auto-model [POLICY]: choose the model without prompting
+    policy = None
+    if "--auto-model" in args:
+        idx = args.index("--auto-model")
+        args.pop(idx)
+        policy = args.pop(idx) if idx < len(args) and args[idx] in POLICIES else MODEL_POLICY
+    
+    if replay_path:
+        try:
+            client = ReplayProvider.load(replay_path)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Could not load cassette: {e}[/red]")
+            sys.exit(1)
+        console.print(f"[dim]Replaying {len(client.cassette.interactions)} recorded model call(s) from {replay_path}[/dim]\n")
+        if cheap_model:
+            console.print("[yellow]--cheap-model is ignored with --replay: the cassette fixes each call's model[/yellow]")
+        return client
+    
+    # Initialize OpenRouter client (will prompt for model selection)
+    try:
+        client = initialize_openrouter(policy=policy)
+    except Exception as e:
+        console.print(f"[red]Failed to initialize OpenRouter: {e}[/red]")
+        sys.exit(1)
+    
+    if record_path:
+        console.print(f"[dim]Recording model calls to {record_path}[/dim]\n")
+        client = RecordingProvider(client, record_path)
+    
+    cheap_model = cheap_model or CHEAP_MODEL
+    if cheap_model and cheap_model != client.model_id:
+        client = RoutedProvider(client, cheap_model)
+    return client
+
+
 def main():
     """Main entry point for the CLI."""
+    global quiet_mode
     working_directory = os.getcwd()
+    args = sys.argv[1:]
+    client = create_client(args)
     
     try:
-        asyncio.run(initialize_mcp())
+        run_mcp(initialize_mcp())
     except Exception as e:
         console.print(f"[yellow]⚠️  Could not initialize MCP: {e}[/yellow]")
         console.print("[yellow]Continuing with native functions only...[/yellow]")
     
+    trace_file = TRACE_FILE
     try:
-        if len(sys.argv) > 1:
-            command = " ".join(sys.argv[1:])
-            verbose = "--verbose" in sys.argv
+        # --resume [SESSION_ID]: continue a saved session (latest if no id)
+        resume_id = None
+        if "--resume" in args:
+            idx = args.index("--resume")
+            args.pop(idx)
+            resume_id = "latest"
+            if idx < len(args) and re.fullmatch(r"\d{8}-\d{6}-[0-9a-f]{6}|latest", args[idx]):
+                resume_id = args.pop(idx)
+        
+        # --trace FILE / --profile: record spans (and stack samples) to a
+        # Chrome trace-event JSON file, written at exit
+        trace_file = pop_option(args, "--trace") or trace_file
+        profile = "--profile" in args
+        if profile:
+            args.remove("--profile")
+            trace_file = trace_file or "gent-trace.json"
+        if trace_file:
+            start_tracing(profile)
+        
+        # --quiet: headless output, no previews or Markdown rendering
+        if "--quiet" in args:
+            args.remove("--quiet")
+            quiet_mode = True
+        
+        # --telemetry FILE: append per-iteration events to a JSONL file
+        telemetry_file = pop_option(args, "--telemetry")
+        if telemetry_file:
+            set_default_sink(telemetry_file)
+        
+        if "--daemon" in args:
+            # Serve tasks from the thin client (codeagent.client) until stopped
+            from codeagent.daemon import AgentDaemon
+            try:
+                AgentDaemon(client).serve()
+            except (OSError, RuntimeError) as e:
+                console.print(f"[red]Could not start daemon: {e}[/red]")
+        elif "--batch" in args:
+            batch_mode(client, args)
+        elif resume_id:
+            verbose = "--verbose" in args
+            command = " ".join(a for a in args if a != "--verbose").strip()
+            try:
+                session = SessionStore.open(working_directory, resume_id)
+            except (OSError, ValueError) as e:
+                console.print(f"[red]Could not resume session: {e}[/red]")
+                return
+            process_request(client, command, working_directory, verbose, session=session)
+        elif args:
+            command = " ".join(args)
+            verbose = "--verbose" in args
             if verbose:
                 command = command.replace("--verbose", "").strip()
             
@@ -658,9 +1062,12 @@ def main():
     finally:
         if mcp_integration:
             try:
-                asyncio.run(shutdown_mcp())
+                run_mcp(shutdown_mcp())
             except:
                 pass
+        close_http_clients()
+        if trace_file:
+            write_trace(trace_file)
 
 
 if __name__ == "__main__":
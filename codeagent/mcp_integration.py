@@ -6,12 +6,27 @@
 # =============================================================================
 
 import asyncio
+import hashlib
+import json
 import os
+import time
 import warnings
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+import statistics
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from codeagent.config import (
+    MCP_IDLE_TIMEOUT,
+    MCP_LAZY_CONNECT,
+    MCP_MAX_CONCURRENCY,
+    MCP_PING_INTERVAL,
+    MCP_RECONNECT_BASE_DELAY,
+    MCP_RECONNECT_MAX_DELAY,
+    MCP_SCHEMA_CACHE,
+)
+from codeagent.output_shaping import spill_binary
+
 # Suppress specific MCP warnings
 warnings.filterwarnings("ignore", category=RuntimeWarning, message=".*cancel scope.*")
 
@@ -53,6 +68,11 @@ class MCPServerConfig:
     # Optional settings
     auto_approve_tools: bool = False
     timeout: int = 60
+    max_concurrency: int = MCP_MAX_CONCURRENCY  # requests in flight on the session
+    
+    # Tools safe to retry after a reconnect ("*" for all); tools the server
+    # annotates as read-only or idempotent are retried as well
+    idempotent_tools: Optional[List[str]] = None
 
 
 # =============================================================================
@@ -65,6 +85,7 @@ PRELOADED_SERVERS = {
         transport=TransportType.SSE,
         url="https://mcp.context7.com/sse",
         auto_approve_tools=True,
+        idempotent_tools=["*"],  # documentation lookups
     ),
     
     "filesystem": MCPServerConfig(
@@ -97,6 +118,7 @@ PRELOADED_SERVERS = {
         command="npx",
         args=["-y", "markitdown-mcp-npx"],  # NPX wrapper, no Python setup needed
         auto_approve_tools=True,
+        idempotent_tools=["*"],  # conversions
     ),
     
     "github": MCPServerConfig(
@@ -115,6 +137,7 @@ PRELOADED_SERVERS = {
         args=["-y", "@modelcontextprotocol/server-brave-search"],
         env={"BRAVE_API_KEY": os.getenv("BRAVE_API_KEY", "")},
         auto_approve_tools=True,
+        idempotent_tools=["*"],  # searches
     ),
 }
 
@@ -124,123 +147,272 @@ PRELOADED_SERVERS = {
 # =============================================================================
 
 class MCPClient:
-    """Wrapper for an MCP server client session."""
+    """Wrapper for an MCP server client session.
+    
+    Tools and resources are listed at connect time and listed again when the
+    server sends a tools/resources list_changed notification; ``on_change``
+    is then called with the client and the kind ("tools" or "resources").
+    """
     
-    def __init__(self, config: MCPServerConfig):
+    def __init__(self, config: MCPServerConfig,
+                 on_change: Optional[Callable[["MCPClient", str], None]] = None):
         self.config = config
+        self.on_change = on_change
         self.session: Optional[ClientSession] = None
+        self.capabilities: Any = None
         self.available_tools: List[Dict[str, Any]] = []
         self.available_resources: List[Dict[str, Any]] = []
-        self._context_manager = None
+        self._stale: Set[str] = set()
+        self._refresher: Optional[asyncio.Task] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
         
     async def connect(self):
         """Connect to the MCP server."""
         if not MCP_AVAILABLE:
             raise RuntimeError("MCP SDK not installed")
         
+        # The transport and session contexts are entered and exited by one
+        # owner task, so the connection can be closed from any later call
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error = None
+        self._runner = asyncio.create_task(self._run())
+        
         try:
-            if self.config.transport == TransportType.STDIO:
-                await self._connect_stdio()
-            elif self.config.transport == TransportType.SSE:
-                await self._connect_sse()
-            else:
-                raise ValueError(f"Unsupported transport: {self.config.transport}")
-            
-            # Initialize session and discover capabilities
-            await self.session.initialize()
-            await self._discover_capabilities()
+            await asyncio.wait_for(self._ready.wait(), self.config.timeout)
+            if self._error:
+                raise self._error
             
             print(f"✓ Connected to MCP server: {self.config.name}")
             print(f"  Tools: {len(self.available_tools)}")
             
         except Exception as e:
+            self._runner.cancel()
             print(f"✗ Failed to connect to {self.config.name}: {e}")
             raise
     
-    async def _connect_stdio(self):
-        """Connect via stdio transport."""
-        server_params = StdioServerParameters(
-            command=self.config.command,
-            args=self.config.args or [],
-            env=self.config.env,
-        )
-        
-        # Store the context manager
-        self._context_manager = stdio_client(server_params)
-        read_stream, write_stream = await self._context_manager.__aenter__()
-        
-        self.session = ClientSession(read_stream, write_stream)
-        await self.session.__aenter__()
-    
-    async def _connect_sse(self):
-        """Connect via SSE transport."""
-        # Store the context manager
-        self._context_manager = sse_client(
-            self.config.url,
-            headers=self.config.headers or {}
-        )
-        read_stream, write_stream = await self._context_manager.__aenter__()
-        
-        self.session = ClientSession(read_stream, write_stream)
-        await self.session.__aenter__()
+    def _transport(self):
+        """Transport context manager yielding (read_stream, write_stream)."""
+        if self.config.transport == TransportType.STDIO:
+            server_params = StdioServerParameters(
+                command=self.config.command,
+                args=self.config.args or [],
+                env=self.config.env,
+            )
+            return stdio_client(server_params)
+        if self.config.transport == TransportType.SSE:
+            return sse_client(self.config.url, headers=self.config.headers or {})
+        raise ValueError(f"Unsupported transport: {self.config.transport}")
+    
+    async def _run(self):
+        """Owner task: open the connection, serve until asked to stop, close it."""
+        try:
+            async with self._transport() as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream, message_handler=self._on_message) as session:
+                    # Initialize session and discover capabilities
+                    initialized = await session.initialize()
+                    self.capabilities = initialized.capabilities
+                    self.session = session
+                    await self._discover_capabilities()
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+    
+    @property
+    def connected(self) -> bool:
+        return self.session is not None
     
     async def _discover_capabilities(self):
-        """Discover available tools from the server."""
-        # List tools
+        """Discover available tools and resources from the server."""
         try:
-            tools_response = await self.session.list_tools()
-            self.available_tools = [
-                {
-                    "name": tool.name,
-                    "description": tool.description or f"Tool: {tool.name}",
-                    "input_schema": tool.inputSchema if hasattr(tool, 'inputSchema') else {},
-                    "server": self.config.name,
-                }
-                for tool in tools_response.tools
-            ]
+            await self._list_tools()
         except Exception as e:
             print(f"Warning: Could not list tools from {self.config.name}: {e}")
             self.available_tools = []
+        
+        if getattr(self.capabilities, "resources", None) is not None:
+            try:
+                await self._list_resources()
+            except Exception as e:
+                print(f"Warning: Could not list resources from {self.config.name}: {e}")
+                self.available_resources = []
+    
+    async def _list_tools(self):
+        tools_response = await self.session.list_tools()
+        self.available_tools = [
+            {
+                "name": tool.name,
+                "description": tool.description or f"Tool: {tool.name}",
+                "input_schema": tool.inputSchema if hasattr(tool, 'inputSchema') else {},
+                "server": self.config.name,
+                "idempotent": _is_idempotent(getattr(tool, "annotations", None)),
+            }
+            for tool in tools_response.tools
+        ]
+    
+    async def _list_resources(self):
+        resources_response = await self.session.list_resources()
+        self.available_resources = [
+            {
+                "uri": str(resource.uri),
+                "name": resource.name,
+                "description": resource.description or "",
+                "mime_type": resource.mimeType,
+                "server": self.config.name,
+            }
+            for resource in resources_response.resources
+        ]
+    
+    async def _on_message(self, message: Any):
+        """Session message handler: note list_changed notifications and refresh."""
+        root = getattr(message, "root", None)
+        if isinstance(root, types.ToolListChangedNotification):
+            self._stale.add("tools")
+        elif isinstance(root, types.ResourceListChangedNotification):
+            self._stale.add("resources")
+        else:
+            return
+        # Requests can't be awaited from the session's receive loop, which is
+        # running this handler; a burst of notifications shares one refresh
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_stale())
+    
+    async def _refresh_stale(self):
+        """List again whatever the server said changed; keeps the old list on failure."""
+        while self._stale and self.session is not None:
+            kind = self._stale.pop()
+            try:
+                if kind == "tools":
+                    await self._list_tools()
+                else:
+                    await self._list_resources()
+            except Exception as e:
+                print(f"Warning: Could not refresh {kind} from {self.config.name}: {e}")
+                continue
+            if self.on_change:
+                self.on_change(self, kind)
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a tool on the MCP server."""
-        try:
-            result = await self.session.call_tool(tool_name, arguments)
-            
-            # Extract content from result
-            if result.content:
-                if len(result.content) == 1:
-                    content_item = result.content[0]
-                    if hasattr(content_item, 'text'):
-                        return content_item.text
-                    elif hasattr(content_item, 'data'):
-                        return {"type": "image", "data": content_item.data}
-                
-                # Multiple content items
-                return [
-                    item.text if hasattr(item, 'text') else str(item)
-                    for item in result.content
-                ]
+        """Call a tool on the MCP server (raises if the call fails; see MCPManager)."""
+        if self.session is None:
+            raise ConnectionError(f"not connected to {self.config.name}")
+        
+        result = await self.session.call_tool(tool_name, arguments)
+        
+        # Extract content from result
+        if result.content:
+            if len(result.content) == 1:
+                return _content_text(result.content[0])
             
+            # Multiple content items
+            return [_content_text(item) for item in result.content]
+        
+        return None
+    
+    async def ping(self, timeout: float = 10.0) -> Optional[float]:
+        """Round-trip time of an MCP ping in ms, or None if the server doesn't answer."""
+        session = self.session
+        if session is None:
             return None
-            
-        except Exception as e:
-            return f"Error calling tool {tool_name}: {str(e)}"
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout)
+        except Exception:
+            return None
+        return (time.perf_counter() - started) * 1000
     
     async def disconnect(self):
-        """Disconnect from the MCP server."""
-        # Suppress cleanup errors - they don't affect functionality
-        try:
-            if self.session:
-                await self.session.__aexit__(None, None, None)
-        except (RuntimeError, GeneratorExit, Exception):
-            pass  # Ignore cleanup errors
-        
+        """Disconnect from the MCP server (stops a stdio server's child process)."""
+        if self._runner is None:
+            return
+        if self._refresher:
+            self._refresher.cancel()
+        self._stop.set()
         try:
-            if self._context_manager:
-                await self._context_manager.__aexit__(None, None, None)
-        except (RuntimeError, GeneratorExit, Exception):
-            pass  # Ignore cleanup errors
+            await asyncio.wait_for(self._runner, timeout=10)
+        except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+            self._runner.cancel()  # Ignore cleanup errors
+        self._runner = None
+
+
+def _content_text(item: Any) -> str:
+    """Text for one MCP content item; binary content is spilled to the blob store."""
+    if hasattr(item, 'text'):
+        return item.text
+    if hasattr(item, 'data'):
+        # Image / audio content: base64 that must not reach the conversation
+        return spill_binary(item.data, getattr(item, 'mimeType', None))
+    resource = getattr(item, 'resource', None)
+    if resource is not None:
+        if hasattr(resource, 'text'):
+            return resource.text
+        if hasattr(resource, 'blob'):
+            return spill_binary(resource.blob, getattr(resource, 'mimeType', None))
+    return str(item)
+
+
+def _is_idempotent(annotations: Any) -> bool:
+    """Whether a tool's MCP annotations make it safe to call twice."""
+    if annotations is None:
+        return False
+    return bool(getattr(annotations, "readOnlyHint", False) or getattr(annotations, "idempotentHint", False))
+
+
+# Call latencies kept per server
+LATENCY_WINDOW = 100
+
+
+@dataclass
+class ServerHealth:
+    """Availability and latency of one MCP server over the session."""
+    available: bool = False
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    reconnects: int = 0
+    connected_once: bool = False
+    consecutive_failures: int = 0
+    retry_at: float = 0.0
+    last_error: Optional[str] = None
+    ping_ms: Optional[float] = None
+    latencies_ms: List[float] = field(default_factory=list)
+    
+    def record_call(self, ms: float):
+        self.calls += 1
+        self.latencies_ms = (self.latencies_ms + [ms])[-LATENCY_WINDOW:]
+    
+    def record_failure(self, error: Exception):
+        self.available = False
+        self.consecutive_failures += 1
+        self.last_error = str(error) or type(error).__name__
+        # Fail fast until the backoff expires instead of hammering a dead server
+        delay = min(MCP_RECONNECT_MAX_DELAY, MCP_RECONNECT_BASE_DELAY * 2 ** (self.consecutive_failures - 1))
+        self.retry_at = time.monotonic() + delay
+    
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "available": self.available,
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "reconnects": self.reconnects,
+            "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+            "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else None,
+            "ping_ms": round(self.ping_ms, 1) if self.ping_ms is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class MCPUnavailable(Exception):
+    """A server is down and its reconnect backoff has not expired yet."""
 
 
 # =============================================================================
@@ -248,10 +420,45 @@ class MCPClient:
 # =============================================================================
 
 class MCPManager:
-    """Manages multiple MCP server connections."""
-    
-    def __init__(self):
+    """
+    Manages multiple MCP server connections.
+    
+    Servers whose tool schemas are in the on-disk schema cache are not
+    connected at startup: their tools are offered from the cache and the
+    server is connected on the first call to one of them. Servers idle for
+    longer than the idle timeout are disconnected (and reconnected on their
+    next call).
+    
+    A supervisor pings connected servers; a server that stops answering,
+    or whose connection drops during a call, is reconnected with
+    exponential backoff, and calls to idempotent tools are retried once on
+    the new connection. Per-server availability and latency are kept in
+    ``health``.
+    
+    Calls are not serialized per session: up to ``max_concurrency`` requests
+    per server are in flight at once (call_tools runs a batch of them and
+    yields results as they complete).
+    """
+    
+    def __init__(self, lazy: bool = MCP_LAZY_CONNECT, idle_timeout: float = MCP_IDLE_TIMEOUT,
+                 schema_cache: str = MCP_SCHEMA_CACHE, ping_interval: float = MCP_PING_INTERVAL):
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.schema_cache = schema_cache
         self.clients: Dict[str, MCPClient] = {}
+        self.configs: Dict[str, MCPServerConfig] = {}
+        # Tool schemas per server, from the cache or a live connection
+        self.tools: Dict[str, List[Dict[str, Any]]] = {}
+        self.last_used: Dict[str, float] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.resources: Dict[str, List[Dict[str, Any]]] = {}
+        self.health: Dict[str, ServerHealth] = {}
+        # Bumped whenever any server's tool list changes
+        self.tools_version = 0
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._supervisor: Optional[asyncio.Task] = None
     
     async def initialize(self, server_names: Optional[List[str]] = None):
         """Initialize MCP servers."""
@@ -264,45 +471,262 @@ class MCPManager:
         
         print(f"\n🔌 Initializing {len(server_names)} MCP server(s)...")
         
+        cached = self._load_schema_cache() if self.lazy else {}
         for server_name in server_names:
             if server_name not in PRELOADED_SERVERS:
                 print(f"⚠️  Unknown server: {server_name}")
                 continue
             
             config = PRELOADED_SERVERS[server_name]
-            client = MCPClient(config)
+            self.configs[server_name] = config
+            self.health.setdefault(server_name, ServerHealth())
+            entry = cached.get(server_name)
+            if entry and entry.get("fingerprint") == _config_fingerprint(config):
+                self._set_tools(server_name, entry["tools"])
+                print(f"✓ {server_name}: {len(entry['tools'])} tools (connects on first use)")
+                continue
             
+            # Never discovered (or its configuration changed): connect now
             try:
-                await client.connect()
-                self.clients[server_name] = client
+                await self.connect(server_name)
             except Exception as e:
                 print(f"Failed to initialize {server_name}: {e}")
                 # Continue with other servers
+        
+        if (self.idle_timeout > 0 or self.ping_interval > 0) and self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise_forever())
+    
+    async def connect(self, server_name: str) -> "MCPClient":
+        """Connected client for a server, connecting it if needed."""
+        lock = self._connect_locks.setdefault(server_name, asyncio.Lock())
+        health = self.health.setdefault(server_name, ServerHealth())
+        async with lock:
+            client = self.clients.get(server_name)
+            if client and client.connected:
+                return client
+            if client:
+                # The connection died (child exited, stream dropped)
+                await self._drop(server_name, client)
+            
+            wait = health.retry_at - time.monotonic()
+            if wait > 0:
+                raise MCPUnavailable(f"{server_name} is unavailable (retrying in {wait:.0f}s): {health.last_error}")
+            
+            client = MCPClient(self.configs[server_name], on_change=self._on_list_changed)
+            try:
+                await client.connect()
+            except Exception as e:
+                health.record_failure(e)
+                raise
+            
+            if health.connected_once:
+                health.reconnects += 1
+            health.connected_once = True
+            health.available = True
+            health.consecutive_failures = 0
+            self.clients[server_name] = client
+            self._set_tools(server_name, client.available_tools)
+            self.resources[server_name] = client.available_resources
+            self.last_used[server_name] = time.monotonic()
+            self._save_schema_cache()
+            return client
+    
+    def _set_tools(self, server_name: str, tools: List[Dict[str, Any]]):
+        if self.tools.get(server_name) != tools:
+            self.tools[server_name] = tools
+            self.tools_version += 1
+    
+    def _on_list_changed(self, client: "MCPClient", kind: str):
+        """A connected server changed its tools or resources; take only its new lists."""
+        server_name = client.config.name
+        if self.clients.get(server_name) is not client:
+            return
+        if kind == "tools":
+            self._set_tools(server_name, client.available_tools)
+            self._save_schema_cache()
+            print(f"↻ {server_name}: tool list changed ({len(client.available_tools)} tools)")
+        else:
+            self.resources[server_name] = client.available_resources
+    
+    async def _drop(self, server_name: str, client: "MCPClient"):
+        if self.clients.get(server_name) is client:
+            del self.clients[server_name]
+        await client.disconnect()
+    
+    def is_idempotent(self, server_name: str, tool_name: str) -> bool:
+        allowed = self.configs[server_name].idempotent_tools or []
+        if "*" in allowed or tool_name in allowed:
+            return True
+        return any(t["name"] == tool_name and t.get("idempotent") for t in self.tools.get(server_name, []))
     
     def get_all_tools(self) -> List[Dict[str, Any]]:
-        """Get all available tools from all connected servers."""
+        """Get all available tools from all servers (connected or not)."""
         all_tools = []
-        for client in self.clients.values():
-            all_tools.extend(client.available_tools)
+        for tools in self.tools.values():
+            all_tools.extend(tools)
         return all_tools
     
-    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a tool on the appropriate MCP server."""
-        for client in self.clients.values():
-            for tool in client.available_tools:
-                if tool["name"] == tool_name:
-                    return await client.call_tool(tool_name, arguments)
+    def find_server(self, tool_name: str) -> Optional[str]:
+        for server_name, tools in self.tools.items():
+            if any(tool["name"] == tool_name for tool in tools):
+                return server_name
+        return None
+    
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any],
+                        server_name: Optional[str] = None) -> Any:
+        """Call a tool on the appropriate MCP server, connecting it on first use."""
+        server_name = server_name or self.find_server(tool_name)
+        if server_name is None:
+            return f"Tool {tool_name} not found in any connected MCP server"
         
-        return f"Tool {tool_name} not found in any connected MCP server"
+        health = self.health.setdefault(server_name, ServerHealth())
+        attempts = 2 if self.is_idempotent(server_name, tool_name) else 1
+        for attempt in range(attempts):
+            try:
+                client = await self.connect(server_name)
+            except Exception as e:
+                health.errors += 1
+                return f"Error calling tool {tool_name}: could not connect to {server_name}: {e}"
+            
+            slots = self._slots.setdefault(server_name, asyncio.Semaphore(max(1, client.config.max_concurrency)))
+            self.in_flight[server_name] = self.in_flight.get(server_name, 0) + 1
+            try:
+                async with slots:
+                    # Latency and the timeout exclude time queued for a slot
+                    started = time.perf_counter()
+                    result = await asyncio.wait_for(client.call_tool(tool_name, arguments), client.config.timeout)
+                health.record_call((time.perf_counter() - started) * 1000)
+                return result
+            except Exception as e:
+                health.errors += 1
+                health.last_error = str(e) or type(e).__name__
+                # A server that still answers pings failed the call itself
+                if await client.ping(timeout=5) is not None:
+                    return f"Error calling tool {tool_name}: {health.last_error}"
+                
+                print(f"⚠️  Lost connection to MCP server {server_name}: {health.last_error}")
+                health.available = False
+                await self._drop(server_name, client)
+                if attempt + 1 < attempts:
+                    health.retries += 1
+                    continue
+                retried = "" if attempts > 1 else " (not retried: the tool may not be idempotent)"
+                return f"Error calling tool {tool_name}: connection to {server_name} lost{retried}: {health.last_error}"
+            finally:
+                self.in_flight[server_name] -= 1
+                self.last_used[server_name] = time.monotonic()
+    
+    async def reap_idle(self):
+        """Disconnect servers with no call in flight and none for ``idle_timeout`` seconds."""
+        now = time.monotonic()
+        for server_name, client in list(self.clients.items()):
+            idle = now - self.last_used.get(server_name, now)
+            if self.in_flight.get(server_name, 0) == 0 and idle >= self.idle_timeout:
+                print(f"🔌 Disconnecting idle MCP server: {server_name} (idle {idle:.0f}s)")
+                del self.clients[server_name]
+                await client.disconnect()
+    
+    async def call_tools(self, calls: List[Tuple[str, Dict[str, Any], Optional[str]]]) -> AsyncIterator[Tuple[int, Any]]:
+        """Run (tool_name, arguments, server_name) calls concurrently.
+        
+        Yields (index, result) pairs in completion order; each call is
+        subject to its server's concurrency limit.
+        """
+        async def run(index: int, tool_name: str, arguments: Dict[str, Any], server_name: Optional[str]):
+            try:
+                return index, await self.call_tool(tool_name, arguments, server_name)
+            except Exception as e:
+                return index, f"Error calling tool {tool_name}: {e}"
+        
+        for done in asyncio.as_completed([run(i, *call) for i, call in enumerate(calls)]):
+            yield await done
+    
+    async def check_health(self):
+        """Ping connected servers; reconnect (with backoff) any that stopped answering."""
+        for server_name, client in list(self.clients.items()):
+            ping_ms = await client.ping()
+            health = self.health[server_name]
+            if ping_ms is not None:
+                health.ping_ms = ping_ms
+                health.available = True
+                continue
+            if self.in_flight.get(server_name, 0):
+                continue  # a long call may be holding a single-threaded server
+            
+            print(f"⚠️  MCP server {server_name} is not responding; reconnecting")
+            health.record_failure(ConnectionError("ping failed"))
+            health.retry_at = 0.0  # first reconnect right away
+            await self._drop(server_name, client)
+            try:
+                await self.connect(server_name)
+            except Exception:
+                pass  # backoff recorded; retried on the next check or call
+    
+    async def _supervise_forever(self):
+        intervals = [i for i in (self.ping_interval, self.idle_timeout / 2) if i > 0]
+        while True:
+            await asyncio.sleep(max(1.0, min(intervals + [30.0])))
+            try:
+                if self.idle_timeout > 0:
+                    await self.reap_idle()
+                if self.ping_interval > 0:
+                    await self.check_health()
+            except Exception as e:
+                print(f"Warning: MCP supervisor: {e}")
+    
+    def server_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Availability, call counts and latency per server."""
+        stats = {}
+        for server_name, health in self.health.items():
+            stats[server_name] = {**health.summary(), "connected": server_name in self.clients}
+        return stats
+    
+    def _load_schema_cache(self) -> Dict[str, Any]:
+        try:
+            with open(self.schema_cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_schema_cache(self):
+        data = self._load_schema_cache()
+        for server_name, tools in self.tools.items():
+            data[server_name] = {
+                "fingerprint": _config_fingerprint(self.configs[server_name]),
+                "tools": tools,
+                "updated": time.time(),
+            }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.schema_cache)), exist_ok=True)
+            tmp = f"{self.schema_cache}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.schema_cache)
+        except OSError as e:
+            print(f"Warning: Could not write MCP schema cache: {e}")
     
     async def shutdown(self):
         """Disconnect from all MCP servers."""
-        print("\n🔌 Disconnecting from MCP servers...")
+        if self._supervisor:
+            self._supervisor.cancel()
+            self._supervisor = None
+        if self.clients:
+            print("\n🔌 Disconnecting from MCP servers...")
         for client in self.clients.values():
             await client.disconnect()
         self.clients.clear()
 
 
+def _config_fingerprint(config: MCPServerConfig) -> str:
+    """Hash of what determines a server's tools (env values left out: secrets)."""
+    payload = json.dumps(
+        [config.transport.value, config.command, config.args, config.url, sorted(config.env or {})],
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
 # =============================================================================
 # GEMINI FUNCTION CONVERSION - SIMPLIFIED
 # =============================================================================
@@ -362,43 +786,98 @@ class GentMCPIntegration:
     def __init__(self):
         self.manager = MCPManager()
         self.converter = MCPToGeminiConverter()
+        # server -> (the manager's tool list, its converted functions)
+        self._converted: Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {}
     
     async def initialize(self, server_names: Optional[List[str]] = None):
         """Initialize MCP servers."""
         await self.manager.initialize(server_names)
     
+    @property
+    def tools_version(self) -> int:
+        """Changes whenever the set of MCP tools (and so get_gemini_functions) changes."""
+        return self.manager.tools_version
+    
     def get_gemini_functions(self) -> List[Dict[str, Any]]:
-        """Get all MCP tools as Gemini function declarations."""
-        mcp_tools = self.manager.get_all_tools()
-        return self.converter.convert_tools_to_gemini(mcp_tools)
+        """Get all MCP tools as Gemini function declarations.
+        
+        Conversions are cached per server; a server whose tool list changed
+        is the only one converted again.
+        """
+        functions = []
+        for server_name, tools in list(self.manager.tools.items()):
+            cached = self._converted.get(server_name)
+            if cached is None or cached[0] is not tools:
+                cached = (tools, self.converter.convert_tools_to_gemini(tools))
+                self._converted[server_name] = cached
+            functions.extend(cached[1])
+        return functions
     
     async def handle_function_call(self, function_call: Dict[str, Any]) -> Any:
         """Handle a function call from Gemini that might be an MCP tool."""
         function_name = function_call.get("name", "")
         
         if function_name.startswith("mcp_"):
-            tool_name, arguments = self.converter.extract_mcp_call(function_call)
-            return await self.manager.call_tool(tool_name, arguments)
+            tool_name, arguments, server_name = self._resolve(function_call)
+            return await self.manager.call_tool(tool_name, arguments, server_name)
         
         return None
     
+    async def handle_function_calls(self, function_calls: List[Dict[str, Any]]) -> AsyncIterator[Tuple[int, Any]]:
+        """Run several MCP function calls concurrently; yields (index, result) as each completes."""
+        calls = [self._resolve(function_call) for function_call in function_calls]
+        async for index, result in self.manager.call_tools(calls):
+            yield index, result
+    
+    def is_idempotent(self, function_call: Dict[str, Any]) -> bool:
+        """Whether an MCP function call is safe to run early or concurrently with others."""
+        tool_name, _, server_name = self._resolve(function_call)
+        server_name = server_name or self.manager.find_server(tool_name)
+        return server_name in self.manager.configs and self.manager.is_idempotent(server_name, tool_name)
+    
+    def _resolve(self, function_call: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        """(tool name, arguments, server) for a Gemini function call."""
+        route = self._routes().get(function_call.get("name", ""))
+        if route:
+            server_name, tool_name = route
+            return tool_name, function_call.get("args", {}), server_name
+        tool_name, arguments = self.converter.extract_mcp_call(function_call)
+        return tool_name, arguments, None
+    
     async def shutdown(self):
         """Shutdown all MCP connections."""
         await self.manager.shutdown()
     
+    def _routes(self) -> Dict[str, tuple]:
+        """Gemini function name -> (server, original MCP tool name)."""
+        return {
+            f["name"]: (f["_mcp_server"], f["_mcp_original_name"])
+            for f in self.get_gemini_functions()
+        }
+    
     def get_connected_servers(self) -> List[str]:
         """Get list of currently connected servers."""
-        return list(self.manager.clients.keys())
+        return [name for name, client in self.manager.clients.items() if client.connected]
+    
+    def get_server_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server availability and latency stats for this session."""
+        return self.manager.server_stats()
+    
+    def get_available_servers(self) -> List[str]:
+        """Servers whose tools are offered (connected now or on first use)."""
+        return list(self.manager.tools.keys())
     
     def get_server_info(self, server_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific server."""
-        if server_name in self.manager.clients:
-            client = self.manager.clients[server_name]
+        if server_name in self.manager.tools:
+            tools = self.manager.tools[server_name]
             return {
                 "name": server_name,
-                "transport": client.config.transport.value,
-                "tools": len(client.available_tools),
-                "tool_list": [t["name"] for t in client.available_tools],
+                "transport": self.manager.configs[server_name].transport.value,
+                "tools": len(tools),
+                "tool_list": [t["name"] for t in tools],
+                "resources": len(self.manager.resources.get(server_name, [])),
+                "connected": server_name in self.get_connected_servers(),
             }
         return None
 
@@ -444,4 +923,4 @@ async def test_mcp():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_mcp())
\ No newline at end of file
+    asyncio.run(test_mcp())
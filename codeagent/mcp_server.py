@@ -0,0 +1,170 @@
+"""
+Gent MCP Server
+===============
+Serves Gent's native tools (get_files_info, get_file_content,
+run_python_file, write_file, read_tool_output) to any MCP client, backed by
+the same read cache, prefetcher and file index the agent uses, plus tools
+that query the index directly (find_files, resolve_import, find_tests).
+
+  codeagent --mcp-server [--root DIR]                     stdio, one client
+  codeagent --mcp-server --transport sse --port 8765      shared by many clients
+
+Over stdio each client spawns its own server. With the sse or
+streamable-http transport one long-lived server holds a single warm index
+and cache of the repository for every agent process connected to it.
+All paths are confined to the root directory, as in the agent.
+
+An HTTP server has no authentication, and any web page the user visits
+can reach a local port (DNS rebinding). Over sse/streamable-http only the
+read-only and index tools are served unless --allow-write also exposes
+run_python_file and write_file.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Optional
+
+from codeagent.file_cache import count_reads, get_file_index, get_read_cache
+# Underscored: the tools registered below take the public names
+from codeagent.functions.get_file_content import get_file_content as _get_file_content
+from codeagent.functions.get_files_info import get_files_info as _get_files_info
+from codeagent.functions.read_tool_output import read_tool_output as _read_tool_output
+from codeagent.functions.run_python_file import run_python_file as _run_python_file
+from codeagent.functions.write_file import write_file as _write_file
+from codeagent.output_shaping import shape_output
+from codeagent.prefetch import Prefetcher
+
+try:
+    from mcp.server.fastmcp import FastMCP
+    from mcp.types import ToolAnnotations
+    MCP_SERVER_AVAILABLE = True
+except ImportError:
+    MCP_SERVER_AVAILABLE = False
+
+READ_ONLY = {"readOnlyHint": True, "idempotentHint": True, "openWorldHint": False}
+
+
+def _relative(root: str, paths: List[str]) -> List[str]:
+    return sorted(os.path.relpath(path, root) for path in paths)
+
+
+def create_server(root: str, host: str = "127.0.0.1", port: int = 8765,
+                  allow_write: bool = True) -> "FastMCP":
+    """FastMCP server exposing Gent's tools on the files under ``root``.
+
+    Without ``allow_write`` the tools that run code or modify files
+    (run_python_file, write_file) are not registered.
+    """
+    root = os.path.abspath(root)
+    prefetcher = Prefetcher(root)
+    server = FastMCP(
+        "gent",
+        instructions=f"Gent's file and Python tools for the project at {root}. Paths are relative to it.",
+        host=host,
+        port=port,
+    )
+
+    async def run(name: str, function, **args) -> str:
+        # Tools block (file I/O, subprocesses); keep the event loop serving
+        # other clients. The worker thread inherits the read counters
+        with count_reads(prefetcher.counters):
+            result = await asyncio.to_thread(function, root, **args)
+        prefetcher.observe(name, args)
+        return shape_output(name, result)
+
+    # =========================================================================
+    # NATIVE TOOLS
+    # =========================================================================
+
+    @server.tool(annotations=ToolAnnotations(title="List files", **READ_ONLY))
+    async def get_files_info(directory: str = ".") -> str:
+        """Lists files in a directory with their sizes and whether they are directories."""
+        return await run("get_files_info", _get_files_info, directory=directory)
+
+    @server.tool(annotations=ToolAnnotations(title="Read file", **READ_ONLY))
+    async def get_file_content(file_path: str) -> str:
+        """Reads and returns the contents of a file (long files are truncated)."""
+        return await run("get_file_content", _get_file_content, file_path=file_path)
+
+    if allow_write:
+        @server.tool(annotations=ToolAnnotations(title="Run Python file", openWorldHint=False))
+        async def run_python_file(file_path: str, args: Optional[List[str]] = None) -> str:
+            """Runs a Python file with optional arguments and returns its output."""
+            return await run("run_python_file", _run_python_file, file_path=file_path, args=args or [])
+
+        @server.tool(annotations=ToolAnnotations(title="Write file", destructiveHint=True, idempotentHint=True,
+                                                 openWorldHint=False))
+        async def write_file(file_path: str, content: str) -> str:
+            """Writes content to a file, creating it (and its directories) or overwriting it."""
+            return await run("write_file", _write_file, file_path=file_path, content=content)
+
+    @server.tool(annotations=ToolAnnotations(title="Read shortened output", **READ_ONLY))
+    async def read_tool_output(handle: str, offset: int = 0, length: Optional[int] = None) -> str:
+        """Reads part of a tool output that was shortened, by the handle in its omitted-output marker."""
+        args = {"handle": handle, "offset": offset}
+        if length:
+            args["length"] = length
+        return await asyncio.to_thread(_read_tool_output, root, **args)
+
+    # =========================================================================
+    # FILE INDEX
+    # =========================================================================
+
+    @server.tool(annotations=ToolAnnotations(title="Find files by name", **READ_ONLY))
+    async def find_files(name: str) -> List[str]:
+        """Paths of every file with this exact name (e.g. "conftest.py") in the project."""
+        index = await asyncio.to_thread(get_file_index, root)
+        return _relative(root, index.by_name.get(name, []))
+
+    @server.tool(annotations=ToolAnnotations(title="Resolve import", **READ_ONLY))
+    async def resolve_import(module: str, importer: Optional[str] = None) -> Optional[str]:
+        """File that a Python import refers to; relative imports ("..utils") need the importing file."""
+        index = await asyncio.to_thread(get_file_index, root)
+        level = len(module) - len(module.lstrip("."))
+        importer_path = os.path.join(root, importer) if importer else None
+        path = index.resolve_module(module.lstrip("."), importer_path, level)
+        return os.path.relpath(path, root) if path else None
+
+    @server.tool(annotations=ToolAnnotations(title="Find tests", **READ_ONLY))
+    async def find_tests(file_path: str) -> List[str]:
+        """Test files that likely cover a source file."""
+        index = await asyncio.to_thread(get_file_index, root)
+        return _relative(root, index.tests_for(os.path.join(root, file_path)))
+
+    @server.resource("gent://stats", name="stats", mime_type="application/json")
+    def stats() -> dict:
+        """Read cache and prefetch statistics of this server."""
+        return {"root": root, "read_cache": get_read_cache().snapshot(), "prefetch": prefetcher.stats()}
+
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="codeagent --mcp-server", description="Serve Gent's tools over MCP.")
+    parser.add_argument("--mcp-server", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--root", default=os.getcwd(), help="Project directory the tools work in (default: cwd)")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1", help="Address for sse/streamable-http (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for sse/streamable-http (default: 8765)")
+    parser.add_argument("--allow-write", action="store_true",
+                        help="Also serve run_python_file and write_file over sse/streamable-http "
+                             "(always served over stdio)")
+    options = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not MCP_SERVER_AVAILABLE:
+        sys.stderr.write("Error: the MCP SDK is not installed. Run: pip install mcp\n")
+        sys.exit(1)
+    if not os.path.isdir(options.root):
+        parser.error(f"--root {options.root} is not a directory")
+
+    # Over HTTP anything that can reach the port could run code; stdio is the client's own child
+    allow_write = options.transport == "stdio" or options.allow_write
+    if not allow_write:
+        sys.stderr.write("Serving read-only tools; pass --allow-write to expose run_python_file and write_file\n")
+    create_server(options.root, options.host, options.port, allow_write).run(transport=options.transport)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,43 @@ Dynamically fetches and selects from ALL available OpenRouter models.
 
 import os
 import json
-import requests
+import asyncio
+import time
+import httpx
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
-from openai import OpenAI
+from openai import APIStatusError, AsyncOpenAI, OpenAI
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from codeagent.config import (
+    FALLBACK_MODEL,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    MAX_CONCURRENT_REQUESTS,
+    MODEL_POLICY,
+    MODEL_REQUESTS_PER_MINUTE,
+    OPENROUTER_BASE_URL,
+    PROMPT_CACHE_MODE,
+    STREAM_RESPONSES,
+)
+from codeagent.http_transport import build_timeout, get_async_http_client, get_http_client
+from codeagent.resilience import (
+    AsyncHedgedCaller,
+    HedgedCaller,
+    LatencyTracker,
+    ModelRateLimiter,
+    RetryPolicy,
+    async_call_with_retry,
+    call_with_retry,
+    retry_after_seconds,
+)
+from codeagent.model_selector import ModelCatalogue, ModelStats
+from codeagent.telemetry import parse_pricing
+from codeagent.tracing import instant, span
+
 console = Console()
 
 
@@ -64,9 +93,10 @@ class MockPart:
 
 class MockFunctionCall:
     """Mock function call."""
-    def __init__(self, name, args):
+    def __init__(self, name, args, id=None):
         self.name = name
         self.args = args
+        self.id = id
 
 
 # Mock classes for compatibility with existing code
@@ -126,7 +156,7 @@ def fetch_openrouter_models(api_key: str) -> List[Dict[str, Any]]:
         ) as progress:
             progress.add_task(description="Fetching available models from OpenRouter...", total=None)
             
-            response = requests.get(
+            response = get_http_client().get(
                 "https://openrouter.ai/api/v1/models",
                 headers={"Authorization": f"Bearer {api_key}"},
                 timeout=10
@@ -139,7 +169,7 @@ def fetch_openrouter_models(api_key: str) -> List[Dict[str, Any]]:
             console.print(f"[green]✓ Found {len(models)} available models[/green]\n")
             return models
     
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         console.print(f"[red]✗ Error fetching models: {e}[/red]")
         console.print("[yellow]Using offline model list...[/yellow]\n")
         return []
@@ -156,16 +186,15 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
         console.print("[red]No models available![/red]")
         return "anthropic/claude-3.5-sonnet"
     
+    # Prices are parsed once here, not on every filter/sort pass
+    catalogue = ModelCatalogue(models)
+    
     # Filter for models that support function calling
-    function_calling_models = [
-        m for m in models 
-        if "tool" in m.get("supported_parameters", []) or 
-           "tools" in m.get("supported_parameters", [])
-    ]
+    function_calling_models = catalogue.tool_models
     
     if not function_calling_models:
         console.print("[yellow]Warning: No models with verified function calling support found[/yellow]")
-        function_calling_models = models
+        function_calling_models = catalogue.profiles
     
     console.print(f"[bold cyan]OpenRouter Models[/bold cyan] ({len(function_calling_models)} models with function calling)\n")
     
@@ -184,23 +213,16 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
     )
     
     # Apply filter
-    filtered_models = function_calling_models.copy()
+    filtered_models = list(function_calling_models)
     
     if filter_choice == "2":
         # Free models
-        filtered_models = [
-            m for m in filtered_models
-            if m.get("pricing", {}).get("prompt", "0") == "0" and
-               m.get("pricing", {}).get("completion", "0") == "0"
-        ]
+        filtered_models = [m for m in filtered_models if m.free]
         console.print(f"\n[green]Showing {len(filtered_models)} free models[/green]\n")
     
     elif filter_choice == "3":
         # Cheap models (< $0.50 per 1M tokens)
-        filtered_models = [
-            m for m in filtered_models
-            if float(m.get("pricing", {}).get("prompt", "999")) * 1000000 < 0.50
-        ]
+        filtered_models = [m for m in filtered_models if m.prompt_price * 1000000 < 0.50]
         console.print(f"\n[green]Showing {len(filtered_models)} cheap models[/green]\n")
     
     elif filter_choice == "4":
@@ -208,7 +230,7 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
         premium_keywords = ["claude", "gpt-4", "gemini-2", "o1", "o3"]
         filtered_models = [
             m for m in filtered_models
-            if any(kw in m.get("id", "").lower() for kw in premium_keywords)
+            if any(kw in m.id.lower() for kw in premium_keywords)
         ]
         console.print(f"\n[green]Showing {len(filtered_models)} premium models[/green]\n")
     
@@ -217,17 +239,16 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
         search_term = Prompt.ask("[yellow]Enter search term[/yellow]").lower()
         filtered_models = [
             m for m in filtered_models
-            if search_term in m.get("id", "").lower() or
-               search_term in m.get("name", "").lower()
+            if search_term in m.id.lower() or search_term in m.name.lower()
         ]
         console.print(f"\n[green]Found {len(filtered_models)} matching models[/green]\n")
     
     if not filtered_models:
         console.print("[red]No models match your filter. Showing all models.[/red]\n")
-        filtered_models = function_calling_models
+        filtered_models = list(function_calling_models)
     
     # Sort by cost (cheapest first)
-    filtered_models.sort(key=lambda m: float(m.get("pricing", {}).get("prompt", "999")))
+    filtered_models.sort(key=lambda m: m.prompt_price)
     
     # Limit display to 50 models for readability
     display_models = filtered_models[:50]
@@ -243,13 +264,8 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
     table.add_column("Cost/1M", justify="right")
     
     for idx, model in enumerate(display_models, 1):
-        model_id = model.get("id", "unknown")
-        model_name = model.get("name", "Unknown")
-        context_length = model.get("context_length", 0)
-        
-        pricing = model.get("pricing", {})
-        prompt_cost = float(pricing.get("prompt", 0))
-        completion_cost = float(pricing.get("completion", 0))
+        model_name = model.name
+        context_length = model.context_length
         
         # Format context length
         if context_length >= 1000000:
@@ -260,11 +276,11 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
             context_str = str(context_length)
         
         # Format cost
-        if prompt_cost == 0 and completion_cost == 0:
+        if model.free:
             cost_str = "[green]FREE[/green]"
         else:
-            input_cost = prompt_cost * 1000000
-            output_cost = completion_cost * 1000000
+            input_cost = model.prompt_price * 1000000
+            output_cost = model.completion_price * 1000000
             cost_str = f"${input_cost:.2f}/${output_cost:.2f}"
         
         # Shorten model name if too long
@@ -273,7 +289,7 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
         
         table.add_row(
             str(idx),
-            model_id,
+            model.id,
             model_name,
             context_str,
             cost_str
@@ -292,41 +308,226 @@ def select_model_interactive(models: List[Dict[str, Any]]) -> str:
         idx = int(choice) - 1
         if 0 <= idx < len(display_models):
             selected = display_models[idx]
-            console.print(f"\n[green]✓ Selected: {selected['name']} ({selected['id']})[/green]")
-            return selected["id"]
+            console.print(f"\n[green]✓ Selected: {selected.name} ({selected.id})[/green]")
+            return selected.id
         else:
             console.print("[red]Invalid selection. Using first model.[/red]")
-            return display_models[0]["id"]
+            return display_models[0].id
     except ValueError:
         console.print("[red]Invalid input. Using first model.[/red]")
-        return display_models[0]["id"]
+        return display_models[0].id
+
+
+def select_model_auto(models: List[Dict[str, Any]], policy: str = MODEL_POLICY) -> Optional[str]:
+    """
+    Pick a model without prompting, using catalogue data plus local stats.
+    
+    Returns:
+        Selected model ID, or None if no model satisfies the policy
+    """
+    catalogue = ModelCatalogue(models, ModelStats())
+    choice = catalogue.select(policy)
+    if choice is None:
+        console.print(f"[yellow]No model satisfies policy '{policy}'[/yellow]")
+        return None
+    
+    profile, reason = choice
+    console.print(f"[green]✓ Auto-selected: {profile.name} ({profile.id})[/green]")
+    console.print(f"[dim]  Policy {policy}: {reason}[/dim]\n")
+    return profile.id
+
+
+# =============================================================================
+# PROMPT-PREFIX CACHING
+# =============================================================================
+
+def supports_cache_control(model_id: str) -> bool:
+    """Whether to send explicit cache_control hints for a model.
+    
+    Anthropic and Gemini models on OpenRouter only cache at marked
+    breakpoints; OpenAI, DeepSeek and others cache stable prefixes
+    automatically and need no hints.
+    """
+    if PROMPT_CACHE_MODE == "off":
+        return False
+    if PROMPT_CACHE_MODE == "on":
+        return True
+    return model_id.startswith(("anthropic/", "google/gemini"))
+
+
+def add_cache_breakpoints(openai_messages: List[Dict[str, Any]]):
+    """Mark the system prompt and the newest message as cache breakpoints.
+    
+    The system breakpoint caches tools + system prompt; the trailing one lets
+    the next iteration reuse the whole history sent so far. Every text
+    message is sent as a list of parts, breakpoint or not, so a message
+    serializes the same way after its breakpoint moves on and the prefix
+    stays byte-identical between iterations.
+    """
+    targets = []
+    if openai_messages and openai_messages[0]["role"] == "system":
+        targets.append(openai_messages[0])
+    for msg in reversed(openai_messages):
+        if msg["role"] in ("user", "tool") and isinstance(msg.get("content"), str) and msg["content"]:
+            if not targets or msg is not targets[0]:
+                targets.append(msg)
+            break
+    
+    for msg in openai_messages:
+        if msg["role"] in ("system", "user", "tool") and isinstance(msg.get("content"), str) and msg["content"]:
+            msg["content"] = [{"type": "text", "text": msg["content"]}]
+    for msg in targets:
+        msg["content"][0]["cache_control"] = {"type": "ephemeral"}
+
+
+def to_json_schema(parameters: Any) -> Any:
+    """Return tool parameters as a plain JSON-schema dict.
+    
+    Native tools declare google.genai Schema objects (upper-case types such
+    as "STRING"); these are dumped and lower-cased so every request carries
+    the same standard JSON schema.
+    """
+    if hasattr(parameters, "model_dump"):
+        parameters = parameters.model_dump(exclude_none=True, mode="json")
+    
+    def normalize(value):
+        if isinstance(value, dict):
+            return {
+                k: (v.lower() if k == "type" and isinstance(v, str) else normalize(v))
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        return value
+    
+    return normalize(parameters)
+
+
+# =============================================================================
+# STREAMING
+# =============================================================================
+
+def collect_stream(stream: Any, started: float) -> Any:
+    """Accumulate a streamed chat completion into a non-streamed-shaped one.
+
+    Tool-call deltas are merged by index. The result carries ``ttft``, the
+    seconds from ``started`` to the first content or tool-call delta.
+    """
+    content = []
+    tool_calls: Dict[int, Dict[str, Any]] = {}
+    usage = None
+    model = None
+    ttft = None
+
+    for chunk in stream:
+        model = getattr(chunk, "model", None) or model
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+
+        delta = chunk.choices[0].delta
+        if ttft is None and (delta.content or delta.tool_calls):
+            ttft = time.perf_counter() - started
+        if delta.content:
+            content.append(delta.content)
+        for tool_delta in delta.tool_calls or []:
+            entry = tool_calls.setdefault(tool_delta.index, {"id": None, "name": "", "arguments": []})
+            if tool_delta.id:
+                entry["id"] = tool_delta.id
+            if tool_delta.function is not None:
+                entry["name"] += tool_delta.function.name or ""
+                entry["arguments"].append(tool_delta.function.arguments or "")
+
+    calls = [
+        SimpleNamespace(
+            id=entry["id"],
+            function=SimpleNamespace(name=entry["name"], arguments="".join(entry["arguments"]) or "{}"),
+        )
+        for _, entry in sorted(tool_calls.items())
+    ]
+    message = SimpleNamespace(content="".join(content) or None, tool_calls=calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage, model=model, ttft=ttft)
+
+
+DEFAULT_HEADERS = {
+    "HTTP-Referer": "https://github.com/yourusername/codeagent",
+    "X-Title": "CodeAgent",
+}
 
 
 class OpenRouterProvider:
     """OpenRouter provider using OpenAI SDK."""
     
-    def __init__(self, api_key: str, model_id: str):
+    # The SDK client, hedger and pooled HTTP client; AsyncOpenRouterProvider
+    # swaps in their async counterparts and shares the rest of the setup
+    client_class = OpenAI
+    hedger_class = HedgedCaller
+    http_client = staticmethod(get_http_client)
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_id: str,
+        base_url: Optional[str] = None,
+        fallback_model_id: Optional[str] = None,
+    ):
         self.api_key = api_key
         self.model_id = model_id
+        self.fallback_model_id = fallback_model_id if fallback_model_id is not None else (FALLBACK_MODEL or None)
+        self.retry_policy = RetryPolicy()
+        self.hedger = self.hedger_class(LatencyTracker(), HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+        self.stream = STREAM_RESPONSES
+        # Per-token prices by model id, filled from the catalogue for cost telemetry
+        self.pricing: Dict[str, Dict[str, float]] = {}
         
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
+        # Shares the process-wide pooled HTTP client with the catalogue fetch
+        # and every other provider instance. Retries are handled by
+        # _create_completion, so the SDK's own retries are disabled.
+        self.client = self.client_class(
+            base_url=base_url or OPENROUTER_BASE_URL,
             api_key=api_key,
-            default_headers={
-                "HTTP-Referer": "https://github.com/yourusername/codeagent",
-                "X-Title": "CodeAgent",
-            }
+            http_client=self.http_client(),
+            timeout=build_timeout(),
+            max_retries=0,
+            default_headers=DEFAULT_HEADERS,
         )
         
-        console.print(f"[dim]Using model: {model_id}[/dim]\n")
+        console.print(f"[dim]Using model: {model_id}{self._mode_note()}[/dim]\n")
+    
+    def _mode_note(self) -> str:
+        return ""
     
     def generate_content(
         self,
         messages: List[Any],
         tools: Optional[List[Any]] = None,
         system_instruction: Optional[str] = None,
+        model: Optional[str] = None,
     ) -> Any:
-        """Generate content via OpenRouter."""
+        """Generate content via OpenRouter (``model`` overrides model_id for this call)."""
+        with span("convert_request", "convert", messages=len(messages)):
+            params = self._build_params(messages, tools, system_instruction, model)
+        
+        # Make API call
+        try:
+            started = time.perf_counter()
+            response = self._create_completion(params)
+            latency = time.perf_counter() - started
+            with span("convert_response", "convert"):
+                return self._convert_response_to_gemini_format(response, latency=latency, model=params["model"])
+        except Exception as e:
+            console.print(f"[red]API Error: {e}[/red]")
+            raise
+    
+    def _build_params(
+        self,
+        messages: List[Any],
+        tools: Optional[List[Any]] = None,
+        system_instruction: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Convert Gemini-style messages and tools into chat completion params."""
         # Convert messages to OpenAI format
         openai_messages = []
         
@@ -337,8 +538,12 @@ class OpenRouterProvider:
                 "content": system_instruction
             })
         
-        # Convert Gemini-style messages to OpenAI format
-        for msg in messages:
+        # Convert Gemini-style messages to OpenAI format. Tool call ids come
+        # from the model or from the call's position in the history, so the
+        # already-sent prefix serializes byte-for-byte the same every
+        # iteration; tool responses pair with the preceding calls in order.
+        pending_call_ids = []
+        for msg_index, msg in enumerate(messages):
             # Handle both dict and MockContent objects
             if isinstance(msg, dict):
                 role = msg.get("role", "user")
@@ -350,31 +555,40 @@ class OpenRouterProvider:
             # Handle different message types
             if role == "tool":
                 # Tool response
-                for part in parts:
-                    if hasattr(part, "function_response"):
-                        openai_messages.append({
-                            "role": "tool",
-                            "tool_call_id": part.function_response.name,
-                            "content": str(part.function_response.response.get("result", ""))
-                        })
+                for part_index, part in enumerate(parts):
+                    function_response = getattr(part, "function_response", None)
+                    if function_response is None:
+                        continue
+                    call_id = pending_call_ids.pop(0) if pending_call_ids else f"call_{msg_index}_{part_index}"
+                    response_data = function_response.response
+                    if isinstance(response_data, dict):
+                        response_data = response_data.get("result", response_data.get("error", ""))
+                    openai_messages.append({
+                        "role": "tool",
+                        "tool_call_id": call_id,
+                        "content": str(response_data)
+                    })
             else:
                 # Regular message or function call
                 content_parts = []
                 tool_calls = []
                 
-                for part in parts:
-                    if hasattr(part, "text"):
-                        content_parts.append(part.text)
-                    elif hasattr(part, "function_call"):
-                        import json
+                for part_index, part in enumerate(parts):
+                    function_call = getattr(part, "function_call", None)
+                    if function_call:
+                        call_id = getattr(function_call, "id", None) or f"call_{msg_index}_{part_index}"
                         tool_calls.append({
-                            "id": f"call_{part.function_call.name}",
+                            "id": call_id,
                             "type": "function",
                             "function": {
-                                "name": part.function_call.name,
-                                "arguments": json.dumps(dict(part.function_call.args))
+                                "name": function_call.name,
+                                "arguments": json.dumps(dict(function_call.args))
                             }
                         })
+                    elif getattr(part, "text", ""):
+                        content_parts.append(part.text)
+                
+                pending_call_ids = [call["id"] for call in tool_calls]
                 
                 msg_dict = {
                     "role": "assistant" if role == "model" else role,
@@ -389,8 +603,9 @@ class OpenRouterProvider:
                 openai_messages.append(msg_dict)
         
         # Build request parameters
+        model = model or self.model_id
         params = {
-            "model": self.model_id,
+            "model": model,
             "messages": openai_messages,
         }
         
@@ -400,16 +615,55 @@ class OpenRouterProvider:
             params["tools"] = openai_tools
             params["tool_choice"] = "auto"
         
-        # Make API call
-        try:
-            response = self.client.chat.completions.create(**params)
-            return self._convert_response_to_gemini_format(response)
-        except Exception as e:
-            console.print(f"[red]API Error: {e}[/red]")
-            raise
+        if supports_cache_control(model):
+            add_cache_breakpoints(openai_messages)
+        
+        # Ask OpenRouter for detailed usage (cached prompt tokens)
+        params["extra_body"] = {"usage": {"include": True}}
+        
+        return params
+    
+    def _retry_logger(self, model: str):
+        """Callback that reports each retry of a request to ``model``."""
+        def on_retry(error, attempt, delay):
+            status = getattr(error, "status_code", None) or type(error).__name__
+            instant("retry", "model", model=model, status=status, attempt=attempt, delay=round(delay, 2))
+            console.print(
+                f"[dim yellow]⟳ {model} failed ({status}), retrying in {delay:.1f}s "
+                f"(attempt {attempt}/{self.retry_policy.max_retries})[/dim yellow]"
+            )
+        return on_retry
+    
+    def _create_completion(self, params: Dict[str, Any]) -> Any:
+        """Create a chat completion with retries and an optional hedged fallback."""
+        def create(request_params):
+            return call_with_retry(
+                lambda: self._request(request_params),
+                self.retry_policy,
+                on_retry=self._retry_logger(request_params["model"]),
+            )
+        
+        hedge = None
+        if self.fallback_model_id and self.fallback_model_id != params["model"]:
+            hedge = lambda: create({**params, "model": self.fallback_model_id})
+        
+        return self.hedger.call(params["model"], lambda: create(params), hedge)
+    
+    def _request(self, request_params: Dict[str, Any]) -> Any:
+        """One attempt, streamed when enabled so time to first token is known."""
+        with span("http_request", "model", model=request_params["model"], stream=self.stream):
+            if not self.stream:
+                return self.client.chat.completions.create(**request_params)
+            
+            started = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                **request_params, stream=True, stream_options={"include_usage": True}
+            )
+            return collect_stream(stream, started)
     
     def _convert_tools_to_openai(self, gemini_tools: List[Any]) -> List[Dict[str, Any]]:
-        """Convert Gemini tool format to OpenAI format."""
+        """Convert Gemini tool format to OpenAI format, sorted by name so the
+        tool block is identical on every request."""
         openai_tools = []
         
         for tool in gemini_tools:
@@ -420,13 +674,19 @@ class OpenRouterProvider:
                         "function": {
                             "name": func_decl.name,
                             "description": func_decl.description,
-                            "parameters": func_decl.parameters
+                            "parameters": to_json_schema(func_decl.parameters)
                         }
                     })
         
+        openai_tools.sort(key=lambda t: t["function"]["name"])
         return openai_tools
     
-    def _convert_response_to_gemini_format(self, openai_response: Any) -> Any:
+    def _convert_response_to_gemini_format(
+        self,
+        openai_response: Any,
+        latency: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> Any:
         """Convert OpenAI response to Gemini-like format for compatibility."""
         # Create a mock Gemini response structure
         class MockResponse:
@@ -449,9 +709,19 @@ class OpenRouterProvider:
                 self.function_call = None
         
         class MockFunctionCall:
-            def __init__(self, name, args):
+            def __init__(self, name, args, id=None):
                 self.name = name
                 self.args = args
+                self.id = id
+        
+        class MockUsageMetadata:
+            def __init__(self, usage):
+                details = getattr(usage, "prompt_tokens_details", None)
+                cached = getattr(details, "cached_tokens", None) if details is not None else None
+                self.prompt_token_count = getattr(usage, "prompt_tokens", 0) or 0
+                self.candidates_token_count = getattr(usage, "completion_tokens", 0) or 0
+                self.cached_content_token_count = cached or 0
+                self.total_token_count = getattr(usage, "total_tokens", 0) or 0
         
         response = MockResponse()
         candidate = MockCandidate()
@@ -472,20 +742,122 @@ class OpenRouterProvider:
                 part = MockPart()
                 part.function_call = MockFunctionCall(
                     name=tool_call.function.name,
-                    args=json.loads(tool_call.function.arguments)
+                    args=json.loads(tool_call.function.arguments),
+                    id=tool_call.id,
                 )
                 candidate.content.parts.append(part)
         
         response.candidates = [candidate]
+        
+        usage = getattr(openai_response, "usage", None)
+        response.usage_metadata = MockUsageMetadata(usage) if usage is not None else None
+        
+        # Timing for telemetry; the served model may be the hedged fallback
+        response.model = getattr(openai_response, "model", None) or model
+        response.latency = latency
+        response.ttft = getattr(openai_response, "ttft", None)
         return response
 
 
-def initialize_openrouter(api_key: Optional[str] = None) -> OpenRouterProvider:
+class AsyncOpenRouterProvider(OpenRouterProvider):
+    """
+    OpenRouter provider built on AsyncOpenAI.
+    
+    ``generate_content`` takes the same arguments and returns the same
+    Gemini-style response as OpenRouterProvider, but must be awaited. A
+    semaphore bounds concurrent requests and a ModelRateLimiter enforces and
+    accounts per-model rate limits, so many agent loops can share one
+    instance inside a single event loop.
+    """
+    
+    client_class = AsyncOpenAI
+    hedger_class = AsyncHedgedCaller
+    http_client = staticmethod(get_async_http_client)
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_id: str,
+        base_url: Optional[str] = None,
+        fallback_model_id: Optional[str] = None,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        rate_limiter: Optional[ModelRateLimiter] = None,
+    ):
+        self.rate_limiter = rate_limiter or ModelRateLimiter(MODEL_REQUESTS_PER_MINUTE)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        super().__init__(api_key, model_id, base_url, fallback_model_id)
+    
+    def _mode_note(self) -> str:
+        return f" (async, {self.max_concurrency} concurrent requests)"
+    
+    async def generate_content(
+        self,
+        messages: List[Any],
+        tools: Optional[List[Any]] = None,
+        system_instruction: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Any:
+        """Generate content via OpenRouter (awaitable; ``model`` overrides model_id)."""
+        with span("convert_request", "convert", messages=len(messages)):
+            params = self._build_params(messages, tools, system_instruction, model)
+        
+        try:
+            started = time.perf_counter()
+            response = await self._create_completion(params)
+            latency = time.perf_counter() - started
+            with span("convert_response", "convert"):
+                return self._convert_response_to_gemini_format(response, latency=latency, model=params["model"])
+        except Exception as e:
+            console.print(f"[red]API Error: {e}[/red]")
+            raise
+    
+    async def _send(self, request_params: Dict[str, Any]) -> Any:
+        """One attempt: wait for rate-limit budget and a concurrency slot, then call."""
+        model = request_params["model"]
+        await self.rate_limiter.acquire(model)
+        
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                with span("http_request", "model", model=model):
+                    raw = await self.client.chat.completions.with_raw_response.create(**request_params)
+            except APIStatusError as e:
+                if e.status_code == 429:
+                    self.rate_limiter.record_rate_limited(model, retry_after_seconds(e))
+                raise
+            finally:
+                self.in_flight -= 1
+        
+        completion = raw.parse()
+        self.rate_limiter.record_response(model, raw.headers, getattr(completion, "usage", None))
+        return completion
+    
+    async def _create_completion(self, params: Dict[str, Any]) -> Any:
+        """Create a chat completion with retries and an optional hedged fallback."""
+        async def create(request_params):
+            return await async_call_with_retry(
+                lambda: self._send(request_params),
+                self.retry_policy,
+                on_retry=self._retry_logger(request_params["model"]),
+            )
+        
+        hedge = None
+        if self.fallback_model_id and self.fallback_model_id != params["model"]:
+            hedge = lambda: create({**params, "model": self.fallback_model_id})
+        
+        return await self.hedger.call(params["model"], lambda: create(params), hedge)
+
+
+def initialize_openrouter(api_key: Optional[str] = None, policy: Optional[str] = None) -> OpenRouterProvider:
     """
     Initialize OpenRouter provider with model selection.
     
     Args:
         api_key: OpenRouter API key (or reads from OPENROUTER_API_KEY env var)
+        policy: Select the model automatically under this policy instead of
+            prompting (see codeagent.model_selector)
     
     Returns:
         OpenRouterProvider instance
@@ -505,12 +877,18 @@ def initialize_openrouter(api_key: Optional[str] = None) -> OpenRouterProvider:
     # Fetch available models
     models = fetch_openrouter_models(api_key)
     
-    if not models:
-        console.print("[yellow]Using fallback model: deepseek/deepseek-chat[/yellow]\n")
-        model_id = "deepseek/deepseek-chat"
-    else:
+    model_id = None
+    if models and policy:
+        model_id = select_model_auto(models, policy)
+    elif models:
         # Let user select model
         model_id = select_model_interactive(models)
     
+    if not model_id:
+        console.print("[yellow]Using fallback model: deepseek/deepseek-chat[/yellow]\n")
+        model_id = "deepseek/deepseek-chat"
+    
     # Create provider
-    return OpenRouterProvider(api_key, model_id)
\ No newline at end of file
+    provider = OpenRouterProvider(api_key, model_id)
+    provider.pricing = parse_pricing(models)
+    return provider
\ No newline at end of file
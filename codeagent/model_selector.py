@@ -0,0 +1,219 @@
+"""
+Automatic Model Selection for CodeAgent
+=======================================
+Scores OpenRouter models from catalogue fields (pricing, context_length,
+tool support) plus what this machine has measured in past tasks (latency,
+tool-call success), and picks one under a policy:
+
+- cheapest-fits-context: cheapest tool-capable model whose context window
+  fits, skipping models with a poor measured tool-call success rate
+- fastest-under-budget: lowest measured median latency among models under
+  a blended price budget (unmeasured models rank after measured ones)
+
+Catalogue prices are parsed into floats and policy rankings computed once
+per catalogue refresh; selection only filters the precomputed rankings.
+Measurements are kept in GENT_HOME/model_stats.json.
+"""
+
+import json
+import os
+import statistics
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from codeagent.config import (
+    MODEL_MAX_PRICE,
+    MODEL_MIN_CONTEXT,
+    MODEL_POLICY,
+    MODEL_STATS_FILE,
+)
+
+POLICIES = ("cheapest-fits-context", "fastest-under-budget")
+
+# Agent requests are input-heavy: re-sent history dwarfs each completion
+INPUT_TOKEN_SHARE = 0.9
+
+# Measured tool-call success below this (after enough calls) disqualifies a model
+MIN_TOOL_SUCCESS = 0.8
+MIN_TOOL_SAMPLES = 10
+
+# Latency samples kept per model
+LATENCY_WINDOW = 50
+
+
+@dataclass
+class ModelProfile:
+    """Catalogue fields parsed once, plus local measurements."""
+    id: str
+    name: str
+    context_length: int
+    prompt_price: float
+    completion_price: float
+    supports_tools: bool
+    latency_p50: Optional[float] = None
+    tool_success: Optional[float] = None
+    tool_calls: int = 0
+
+    @property
+    def free(self) -> bool:
+        return self.prompt_price == 0 and self.completion_price == 0
+
+    @property
+    def blended_price_per_million(self) -> float:
+        """Price per 1M tokens at the agent's typical input/output mix."""
+        return (self.prompt_price * INPUT_TOKEN_SHARE + self.completion_price * (1 - INPUT_TOKEN_SHARE)) * 1_000_000
+
+    @property
+    def reliable(self) -> bool:
+        return self.tool_calls < MIN_TOOL_SAMPLES or (self.tool_success or 0) >= MIN_TOOL_SUCCESS
+
+
+def _price(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def build_profile(model: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> ModelProfile:
+    pricing = model.get("pricing") or {}
+    params = model.get("supported_parameters") or []
+    profile = ModelProfile(
+        id=model.get("id", ""),
+        name=model.get("name", "Unknown"),
+        context_length=int(model.get("context_length") or 0),
+        # Missing prices sort last rather than looking free
+        prompt_price=_price(pricing.get("prompt"), 999.0),
+        completion_price=_price(pricing.get("completion"), 999.0),
+        supports_tools="tools" in params or "tool" in params,
+    )
+    if stats:
+        latencies = stats.get("latencies") or []
+        if latencies:
+            profile.latency_p50 = statistics.median(latencies)
+        profile.tool_calls = stats.get("tool_calls", 0)
+        if profile.tool_calls:
+            profile.tool_success = 1 - stats.get("tool_errors", 0) / profile.tool_calls
+    return profile
+
+
+# =============================================================================
+# LOCAL MEASUREMENTS
+# =============================================================================
+
+# Shared by every ModelStats in the process: each task builds its own
+# instance, and concurrent tasks (batch mode, the daemon) save the same file
+_stats_lock = threading.Lock()
+
+
+class ModelStats:
+    """Per-model latency and tool-call outcomes from past tasks (JSON on disk)."""
+
+    def __init__(self, path: str = MODEL_STATS_FILE):
+        self.path = path
+        self.models: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("models", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def record_task(self, iterations: List[Dict[str, Any]], status: str):
+        """Fold one task's telemetry iterations into the stats and save."""
+        # This task's deltas per model, applied on top of whatever is on disk
+        # at save time so increments from other tasks and processes survive
+        deltas: Dict[str, Dict[str, Any]] = {}
+        for iteration in iterations:
+            model = iteration.get("model")
+            if not model:
+                continue
+            delta = deltas.setdefault(model, {"latencies": [], "tool_calls": 0, "tool_errors": 0})
+            if iteration.get("model_latency_s") is not None:
+                delta["latencies"].append(iteration["model_latency_s"])
+            for tool in iteration.get("tools", {}).values():
+                delta["tool_calls"] += tool["calls"]
+                delta["tool_errors"] += tool["errors"]
+        if not deltas:
+            return
+
+        with _stats_lock:
+            self.models = self._load()
+            for model, delta in deltas.items():
+                entry = self.models.setdefault(model, {
+                    "latencies": [], "tool_calls": 0, "tool_errors": 0, "tasks": 0, "completed": 0,
+                })
+                entry["latencies"] = (entry.get("latencies", []) + delta["latencies"])[-LATENCY_WINDOW:]
+                entry["tool_calls"] = entry.get("tool_calls", 0) + delta["tool_calls"]
+                entry["tool_errors"] = entry.get("tool_errors", 0) + delta["tool_errors"]
+                entry["tasks"] = entry.get("tasks", 0) + 1
+                if status == "completed":
+                    entry["completed"] = entry.get("completed", 0) + 1
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Unique temp file in the same directory, so the rename stays atomic
+        fd, tmp = tempfile.mkstemp(prefix=".model_stats.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"models": self.models}, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+# =============================================================================
+# CATALOGUE + POLICIES
+# =============================================================================
+
+class ModelCatalogue:
+    """Parsed catalogue with policy rankings precomputed at refresh time."""
+
+    def __init__(self, models: List[Dict[str, Any]], stats: Optional[ModelStats] = None):
+        self.stats = stats
+        self.refresh(models)
+
+    def refresh(self, models: List[Dict[str, Any]]):
+        measured = self.stats.models if self.stats else {}
+        self.profiles = [build_profile(m, measured.get(m.get("id"))) for m in models]
+        self.by_id = {p.id: p for p in self.profiles}
+        self.tool_models = [p for p in self.profiles if p.supports_tools]
+
+        candidates = [p for p in self.tool_models if p.reliable]
+        self.by_price = sorted(candidates, key=lambda p: (p.blended_price_per_million, p.latency_p50 or float("inf")))
+        self.by_latency = sorted(
+            candidates,
+            key=lambda p: (p.latency_p50 is None, p.latency_p50 or 0.0, p.blended_price_per_million),
+        )
+
+    def select(self, policy: str = MODEL_POLICY, min_context: int = MODEL_MIN_CONTEXT,
+               max_price: float = MODEL_MAX_PRICE) -> Optional[Tuple[ModelProfile, str]]:
+        """Best model under ``policy`` and a one-line reason, or None."""
+        if policy == "cheapest-fits-context":
+            for profile in self.by_price:
+                if profile.context_length >= min_context:
+                    return profile, (
+                        f"cheapest tool-capable model with ≥{min_context:,} context "
+                        f"(${profile.blended_price_per_million:.2f}/1M blended)"
+                    )
+        elif policy == "fastest-under-budget":
+            for profile in self.by_latency:
+                if profile.blended_price_per_million <= max_price and profile.context_length >= min_context:
+                    latency = f"p50 {profile.latency_p50:.2f}s" if profile.latency_p50 is not None else "no latency data"
+                    return profile, (
+                        f"fastest model under ${max_price:.2f}/1M ({latency}, "
+                        f"${profile.blended_price_per_million:.2f}/1M blended)"
+                    )
+        else:
+            raise ValueError(f"Unknown model policy: {policy} (choose from {', '.join(POLICIES)})")
+        return None
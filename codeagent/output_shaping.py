@@ -0,0 +1,311 @@
+"""
+Tool Output Shaping for CodeAgent
+=================================
+Every tool result is re-sent to the model on each later iteration, so
+results are compacted before they enter the conversation:
+
+- get_files_info: listings re-encoded as one short line per entry
+- run_python_file: repeated traceback frames collapsed, runs of identical
+  lines deduplicated
+- MCP and other tools: runs of identical lines deduplicated
+
+Whatever is still longer than TOOL_OUTPUT_MAX_CHARS is stored in the blob
+store; the model sees its head and tail plus a handle it can pass to
+read_tool_output. File contents (get_file_content) are never reshaped,
+since edits depend on them verbatim.
+
+Binary MCP content (images, audio, binary resources) never enters the
+conversation: it is decoded straight into a blob file and replaced by a
+one-line reference with its type, size and dimensions. read_tool_output
+on that handle gives the file path and, with Pillow installed, a
+down-sampled preview.
+"""
+
+import base64
+import binascii
+import io
+import mimetypes
+import re
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from codeagent.blob_store import get_blob_store, suffix_for
+from codeagent.config import TOOL_OUTPUT_MAX_CHARS, TOOL_OUTPUT_SHAPING
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# A run of identical lines at least this long is collapsed to one line
+MIN_REPEAT = 3
+
+# Longest cycle of traceback frames detected as repeating (recursion)
+MAX_FRAME_CYCLE = 4
+
+# Longest side of the down-sampled image preview made by read_tool_output
+PREVIEW_MAX_SIDE = 512
+
+# Tracebacks longer than this keep only their outermost and innermost frames
+MAX_FRAMES = 20
+KEEP_OUTER_FRAMES = 5
+KEEP_INNER_FRAMES = 10
+
+_FRAME = re.compile(r'^(\s*)File ".*", line \d+')
+_LISTING = re.compile(r"^ - (.+): file_size=(\d+) bytes, is_dir=(True|False)$")
+
+
+# =============================================================================
+# SHAPERS
+# =============================================================================
+
+def dedupe_lines(text: str) -> str:
+    """Collapse runs of MIN_REPEAT or more identical consecutive lines."""
+    lines = text.split("\n")
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        j = i + 1
+        while j < len(lines) and lines[j] == lines[i]:
+            j += 1
+        out.append(lines[i])
+        if j - i >= MIN_REPEAT:
+            out.append(f"[previous line repeated {j - i - 1} more times]")
+        else:
+            out.extend(lines[i + 1:j])
+        i = j
+    return "\n".join(out)
+
+
+def _segments(lines: List[str]) -> List[Tuple[bool, List[str]]]:
+    """Split lines into (is_frame, lines) segments; a frame owns its indented source lines."""
+    segments: List[Tuple[bool, List[str]]] = []
+    i = 0
+    while i < len(lines):
+        match = _FRAME.match(lines[i])
+        if not match:
+            segments.append((False, [lines[i]]))
+            i += 1
+            continue
+        indent = len(match.group(1))
+        j = i + 1
+        while j < len(lines) and not _FRAME.match(lines[j]) and len(lines[j]) - len(lines[j].lstrip()) > indent:
+            j += 1
+        segments.append((True, lines[i:j]))
+        i = j
+    return segments
+
+
+def _collapse_frames(frames: List[List[str]]) -> List[List[str]]:
+    """Collapse repeating cycles of frames, then cap very long tracebacks."""
+    out: List[List[str]] = []
+    i = 0
+    while i < len(frames):
+        collapsed = False
+        for period in range(1, MAX_FRAME_CYCLE + 1):
+            cycle = frames[i:i + period]
+            if len(cycle) < period:
+                break
+            repeats = 1
+            while frames[i + repeats * period:i + (repeats + 1) * period] == cycle:
+                repeats += 1
+            if repeats >= MIN_REPEAT:
+                indent = re.match(r"\s*", cycle[0][0]).group(0)
+                out.extend(cycle)
+                out.append([f"{indent}[previous {period} frame(s) repeated {repeats - 1} more times]"])
+                i += repeats * period
+                collapsed = True
+                break
+        if not collapsed:
+            out.append(frames[i])
+            i += 1
+
+    if len(out) > MAX_FRAMES:
+        omitted = len(out) - KEEP_OUTER_FRAMES - KEEP_INNER_FRAMES
+        indent = re.match(r"\s*", out[KEEP_OUTER_FRAMES][0]).group(0)
+        out = out[:KEEP_OUTER_FRAMES] + [[f"{indent}[... {omitted} frames omitted ...]"]] + out[-KEEP_INNER_FRAMES:]
+    return out
+
+
+def collapse_tracebacks(text: str) -> str:
+    """Collapse recursion and cap frame count in every traceback in ``text``."""
+    if "Traceback" not in text:
+        return text
+    out: List[str] = []
+    frames: List[List[str]] = []
+    for is_frame, lines in _segments(text.split("\n")) + [(False, None)]:
+        if is_frame:
+            frames.append(lines)
+            continue
+        if frames:
+            for frame in _collapse_frames(frames):
+                out.extend(frame)
+            frames = []
+        if lines is not None:
+            out.extend(lines)
+    return "\n".join(out)
+
+
+def compact_listing(text: str) -> str:
+    """Re-encode a get_files_info listing: directories first, one short line each."""
+    dirs, files = [], []
+    for line in text.split("\n"):
+        match = _LISTING.match(line)
+        if not match:
+            return text
+        name, size, is_dir = match.groups()
+        if is_dir == "True":
+            dirs.append(f"{name}/")
+        else:
+            files.append(f"{name} {size}")
+    if not dirs and not files:
+        return text
+    header = f"{len(dirs)} dirs, {len(files)} files (sizes in bytes):"
+    return "\n".join([header] + sorted(dirs) + sorted(files))
+
+
+# None: passed through untouched (not even offloaded)
+SHAPERS: Dict[str, Optional[List[Callable[[str], str]]]] = {
+    "get_files_info": [compact_listing],
+    "run_python_file": [collapse_tracebacks, dedupe_lines],
+    "get_file_content": None,
+    "write_file": None,
+    "read_tool_output": None,
+}
+DEFAULT_SHAPERS: List[Callable[[str], str]] = [dedupe_lines]
+
+
+# =============================================================================
+# OFFLOAD
+# =============================================================================
+
+def _cut(text: str, limit: int, from_end: bool = False) -> str:
+    """At most ``limit`` chars from one end of ``text``, on a line boundary when possible."""
+    if from_end:
+        piece = text[-limit:] if limit else ""
+        newline = piece.find("\n")
+        return piece[newline + 1:] if 0 <= newline < len(piece) // 2 else piece
+    piece = text[:limit]
+    newline = piece.rfind("\n")
+    return piece[:newline] if newline > len(piece) // 2 else piece
+
+
+def offload(text: str, max_chars: int = TOOL_OUTPUT_MAX_CHARS) -> str:
+    """Head and tail of ``text`` with a read_tool_output handle for the rest."""
+    if len(text) <= max_chars:
+        return text
+    head = _cut(text, int(max_chars * 0.6))
+    tail = _cut(text, max_chars - len(head), from_end=True)
+    omitted = len(text) - len(head) - len(tail)
+    resume = len(head) + 1 if text[len(head):len(head) + 1] == "\n" else len(head)
+    try:
+        handle = get_blob_store().put(text)
+        where = f'full output: read_tool_output(handle="{handle}", offset={resume})'
+    except OSError:
+        where = "full output unavailable"
+    return f"{head}\n[... {omitted} of {len(text)} chars omitted; {where}]\n{tail}"
+
+
+def shape_output(function_name: str, result: Any, max_chars: int = TOOL_OUTPUT_MAX_CHARS) -> Any:
+    """Shape a tool result before it is added to the conversation."""
+    if not TOOL_OUTPUT_SHAPING:
+        return result
+    shapers = SHAPERS.get(function_name, DEFAULT_SHAPERS)
+    if shapers is None:
+        return result
+
+    if isinstance(result, list) and all(isinstance(item, str) for item in result):
+        # Multi-part MCP results: shaped as one text once they get large
+        if sum(len(item) for item in result) <= max_chars:
+            return result
+        result = "\n\n".join(result)
+    if not isinstance(result, str):
+        return result
+
+    for shaper in shapers:
+        result = shaper(result)
+    return offload(result, max_chars)
+
+
+# =============================================================================
+# BINARY CONTENT
+# =============================================================================
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) read from a PNG, GIF or JPEG header, without decoding the image."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 <= len(data) and data[i] == 0xFF:
+            marker = data[i + 1]
+            if marker == 0xFF or 0xD0 <= marker <= 0xD8 or marker == 0x01:
+                i += 1 if marker == 0xFF else 2
+                continue
+            # Start-of-frame segments carry the dimensions
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def _describe(data: bytes, mime_type: str) -> str:
+    size = image_size(data) if mime_type.startswith("image/") else None
+    dims = f" {size[0]}x{size[1]}" if size else ""
+    kb = len(data) / 1024
+    amount = f"{len(data)} bytes" if kb < 1 else f"{kb:.1f} KB" if kb < 1024 else f"{kb / 1024:.1f} MB"
+    return f"{mime_type}{dims}, {amount}"
+
+
+def spill_binary(data: Union[str, bytes], mime_type: Optional[str]) -> str:
+    """Store binary content (bytes or base64) in the blob store; returns its text reference."""
+    mime_type = mime_type or "application/octet-stream"
+    if isinstance(data, str):
+        try:
+            data = base64.b64decode(data)
+        except (ValueError, binascii.Error):
+            return f"[{mime_type} content omitted: not valid base64]"
+    store = get_blob_store()
+    try:
+        handle = store.put_bytes(data, suffix_for(mime_type))
+    except OSError:
+        return f"[{_describe(data, mime_type)} omitted; it could not be saved]"
+    preview = " and a preview" if mime_type.startswith("image/") else ""
+    return (
+        f"[{_describe(data, mime_type)}, not shown inline; saved to {store.locate(handle)} "
+        f'(read_tool_output(handle="{handle}") for details{preview})]'
+    )
+
+
+def _preview(data: bytes) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """Down-sampled JPEG of an image, stored as a blob: (path, size), or None."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE))
+            out = io.BytesIO()
+            image.convert("RGB").save(out, "JPEG", quality=70)
+            size = image.size
+    except Exception:
+        return None
+    store = get_blob_store()
+    return store.locate(store.put_bytes(out.getvalue(), ".jpg")), size
+
+
+def describe_blob(handle: str, path: str) -> str:
+    """What read_tool_output returns for a binary blob: type, size, file and preview."""
+    mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    with open(path, "rb") as f:
+        data = f.read()
+    lines = [f"Binary tool output {handle}: {_describe(data, mime_type)}", f"File: {path}"]
+    if mime_type.startswith("image/"):
+        preview = _preview(data)
+        if preview:
+            lines.append(f"Preview ({preview[1][0]}x{preview[1][1]} JPEG): {preview[0]}")
+        elif Image is None:
+            lines.append("(Install Pillow for down-sampled previews.)")
+    return "\n".join(lines)
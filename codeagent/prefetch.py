@@ -0,0 +1,140 @@
+"""
+Speculative Prefetch for CodeAgent
+==================================
+While generate_content waits on the model, the agent is idle. The
+Prefetcher looks at each tool call as it completes and, on a background
+thread, warms the read cache with the files the next turn is likely to
+read:
+
+- get_file_content / run_python_file: modules the file imports
+- write_file: tests matching the modified file
+- get_files_info: the Python files in the listed directory
+
+Prefetched files are validated like any cached read (mtime + size), so a
+wrong guess costs only a background read. Per-task hit rates are reported
+in the task summary and telemetry.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from codeagent.config import PREFETCH_MAX_FILES
+from codeagent.file_cache import FileIndex, ReadCache, get_file_index, get_read_cache, new_counters
+from codeagent.tracing import span
+
+_IMPORT = re.compile(
+    r"^[ \t]*(?:from[ \t]+(\.*)([\w.]*)[ \t]+import[ \t]+\(?([\w., \t]*)|import[ \t]+([\w., \t]+))",
+    re.MULTILINE,
+)
+
+
+def parse_imports(source: str) -> List[tuple]:
+    """(module, level) pairs imported by Python ``source``.
+
+    ``from pkg import name`` yields "pkg.name"; the index falls back to
+    "pkg" when name is not a submodule.
+    """
+    imports = []
+    for match in _IMPORT.finditer(source):
+        dots, module, names, plain = match.groups()
+        if plain is not None:
+            for name in plain.split(","):
+                name = name.split(" as ")[0].strip()
+                if name:
+                    imports.append((name, 0))
+            continue
+        level = len(dots)
+        for name in names.split(","):
+            name = name.split(" as ")[0].strip()
+            if name and name != "*":
+                imports.append((f"{module}.{name}" if module else name, level))
+        if not names.strip() and module:
+            imports.append((module, level))
+    return imports
+
+
+class Prefetcher:
+    """Warms the read cache from completed tool calls on a background thread."""
+
+    def __init__(self, working_directory: str, cache: Optional[ReadCache] = None,
+                 max_files: int = PREFETCH_MAX_FILES):
+        self.root = os.path.abspath(working_directory)
+        self.cache = cache or get_read_cache()
+        self.max_files = max_files
+        self._index: Optional[FileIndex] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gent-prefetch")
+        # This task's reads (counted under count_reads) and prefetches only;
+        # the cache's own totals mix in every other task in the process
+        self.counters = new_counters()
+
+    @property
+    def index(self) -> FileIndex:
+        # Fetched on the prefetch thread the first time it is needed; a
+        # long-lived process (the daemon) reuses it across tasks
+        if self._index is None:
+            self._index = get_file_index(self.root)
+        return self._index
+
+    def observe(self, function_name: str, function_args: Dict[str, Any]):
+        """Schedule prefetching for a completed tool call."""
+        try:
+            self._executor.submit(self._prefetch, function_name, dict(function_args))
+        except RuntimeError:
+            pass  # closed
+
+    def _prefetch(self, function_name: str, function_args: Dict[str, Any]):
+        try:
+            with span("prefetch", "io", tool=function_name):
+                for path in self.candidates(function_name, function_args)[:self.max_files]:
+                    self.cache.warm(path, self.counters)
+        except Exception:
+            pass  # speculative: never surface errors
+
+    def _resolve(self, relative: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.root, relative))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    def candidates(self, function_name: str, function_args: Dict[str, Any]) -> List[str]:
+        """Files likely to be read after this tool call, most likely first."""
+        found: List[str] = []
+        if function_name in ("get_file_content", "run_python_file"):
+            path = self._resolve(function_args.get("file_path", ""))
+            if path and path.endswith(".py") and os.path.isfile(path):
+                source = self.cache.peek(path)
+                if source is None:
+                    with open(path, "r", encoding="utf-8") as f:
+                        source = f.read()
+                for module, level in parse_imports(source):
+                    target = self.index.resolve_module(module, importer=path, level=level)
+                    if target and target != path:
+                        found.append(target)
+        elif function_name == "write_file":
+            path = self._resolve(function_args.get("file_path", ""))
+            if path:
+                found.extend(self.index.tests_for(path))
+        elif function_name == "get_files_info":
+            directory = self._resolve(function_args.get("directory", "."))
+            if directory and os.path.isdir(directory):
+                found.extend(
+                    os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                    if name.endswith(".py") and os.path.isfile(os.path.join(directory, name))
+                )
+        return list(dict.fromkeys(found))
+
+    def stats(self) -> Dict[str, Any]:
+        """This task's read-cache counters, with hit rates."""
+        delta: Dict[str, Any] = dict(self.counters)
+        reads = delta["reads"]
+        delta["hit_rate"] = round(delta["hits"] / reads, 3) if reads else None
+        # Share of prefetched files the agent then actually read
+        delta["prefetch_accuracy"] = (
+            round(delta["prefetch_hits"] / delta["prefetched"], 3) if delta["prefetched"] else None
+        )
+        return delta
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
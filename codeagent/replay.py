@@ -0,0 +1,232 @@
+"""
+Record/Replay Providers for CodeAgent
+=====================================
+RecordingProvider wraps a live OpenRouterProvider and appends every
+request/response pair of a task to a cassette; ReplayProvider serves a
+cassette back in order without network access, so the agent loop can be
+run and benchmarked deterministically.
+
+A cassette is a JSONL file: a "meta" record (model, pricing, task, fixture)
+followed by one "interaction" record per model call, holding the OpenAI
+request params, the completion as plain JSON, the recorded latency and a
+fingerprint of the request (messages + tools).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from codeagent.model_provider import OpenRouterProvider
+from codeagent.tracing import span
+
+CASSETTE_VERSION = 1
+
+
+class ReplayMismatch(Exception):
+    """A replayed request differs from the recorded one (strict mode)."""
+
+
+# =============================================================================
+# SERIALIZATION
+# =============================================================================
+
+_DIGITS = re.compile(r"\d+")
+
+
+def request_fingerprint(params: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a request the agent loop controls.
+
+    Numbers in tool results are ignored: tool output carries timings and
+    sizes (e.g. "Ran 9 tests in 0.001s") that differ from run to run.
+    """
+    messages = [
+        {**m, "content": _DIGITS.sub("#", m["content"])}
+        if m.get("role") == "tool" and isinstance(m.get("content"), str) else m
+        for m in params.get("messages") or []
+    ]
+    payload = json.dumps(
+        {"messages": messages, "tools": params.get("tools")},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def to_plain(value: Any) -> Any:
+    """Completion objects (pydantic or SimpleNamespace) as plain JSON data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, SimpleNamespace):
+        return {k: to_plain(v) for k, v in vars(value).items()}
+    if isinstance(value, dict):
+        return {k: to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    return value
+
+
+def to_namespace(value: Any) -> Any:
+    """Plain JSON data back into an attribute-access completion object."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+# =============================================================================
+# CASSETTE
+# =============================================================================
+
+class Cassette:
+    """Append-only JSONL file of recorded model interactions."""
+
+    def __init__(self, path: str, meta: Dict[str, Any], interactions: List[Dict[str, Any]]):
+        self.path = path
+        self.meta = meta
+        self.interactions = interactions
+
+    @classmethod
+    def create(cls, path: str, meta: Dict[str, Any]) -> "Cassette":
+        """Start a new cassette at ``path``, replacing any existing file."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        meta = {
+            "type": "meta",
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            **meta,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(meta, default=str) + "\n")
+        return cls(path, meta, [])
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Read a cassette; a torn trailing line (interrupted recording) is skipped."""
+        meta: Dict[str, Any] = {}
+        interactions = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("type") == "meta":
+                    meta = record
+                elif record.get("type") == "interaction":
+                    interactions.append(record)
+        if not meta:
+            raise ValueError(f"{path} is not a cassette (no meta record)")
+        return cls(path, meta, interactions)
+
+    def record(self, params: Dict[str, Any], completion: Any, latency: float):
+        interaction = {
+            "type": "interaction",
+            "fingerprint": request_fingerprint(params),
+            "latency": round(latency, 4),
+            "request": params,
+            "response": to_plain(completion),
+        }
+        self.interactions.append(interaction)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(interaction, default=str) + "\n")
+            f.flush()
+
+
+# =============================================================================
+# PROVIDERS
+# =============================================================================
+
+class RecordingProvider:
+    """Wraps a live provider and records each model call to a cassette."""
+
+    def __init__(self, provider: OpenRouterProvider, path: str, **meta):
+        self.provider = provider
+        pricing = getattr(provider, "pricing", {}) or {}
+        models = {provider.model_id, getattr(provider, "fallback_model_id", None)}
+        self.cassette = Cassette.create(path, {
+            "model": provider.model_id,
+            "pricing": {m: pricing[m] for m in models if m in pricing},
+            **meta,
+        })
+
+    def generate_content(
+        self,
+        messages: List[Any],
+        tools: Optional[List[Any]] = None,
+        system_instruction: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Any:
+        provider = self.provider
+        with span("convert_request", "convert", messages=len(messages)):
+            params = provider._build_params(messages, tools, system_instruction, model)
+
+        started = time.perf_counter()
+        completion = provider._create_completion(params)
+        latency = time.perf_counter() - started
+        self.cassette.record(params, completion, latency)
+
+        with span("convert_response", "convert"):
+            return provider._convert_response_to_gemini_format(completion, latency=latency, model=params["model"])
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+
+class ReplayProvider(OpenRouterProvider):
+    """
+    Serves a cassette's responses in order instead of calling OpenRouter.
+
+    Requests still go through _build_params and responses through the
+    Gemini-format conversion, so conversion overhead is measured. A request
+    whose fingerprint differs from the recording is counted in
+    ``mismatches`` (or raises ReplayMismatch when ``strict``). Once the
+    cassette runs out, a final text response ends the task and
+    ``exhausted`` is set.
+    """
+
+    def __init__(self, cassette: Cassette, strict: bool = False, latency_scale: float = 0.0):
+        self.api_key = None
+        self.model_id = cassette.meta.get("model") or "replay"
+        self.fallback_model_id = None
+        self.stream = False
+        self.pricing = cassette.meta.get("pricing") or {}
+        self.cassette = cassette
+        self.strict = strict
+        self.latency_scale = latency_scale
+        self.position = 0
+        self.mismatches: List[int] = []
+        self.exhausted = False
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "ReplayProvider":
+        return cls(Cassette.load(path), **kwargs)
+
+    def _create_completion(self, params: Dict[str, Any]) -> Any:
+        if self.position >= len(self.cassette.interactions):
+            self.exhausted = True
+            return to_namespace({
+                "model": self.model_id,
+                "choices": [{"message": {"content": "Replay cassette exhausted.", "tool_calls": None}}],
+                "usage": None,
+            })
+
+        interaction = self.cassette.interactions[self.position]
+        self.position += 1
+        if request_fingerprint(params) != interaction["fingerprint"]:
+            if self.strict:
+                raise ReplayMismatch(
+                    f"request {self.position} differs from the recording in {self.cassette.path}"
+                )
+            self.mismatches.append(self.position)
+
+        if self.latency_scale:
+            time.sleep(interaction.get("latency", 0) * self.latency_scale)
+        return to_namespace(interaction["response"])
@@ -0,0 +1,328 @@
+"""
+Resilience Layer for Model Calls
+================================
+Retries transient failures (429, 5xx, connection errors) with exponential
+backoff and full jitter, honouring Retry-After. Optionally hedges a slow
+request by firing the same request at a fallback model once the primary
+exceeds a latency percentile of its recent calls; the first response wins.
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from openai import APIConnectionError, APIStatusError
+
+from codeagent.config import MODEL_MAX_RETRIES, MODEL_RETRY_BASE_DELAY, MODEL_RETRY_MAX_DELAY
+
+
+# =============================================================================
+# RETRY WITH BACKOFF
+# =============================================================================
+
+@dataclass
+class RetryPolicy:
+    """How transient model-call failures are retried."""
+    max_retries: int = MODEL_MAX_RETRIES
+    base_delay: float = MODEL_RETRY_BASE_DELAY
+    max_delay: float = MODEL_RETRY_MAX_DELAY
+    retry_statuses: tuple = (408, 409, 429, 500, 502, 503, 504)
+
+
+def is_retryable(error: Exception, policy: RetryPolicy) -> bool:
+    """True for rate limits, server errors, timeouts and dropped connections."""
+    if isinstance(error, APIStatusError):
+        return error.status_code in policy.retry_statuses or error.status_code >= 500
+    return isinstance(error, APIConnectionError)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from an error response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def backoff_delay(attempt: int, policy: RetryPolicy, retry_after: Optional[float] = None) -> float:
+    """Delay before retry number ``attempt`` (0-based): Retry-After, else full-jitter backoff."""
+    if retry_after is not None:
+        return min(retry_after, policy.max_delay)
+    ceiling = min(policy.max_delay, policy.base_delay * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    policy: RetryPolicy,
+    on_retry: Optional[Callable[[Exception, int, float], None]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Any:
+    """Call ``fn``, retrying transient failures according to ``policy``."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e, policy):
+                raise
+            delay = backoff_delay(attempt, policy, retry_after_seconds(e))
+            if on_retry:
+                on_retry(e, attempt + 1, delay)
+            sleep(delay)
+            attempt += 1
+
+
+async def async_call_with_retry(
+    fn: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    on_retry: Optional[Callable[[Exception, int, float], None]] = None,
+) -> Any:
+    """Async counterpart of call_with_retry."""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e, policy):
+                raise
+            delay = backoff_delay(attempt, policy, retry_after_seconds(e))
+            if on_retry:
+                on_retry(e, attempt + 1, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+# =============================================================================
+# HEDGED REQUESTS
+# =============================================================================
+
+class LatencyTracker:
+    """Recent successful call latencies per model."""
+
+    def __init__(self, window: int = 100):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, model: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, model: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """The ``pct`` percentile latency, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class HedgedCaller:
+    """Runs a primary call and, if it runs long, races a hedge call against it."""
+
+    def __init__(self, tracker: LatencyTracker, percentile: float, min_samples: int, max_workers: int = 8):
+        self.tracker = tracker
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _threshold(self, model: str, hedge: Optional[Callable]) -> Optional[float]:
+        """Seconds to wait on the primary before hedging (None: never hedge)."""
+        if hedge is None or self.percentile <= 0:
+            return None
+        return self.tracker.percentile(model, self.percentile, self.min_samples)
+
+    def call(self, model: str, primary: Callable[[], Any], hedge: Optional[Callable[[], Any]] = None) -> Any:
+        """Return the primary result, or the hedge's if it finishes first."""
+        threshold = self._threshold(model, hedge)
+        started = time.perf_counter()
+
+        def timed_primary():
+            result = primary()
+            self.tracker.record(model, time.perf_counter() - started)
+            return result
+
+        if threshold is None:
+            return timed_primary()
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="gent-hedge")
+        primary_future = self._executor.submit(timed_primary)
+        done, _ = wait([primary_future], timeout=threshold)
+        if done:
+            return primary_future.result()
+
+        self.hedges_fired += 1
+        hedge_future = self._executor.submit(hedge)
+        pending = {primary_future, hedge_future}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser keeps running in the background; its result is dropped
+                    if future is hedge_future:
+                        self.hedges_won += 1
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+
+class AsyncHedgedCaller(HedgedCaller):
+    """Async HedgedCaller; the losing request is cancelled."""
+
+    async def call(self, model: str, primary: Callable[[], Awaitable[Any]],
+                   hedge: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        threshold = self._threshold(model, hedge)
+        started = time.perf_counter()
+
+        async def timed_primary():
+            result = await primary()
+            self.tracker.record(model, time.perf_counter() - started)
+            return result
+
+        if threshold is None:
+            return await timed_primary()
+
+        primary_task = asyncio.ensure_future(timed_primary())
+        done, _ = await asyncio.wait({primary_task}, timeout=threshold)
+        if done:
+            return primary_task.result()
+
+        self.hedges_fired += 1
+        hedge_task = asyncio.ensure_future(hedge())
+        pending = {primary_task, hedge_task}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if task is hedge_task:
+                        self.hedges_won += 1
+                    return task.result()
+                error = error or task.exception()
+        raise error
+
+
+# =============================================================================
+# PER-MODEL RATE LIMITS
+# =============================================================================
+
+class ModelRateLimiter:
+    """
+    Per-model request accounting and rate limiting.
+
+    Enforces an optional requests-per-minute budget per model, and backs off
+    a model entirely after a 429 or when OpenRouter reports its remaining
+    quota as exhausted (X-RateLimit-Remaining / X-RateLimit-Reset).
+    """
+
+    def __init__(self, requests_per_minute: int = 0, per_model: Optional[Dict[str, int]] = None):
+        self.requests_per_minute = requests_per_minute
+        self.per_model = per_model or {}
+        self._lock = threading.Lock()
+        self._windows: Dict[str, deque] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+
+    def _model_stats(self, model: str) -> Dict[str, Any]:
+        return self.stats.setdefault(model, {
+            "requests": 0,
+            "rate_limited": 0,
+            "waited_seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "remaining": None,
+        })
+
+    def _delay(self, model: str, now: float) -> float:
+        """Seconds until another request to ``model`` is allowed."""
+        delay = self._blocked_until.get(model, 0.0) - now
+        limit = self.per_model.get(model, self.requests_per_minute)
+        if limit > 0:
+            window = self._windows.setdefault(model, deque())
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if len(window) >= limit:
+                delay = max(delay, 60 - (now - window[0]))
+        return max(0.0, delay)
+
+    async def acquire(self, model: str):
+        """Wait until ``model`` has budget, then count the request."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._delay(model, now)
+                stats = self._model_stats(model)
+                if delay <= 0:
+                    self._windows.setdefault(model, deque()).append(now)
+                    stats["requests"] += 1
+                    return
+                stats["waited_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    def record_response(self, model: str, headers: Any = None, usage: Any = None):
+        """Account tokens and any quota headers from a successful response."""
+        with self._lock:
+            stats = self._model_stats(model)
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                stats["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+            remaining = headers.get("x-ratelimit-remaining") if headers else None
+            if remaining is None:
+                return
+            stats["remaining"] = remaining
+            reset = headers.get("x-ratelimit-reset")
+            if remaining == "0" and reset:
+                try:
+                    # OpenRouter reports the reset as epoch milliseconds
+                    wait_seconds = float(reset) / 1000 - time.time()
+                except ValueError:
+                    return
+                if wait_seconds > 0:
+                    self._blocked_until[model] = time.monotonic() + wait_seconds
+
+    def record_rate_limited(self, model: str, retry_after: Optional[float] = None):
+        """Account a 429 and hold the model back until it may be retried."""
+        with self._lock:
+            self._model_stats(model)["rate_limited"] += 1
+            until = time.monotonic() + (retry_after if retry_after is not None else 1.0)
+            self._blocked_until[model] = max(self._blocked_until.get(model, 0.0), until)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {model: dict(stats) for model, stats in self.stats.items()}
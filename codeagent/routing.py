@@ -0,0 +1,148 @@
+"""
+Tiered Model Routing for CodeAgent
+==================================
+RoutedProvider picks a model per iteration: a cheap model for the many
+turns that only explore or re-run checks, the strong model where quality
+matters. The phase of the next turn is inferred from the previous one:
+
+- explore: start of a task, or the last turn only read files/listings
+- verify:  the last turn wrote files or ran code that succeeded
+- debug:   the last turn's tool output shows a failure (traceback, non-zero exit)
+- recover: the loop reported an error and asked for a different approach
+
+explore/verify go to the cheap model; debug/recover go to the strong one.
+If the cheap model proposes an edit (write_file), its answer is discarded
+and the turn is re-asked of the strong model, so every edit comes from the
+strong model.
+
+Each response carries a ``route`` dict (phase, models, escalation, cost of
+discarded calls) that telemetry logs and summarises as savings.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+
+from codeagent.telemetry import compute_cost
+
+console = Console()
+
+READ_ONLY_TOOLS = {"get_files_info", "get_file_content"}
+ESCALATE_TOOLS = {"write_file"}
+CHEAP_PHASES = {"explore", "verify"}
+
+_FAILURE = re.compile(r"Traceback \(most recent call last\)|Process exited with code [1-9]|^FAILED|^Error:", re.MULTILINE)
+_RECOVER_PROMPT = "There was an error."
+
+
+def _tool_failed(response: Any) -> bool:
+    if isinstance(response, dict):
+        if "error" in response:
+            return True
+        response = response.get("result", "")
+    return bool(_FAILURE.search(str(response)))
+
+
+def detect_phase(messages: List[Any]) -> str:
+    """Phase of the next turn, from the most recent message(s)."""
+    if not messages:
+        return "explore"
+
+    last = messages[-1]
+    if last.role == "user":
+        text = " ".join(getattr(p, "text", "") or "" for p in last.parts)
+        return "recover" if text.startswith(_RECOVER_PROMPT) else "explore"
+
+    if last.role != "tool":
+        return "explore"
+
+    names = []
+    for part in last.parts:
+        response = getattr(part, "function_response", None)
+        if response is None:
+            continue
+        names.append(response.name)
+        if _tool_failed(response.response):
+            return "debug"
+
+    if names and all(name in READ_ONLY_TOOLS for name in names):
+        return "explore"
+    return "verify"
+
+
+def proposes(response: Any, tools: set) -> List[str]:
+    """Names from ``tools`` that a model response calls."""
+    names = []
+    for candidate in getattr(response, "candidates", []) or []:
+        for part in candidate.content.parts:
+            call = getattr(part, "function_call", None)
+            if call is not None and call.name in tools:
+                names.append(call.name)
+    return names
+
+
+def _response_cost(response: Any, pricing: Dict[str, Dict[str, float]]) -> Optional[float]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return compute_cost(
+        pricing.get(getattr(response, "model", None) or ""),
+        usage.prompt_token_count,
+        usage.cached_content_token_count,
+        usage.candidates_token_count,
+    )
+
+
+class RoutedProvider:
+    """Wraps a provider and routes each call to a cheap or strong model."""
+
+    def __init__(self, provider: Any, cheap_model: str, strong_model: Optional[str] = None,
+                 escalate_tools: Optional[set] = None):
+        self.provider = provider
+        self.cheap_model = cheap_model
+        self.strong_model = strong_model or provider.model_id
+        self.escalate_tools = escalate_tools if escalate_tools is not None else ESCALATE_TOOLS
+        console.print(f"[dim]Routing: {self.cheap_model} for exploration/verification, "
+                      f"{self.strong_model} for edits/debugging[/dim]\n")
+
+    def generate_content(
+        self,
+        messages: List[Any],
+        tools: Optional[List[Any]] = None,
+        system_instruction: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Any:
+        if model:
+            return self.provider.generate_content(messages, tools, system_instruction, model=model)
+
+        phase = detect_phase(messages)
+        chosen = self.cheap_model if phase in CHEAP_PHASES else self.strong_model
+        response = self.provider.generate_content(messages, tools, system_instruction, model=chosen)
+
+        escalated = None
+        wasted_cost = None
+        if chosen != self.strong_model:
+            edits = proposes(response, self.escalate_tools)
+            if edits:
+                # Edits always come from the strong model
+                escalated = edits[0]
+                wasted_cost = _response_cost(response, self.pricing)
+                console.print(f"[dim yellow]↑ {self.cheap_model} proposed {escalated}; "
+                              f"asking {self.strong_model}[/dim yellow]")
+                phase = "edit"
+                chosen = self.strong_model
+                response = self.provider.generate_content(messages, tools, system_instruction, model=chosen)
+
+        response.route = {
+            "phase": phase,
+            "model": chosen,
+            "cheap_model": self.cheap_model,
+            "strong_model": self.strong_model,
+            "escalated": escalated,
+            "wasted_cost_usd": wasted_cost,
+        }
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
@@ -0,0 +1,307 @@
+"""
+Session Store for CodeAgent
+===========================
+Persists conversation state to an append-only JSONL log so a task can be
+resumed after a crash or quit without repeating the exploration.
+
+Each line in the log is one record:
+  {"t": "meta", ...}   session header (task, working directory, timestamp)
+  {"t": "msg", ...}    one conversation message (role + parts)
+  {"t": "tool", ...}   one tool result with the hashes of the inputs it read
+  {"t": "file", ...}   hash of a file after the agent wrote it
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from codeagent.config import SESSIONS_DIR
+
+# Tools whose results depend only on their arguments and the files they read.
+# Their results can be served from the log when those inputs are unchanged.
+CACHEABLE_TOOLS = {"get_file_content", "get_files_info"}
+
+
+# =============================================================================
+# INPUT HASHING
+# =============================================================================
+
+def hash_file(path: str) -> Optional[str]:
+    """Return the sha256 of a file's bytes, or None if it can't be read."""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def hash_directory_listing(path: str) -> Optional[str]:
+    """Return a hash of a directory's entries (name, size, is_dir)."""
+    try:
+        entries = []
+        for entry in sorted(os.listdir(path)):
+            entry_path = os.path.join(path, entry)
+            entries.append([entry, os.path.getsize(entry_path), os.path.isdir(entry_path)])
+        return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+    except OSError:
+        return None
+
+
+def tool_input_hashes(name: str, args: Dict[str, Any], working_directory: str) -> Dict[str, Optional[str]]:
+    """Hash the on-disk inputs a cacheable tool call reads."""
+    if name == "get_file_content":
+        file_path = args.get("file_path", "")
+        return {file_path: hash_file(os.path.join(working_directory, file_path))}
+    if name == "get_files_info":
+        directory = args.get("directory", ".")
+        return {directory: hash_directory_listing(os.path.join(working_directory, directory))}
+    return {}
+
+
+def tool_call_key(name: str, args: Dict[str, Any]) -> str:
+    """Stable key for a tool call: tool name plus canonical JSON arguments."""
+    canonical = json.dumps([name, args], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+# =============================================================================
+# MESSAGE SERIALIZATION
+# =============================================================================
+
+def _serialize_part(part: Any, tool_refs: Dict[int, int]) -> Optional[Dict[str, Any]]:
+    """Convert a MockPart (or provider response part) to a JSON-able dict."""
+    function_call = getattr(part, "function_call", None)
+    if function_call:
+        call = {"name": function_call.name, "args": dict(function_call.args)}
+        if getattr(function_call, "id", None):
+            call["id"] = function_call.id
+        return {"call": call}
+
+    function_response = getattr(part, "function_response", None)
+    if function_response:
+        ref = tool_refs.get(id(part))
+        if ref is not None:
+            return {"resp": {"name": function_response.name, "ref": ref}}
+        return {"resp": {"name": function_response.name, "response": function_response.response}}
+
+    text = getattr(part, "text", "")
+    if text:
+        return {"text": text}
+    return None
+
+
+def _deserialize_part(data: Dict[str, Any], tool_records: Dict[int, Dict[str, Any]]) -> Any:
+    """Rebuild a MockPart from its serialized form."""
+    from codeagent.model_provider import MockPart, MockFunctionCall
+
+    if "call" in data:
+        call = data["call"]
+        return MockPart(function_call=MockFunctionCall(call["name"], call["args"], call.get("id")))
+
+    if "resp" in data:
+        resp = data["resp"]
+        if "ref" in resp and resp["ref"] in tool_records:
+            response = tool_records[resp["ref"]]["response"]
+        else:
+            response = resp.get("response", {})
+        return MockPart.from_function_response(name=resp["name"], response=response)
+
+    return MockPart(text=data.get("text", ""))
+
+
+# =============================================================================
+# SESSION STORE
+# =============================================================================
+
+class SessionStore:
+    """Append-only on-disk log of one agent task."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session_id = os.path.splitext(os.path.basename(path))[0]
+        self.meta: Dict[str, Any] = {}
+        self.messages: List[Any] = []
+        # Latest result per call key, and every result by its record id
+        self.tool_results: Dict[str, Dict[str, Any]] = {}
+        self.tool_records: Dict[int, Dict[str, Any]] = {}
+        # Results loaded from an earlier run; within a live task ToolMemo dedupes
+        self.resumed_results: Dict[str, Dict[str, Any]] = {}
+        self.file_hashes: Dict[str, str] = {}
+        self._logged_messages = 0
+        self._tool_refs: Dict[int, int] = {}
+        self._file = None
+
+    @staticmethod
+    def sessions_dir(working_directory: str) -> str:
+        """Directory holding the session logs for a working directory."""
+        abs_dir = os.path.abspath(working_directory)
+        slug = os.path.basename(abs_dir.rstrip(os.sep)) or "root"
+        digest = hashlib.sha256(abs_dir.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(SESSIONS_DIR, f"{slug}-{digest}")
+
+    @classmethod
+    def create(cls, working_directory: str, task: str) -> "SessionStore":
+        """Start a new session log for a task."""
+        directory = cls.sessions_dir(working_directory)
+        os.makedirs(directory, exist_ok=True)
+        session_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        store = cls(os.path.join(directory, f"{session_id}.jsonl"))
+        store.meta = {
+            "t": "meta",
+            "task": task,
+            "working_directory": os.path.abspath(working_directory),
+            "created": time.time(),
+        }
+        store._append(store.meta)
+        return store
+
+    @classmethod
+    def open(cls, working_directory: str, session_id: Optional[str] = None) -> "SessionStore":
+        """Open an existing session (the most recent one if no id is given)."""
+        directory = cls.sessions_dir(working_directory)
+        if session_id and session_id != "latest":
+            path = os.path.join(directory, f"{session_id}.jsonl")
+        else:
+            logs = sorted(f for f in os.listdir(directory) if f.endswith(".jsonl")) if os.path.isdir(directory) else []
+            if not logs:
+                raise FileNotFoundError(f"No saved sessions for {os.path.abspath(working_directory)}")
+            path = os.path.join(directory, logs[-1])
+
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Session not found: {session_id}")
+
+        store = cls(path)
+        store._load()
+        return store
+
+    def _load(self):
+        """Rebuild session state in a single pass over the log."""
+        messages_data = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one torn trailing line
+                    continue
+
+                kind = record.get("t")
+                if kind == "meta":
+                    self.meta = record
+                elif kind == "msg":
+                    messages_data.append(record)
+                elif kind == "tool":
+                    self.tool_results[record["key"]] = record
+                    self.tool_records[record["id"]] = record
+                elif kind == "file":
+                    self.file_hashes[record["path"]] = record["sha"]
+        self.resumed_results = dict(self.tool_results)
+
+        from codeagent.model_provider import MockContent
+
+        for record in messages_data:
+            parts = [_deserialize_part(p, self.tool_records) for p in record.get("parts", [])]
+            self.messages.append(MockContent(role=record.get("role", "user"), parts=parts))
+        self._logged_messages = len(self.messages)
+
+    def _append(self, record: Dict[str, Any]):
+        """Append one record and flush so it survives a crash."""
+        if self._file is None:
+            # Terminate a torn trailing line left by a crash before appending
+            torn = False
+            if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self._file.write("\n")
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self._file.flush()
+
+    def sync(self, messages: List[Any]):
+        """Append any messages not yet written to the log."""
+        for content in messages[self._logged_messages:]:
+            parts = [_serialize_part(p, self._tool_refs) for p in getattr(content, "parts", [])]
+            self._append({
+                "t": "msg",
+                "role": getattr(content, "role", "user"),
+                "parts": [p for p in parts if p is not None],
+            })
+        self._logged_messages = len(messages)
+
+    def record_tool_call(self, name: str, args: Dict[str, Any], response: Dict[str, Any],
+                         working_directory: str, part: Any = None):
+        """Log a tool result (and the hashes of its inputs) for later reuse."""
+        key = tool_call_key(name, args)
+        record = {
+            "t": "tool",
+            "id": len(self.tool_records),
+            "key": key,
+            "name": name,
+            "args": args,
+            "inputs": tool_input_hashes(name, args, working_directory),
+            "response": response,
+        }
+        self.tool_results[key] = record
+        self.tool_records[record["id"]] = record
+        self.resumed_results.pop(key, None)
+        self._append(record)
+        if part is not None:
+            self._tool_refs[id(part)] = record["id"]
+
+    def lookup_tool_call(self, name: str, args: Dict[str, Any], working_directory: str) -> Optional[Dict[str, Any]]:
+        """Return a result logged by an earlier run if the call's inputs are unchanged since."""
+        if name not in CACHEABLE_TOOLS:
+            return None
+        record = self.resumed_results.get(tool_call_key(name, args))
+        if record is None:
+            return None
+        inputs = tool_input_hashes(name, args, working_directory)
+        if None in inputs.values() or inputs != record.get("inputs"):
+            return None
+        return record["response"]
+
+    def link_tool_result(self, part: Any, name: str, args: Dict[str, Any]):
+        """Point a response part at an already logged tool result."""
+        record = self.tool_results.get(tool_call_key(name, args))
+        if record is not None:
+            self._tool_refs[id(part)] = record["id"]
+
+    def record_file_write(self, file_path: str, working_directory: str):
+        """Log the hash of a file the agent just wrote."""
+        sha = hash_file(os.path.join(working_directory, file_path))
+        if sha:
+            self.file_hashes[file_path] = sha
+            self._append({"t": "file", "path": file_path, "sha": sha})
+
+    def changed_files(self, working_directory: str) -> List[str]:
+        """Files written by the agent that have changed on disk since."""
+        return [
+            path for path, sha in self.file_hashes.items()
+            if hash_file(os.path.join(working_directory, path)) != sha
+        ]
+
+    def pending_function_calls(self) -> List[Any]:
+        """Function call parts from the last model turn that never got responses."""
+        if not self.messages:
+            return []
+        last = self.messages[-1]
+        if getattr(last, "role", "") != "model":
+            return []
+        return [p for p in last.parts if getattr(p, "function_call", None)]
+
+    def close(self):
+        """Close the log file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,324 @@
+"""
+Telemetry for CodeAgent
+=======================
+Per-iteration instrumentation of the agent loop: model latency, time to
+first token, prompt/completion/cached tokens, dollar cost (from the
+OpenRouter catalogue pricing) and tool execution time split by tool.
+
+Each iteration is emitted as a structured event; a task summary closes the
+task. Events go to an optional JSONL sink for offline analysis, and the
+summary can be rendered as a Rich table.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from codeagent.config import TELEMETRY_FILE
+
+
+# =============================================================================
+# PRICING
+# =============================================================================
+
+def parse_pricing(models: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Per-token USD prices by model id, parsed once from the catalogue."""
+    pricing = {}
+    for model in models:
+        raw = model.get("pricing") or {}
+        try:
+            prompt = float(raw.get("prompt", 0) or 0)
+            completion = float(raw.get("completion", 0) or 0)
+            cache_read = float(raw.get("input_cache_read", prompt) or 0)
+        except (TypeError, ValueError):
+            continue
+        pricing[model.get("id", "")] = {
+            "prompt": prompt,
+            "completion": completion,
+            "input_cache_read": cache_read,
+        }
+    return pricing
+
+
+def compute_cost(prices: Optional[Dict[str, float]], prompt_tokens: int,
+                 cached_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Dollar cost of one request, or None when the model's pricing is unknown."""
+    if not prices:
+        return None
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (
+        uncached * prices["prompt"]
+        + cached_tokens * prices["input_cache_read"]
+        + completion_tokens * prices["completion"]
+    )
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+class JsonlSink:
+    """Thread-safe append-only JSONL event sink."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+
+    def emit(self, event: Dict[str, Any]):
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+_sinks: Dict[str, JsonlSink] = {}
+_sinks_lock = threading.Lock()
+_default_path = TELEMETRY_FILE
+
+
+def set_default_sink(path: Optional[str]):
+    """Override GENT_TELEMETRY_FILE (e.g. from the --telemetry flag)."""
+    global _default_path
+    _default_path = path or ""
+
+
+def get_jsonl_sink(path: Optional[str] = None) -> Optional[JsonlSink]:
+    """Shared sink for a path (the default sink if omitted), or None."""
+    path = path or _default_path
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _sinks_lock:
+        if path not in _sinks:
+            _sinks[path] = JsonlSink(path)
+        return _sinks[path]
+
+
+# =============================================================================
+# TASK TELEMETRY
+# =============================================================================
+
+class TaskTelemetry:
+    """Collects per-iteration metrics for one process_request task."""
+
+    def __init__(self, task: str, pricing: Optional[Dict[str, Dict[str, float]]] = None,
+                 sink: Optional[JsonlSink] = None):
+        self.task_id = uuid.uuid4().hex[:12]
+        self.task = task
+        self.pricing = pricing or {}
+        self.sink = sink
+        self.started = time.perf_counter()
+        # Read-cache/prefetch counters for the task, set by the agent loop
+        self.read_cache: Optional[Dict[str, Any]] = None
+        self.tool_memo: Optional[Dict[str, Any]] = None
+        self.iterations: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+
+    def _emit(self, event: Dict[str, Any]):
+        if self.sink:
+            self.sink.emit(event)
+
+    def begin_iteration(self, iteration: int):
+        self.end_iteration()
+        self._current = {
+            "event": "iteration",
+            "task_id": self.task_id,
+            "iteration": iteration,
+            "timestamp": time.time(),
+            "model": None,
+            "model_latency_s": None,
+            "ttft_s": None,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": None,
+            "route": None,
+            "tools": {},
+            "tool_seconds": 0.0,
+        }
+
+    def record_model_call(self, response: Any, model: str, latency: float) -> Dict[str, Any]:
+        """Record the model call of the current iteration from its response."""
+        event = self._current
+        usage = getattr(response, "usage_metadata", None)
+        model = getattr(response, "model", None) or model
+        event["model"] = model
+        event["model_latency_s"] = round(latency, 4)
+        ttft = getattr(response, "ttft", None)
+        event["ttft_s"] = round(ttft, 4) if ttft is not None else None
+        if usage:
+            event["prompt_tokens"] = usage.prompt_token_count
+            event["cached_tokens"] = usage.cached_content_token_count
+            event["completion_tokens"] = usage.candidates_token_count
+            event["cost_usd"] = compute_cost(
+                self.pricing.get(model),
+                usage.prompt_token_count,
+                usage.cached_content_token_count,
+                usage.candidates_token_count,
+            )
+
+        route = getattr(response, "route", None)
+        if route:
+            # What this turn would have cost on the strong model, for savings
+            strong_cost = None
+            if usage:
+                strong_cost = compute_cost(
+                    self.pricing.get(route["strong_model"]),
+                    usage.prompt_token_count,
+                    usage.cached_content_token_count,
+                    usage.candidates_token_count,
+                )
+            event["route"] = {
+                "phase": route["phase"],
+                "escalated": route["escalated"],
+                "wasted_cost_usd": route["wasted_cost_usd"],
+                "strong_cost_usd": strong_cost,
+            }
+        return event
+
+    def record_tool_call(self, tool: str, seconds: float, ok: bool = True):
+        """Record one tool execution in the current iteration."""
+        stats = self._current["tools"].setdefault(tool, {"calls": 0, "seconds": 0.0, "errors": 0})
+        stats["calls"] += 1
+        stats["seconds"] = round(stats["seconds"] + seconds, 4)
+        if not ok:
+            stats["errors"] += 1
+        self._current["tool_seconds"] = round(self._current["tool_seconds"] + seconds, 4)
+
+    def end_iteration(self):
+        if self._current is not None:
+            self.iterations.append(self._current)
+            self._emit(self._current)
+            self._current = None
+
+    def summary(self, status: Optional[str] = None) -> Dict[str, Any]:
+        """Totals across the task's iterations."""
+        self.end_iteration()
+        latencies = sorted(i["model_latency_s"] for i in self.iterations if i["model_latency_s"] is not None)
+        ttfts = [i["ttft_s"] for i in self.iterations if i["ttft_s"] is not None]
+        costs = [i["cost_usd"] for i in self.iterations if i["cost_usd"] is not None]
+
+        tools: Dict[str, Dict[str, Any]] = {}
+        for iteration in self.iterations:
+            for name, stats in iteration["tools"].items():
+                total = tools.setdefault(name, {"calls": 0, "seconds": 0.0, "errors": 0})
+                total["calls"] += stats["calls"]
+                total["seconds"] = round(total["seconds"] + stats["seconds"], 4)
+                total["errors"] += stats["errors"]
+
+        routing = None
+        routed = [i for i in self.iterations if i.get("route")]
+        if routed:
+            phases: Dict[str, int] = {}
+            for iteration in routed:
+                phase = iteration["route"]["phase"]
+                phases[phase] = phases.get(phase, 0) + 1
+            priced = [i for i in routed if i["cost_usd"] is not None and i["route"]["strong_cost_usd"] is not None]
+            actual = sum(i["cost_usd"] + (i["route"]["wasted_cost_usd"] or 0) for i in priced)
+            if_strong = sum(i["route"]["strong_cost_usd"] for i in priced)
+            routing = {
+                "phases": phases,
+                "escalations": sum(1 for i in routed if i["route"]["escalated"]),
+                "cost_if_strong_usd": round(if_strong, 6) if priced else None,
+                "savings_usd": round(if_strong - actual, 6) if priced else None,
+            }
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))] if latencies else None
+
+        return {
+            "event": "task_summary",
+            "task_id": self.task_id,
+            "task": self.task,
+            "status": status,
+            "iterations": len(self.iterations),
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "model_calls": len(latencies),
+            "model_s": round(sum(latencies), 3),
+            "model_p50_s": pct(50),
+            "model_p95_s": pct(95),
+            "avg_ttft_s": round(sum(ttfts) / len(ttfts), 4) if ttfts else None,
+            "prompt_tokens": sum(i["prompt_tokens"] for i in self.iterations),
+            "cached_tokens": sum(i["cached_tokens"] for i in self.iterations),
+            "completion_tokens": sum(i["completion_tokens"] for i in self.iterations),
+            "cost_usd": round(sum(costs), 6) if costs else None,
+            "tool_s": round(sum(t["seconds"] for t in tools.values()), 3),
+            "tools": tools,
+            "routing": routing,
+            "read_cache": self.read_cache,
+            "tool_memo": self.tool_memo,
+        }
+
+    def finish(self, status: str) -> Dict[str, Any]:
+        """Close the task and emit its summary event."""
+        summary = self.summary(status)
+        self._emit(summary)
+        return summary
+
+
+def render_summary_table(console: Console, telemetry: TaskTelemetry, summary: Dict[str, Any]):
+    """Print a task's per-iteration metrics and tool time as Rich tables."""
+    def fmt(value, spec="{:.2f}", suffix=""):
+        return "—" if value is None else spec.format(value) + suffix
+
+    table = Table(title="Model calls", show_header=True, header_style="bold magenta")
+    table.add_column("Iter", justify="right", style="dim")
+    table.add_column("Model", style="cyan")
+    table.add_column("Latency", justify="right")
+    table.add_column("TTFT", justify="right")
+    table.add_column("Input", justify="right")
+    table.add_column("Cached", justify="right")
+    table.add_column("Output", justify="right")
+    table.add_column("Cost", justify="right")
+    table.add_column("Tools", justify="right")
+
+    for iteration in telemetry.iterations:
+        table.add_row(
+            str(iteration["iteration"]),
+            iteration["model"] or "—",
+            fmt(iteration["model_latency_s"], suffix="s"),
+            fmt(iteration["ttft_s"], suffix="s"),
+            str(iteration["prompt_tokens"]),
+            str(iteration["cached_tokens"]),
+            str(iteration["completion_tokens"]),
+            fmt(iteration["cost_usd"], "${:.4f}"),
+            fmt(iteration["tool_seconds"], suffix="s"),
+        )
+    table.add_section()
+    table.add_row(
+        "Σ", "",
+        fmt(summary["model_s"], suffix="s"),
+        fmt(summary["avg_ttft_s"], suffix="s"),
+        str(summary["prompt_tokens"]),
+        str(summary["cached_tokens"]),
+        str(summary["completion_tokens"]),
+        fmt(summary["cost_usd"], "${:.4f}"),
+        fmt(summary["tool_s"], suffix="s"),
+        style="bold",
+    )
+    console.print(table)
+
+    if summary["tools"]:
+        tools_table = Table(title="Tool time", show_header=True, header_style="bold magenta")
+        tools_table.add_column("Tool", style="cyan")
+        tools_table.add_column("Calls", justify="right")
+        tools_table.add_column("Errors", justify="right")
+        tools_table.add_column("Total", justify="right")
+        tools_table.add_column("Avg", justify="right")
+        for name, stats in sorted(summary["tools"].items(), key=lambda kv: -kv[1]["seconds"]):
+            tools_table.add_row(
+                name,
+                str(stats["calls"]),
+                str(stats["errors"]),
+                f"{stats['seconds']:.3f}s",
+                f"{stats['seconds'] / stats['calls']:.3f}s",
+            )
+        console.print(tools_table)
@@ -0,0 +1,113 @@
+"""
+Tool Call Memo for CodeAgent
+============================
+Models often repeat an identical read (get_files_info('.'), the same
+get_file_content) within one task. ToolMemo remembers each read-only call
+by (tool, canonical args, file-state version); a repeat whose inputs are
+unchanged is not executed, and instead of the full payload the history
+gets a short reference to the earlier result, saving tool time and
+prompt tokens on every later iteration.
+
+File-state versions come from stat() (mtime_ns + size, or a directory's
+entries), so any write, whether by the agent, a script it ran or the
+user, invalidates the memo for that input.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from codeagent.session_store import tool_call_key
+
+# Results this short are repeated verbatim; a reference would be no shorter
+MIN_REFERENCE_CHARS = 160
+
+
+def _file_version(working_directory: str, args: Dict[str, Any]) -> Optional[Tuple]:
+    try:
+        st = os.stat(os.path.join(working_directory, args.get("file_path", "")))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _listing_version(working_directory: str, args: Dict[str, Any]) -> Optional[Tuple]:
+    try:
+        with os.scandir(os.path.join(working_directory, args.get("directory", "."))) as entries:
+            return tuple(sorted(
+                (entry.name, entry.is_dir(), entry.stat().st_size) for entry in entries
+            ))
+    except OSError:
+        return None
+
+
+def _immutable_version(working_directory: str, args: Dict[str, Any]) -> Optional[Tuple]:
+    # Blob handles are content-addressed
+    return ()
+
+
+# Tools safe to answer from the memo, and how to version their inputs
+MEMO_TOOLS: Dict[str, Callable[[str, Dict[str, Any]], Optional[Tuple]]] = {
+    "get_file_content": _file_version,
+    "get_files_info": _listing_version,
+    "read_tool_output": _immutable_version,
+}
+
+
+class ToolMemo:
+    """Per-task memo of read-only tool results, keyed on input versions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # call key -> (version, turn, result chars, tool seconds, short result)
+        self._entries: Dict[str, Tuple[Tuple, int, int, float, Optional[str]]] = {}
+        # Current agent-loop iteration, set by process_request
+        self.turn = 0
+        self.hits = 0
+        self.chars_saved = 0
+        self.seconds_saved = 0.0
+
+    def lookup(self, name: str, args: Dict[str, Any], working_directory: str) -> Optional[str]:
+        """Stand-in for an earlier identical result whose inputs are unchanged, else None."""
+        versioner = MEMO_TOOLS.get(name)
+        if versioner is None:
+            return None
+        key = tool_call_key(name, args)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version = versioner(working_directory, args)
+        if version != entry[0]:
+            return None
+
+        reference = entry[4] if entry[4] is not None else (
+            f"[Unchanged: identical to the {name} result returned at iteration {entry[1]}; "
+            f"the input has not changed since]"
+        )
+        with self._lock:
+            self.hits += 1
+            self.chars_saved += max(0, entry[2] - len(reference))
+            self.seconds_saved += entry[3]
+        return reference
+
+    def version(self, name: str, args: Dict[str, Any], working_directory: str) -> Optional[Tuple]:
+        """Input version for a memoizable call; taken before the call runs."""
+        versioner = MEMO_TOOLS.get(name)
+        return versioner(working_directory, args) if versioner else None
+
+    def record(self, name: str, args: Dict[str, Any], version: Optional[Tuple], result: Any, seconds: float):
+        """Remember a freshly executed call (errors are not remembered)."""
+        if version is None or not isinstance(result, str) or result.startswith("Error"):
+            return
+        with self._lock:
+            short = result if len(result) <= MIN_REFERENCE_CHARS else None
+            self._entries[tool_call_key(name, args)] = (version, self.turn, len(result), seconds, short)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "chars_saved": self.chars_saved,
+                "seconds_saved": round(self.seconds_saved, 4),
+            }
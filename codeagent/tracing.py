@@ -0,0 +1,260 @@
+"""
+Tracing for CodeAgent
+=====================
+A lightweight span tracer and an optional sampling profiler for finding
+where a task's wall time goes (model calls, tool dispatch, MCP round trips,
+message conversion, console rendering).
+
+Spans are recorded as Chrome trace events and exported as JSON that loads
+in chrome://tracing or https://ui.perfetto.dev. When tracing is off,
+``span()`` is a shared no-op context manager, so instrumented code pays
+almost nothing.
+
+The sampling profiler snapshots every thread's stack at a fixed interval
+via ``sys._current_frames()`` and adds the samples to the same trace.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from codeagent.config import PROFILE_INTERVAL_MS
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+# =============================================================================
+# SPAN TRACER
+# =============================================================================
+
+class Tracer:
+    """Collects complete ("X") trace events from any thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self.pid = os.getpid()
+
+    def start(self):
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop all recorded events."""
+        with self._lock:
+            self.events.clear()
+
+    @contextlib.contextmanager
+    def _span(self, name: str, category: str, args: Dict[str, Any]):
+        started = _now_us()
+        try:
+            yield
+        finally:
+            ended = _now_us()
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": started,
+                "dur": ended - started,
+                "pid": self.pid,
+                "tid": thread.ident,
+            }
+            if args:
+                event["args"] = {k: v if isinstance(v, (int, float, bool)) or v is None else str(v)
+                                 for k, v in args.items()}
+            with self._lock:
+                self._threads.setdefault(thread.ident, thread.name)
+                self.events.append(event)
+
+    def span(self, name: str, category: str = "agent", **args):
+        """Context manager timing a block; a no-op while tracing is off."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    def instant(self, name: str, category: str = "agent", **args):
+        """Record a point-in-time event (e.g. a retry)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self.events.append({
+                "name": name, "cat": category, "ph": "i", "s": "t",
+                "ts": _now_us(), "pid": self.pid, "tid": thread.ident,
+                "args": {k: str(v) for k, v in args.items()},
+            })
+
+    def metadata_events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            threads = dict(self._threads)
+        events = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "gent"}}]
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}})
+        return events
+
+
+# =============================================================================
+# SAMPLING PROFILER
+# =============================================================================
+
+class SamplingProfiler:
+    """Samples the stacks of all threads on a background thread."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000.0, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: List[Tuple[float, int, Tuple[Tuple[str, str, int], ...]]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gent-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            ts = _now_us()
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, frame.f_lineno))
+                    frame = frame.f_back
+                self.samples.append((ts, tid, tuple(reversed(stack))))
+
+    def trace_data(self, pid: int) -> Dict[str, Any]:
+        """Samples as Chrome "stackFrames" + "samples" sections."""
+        frames: Dict[Tuple, int] = {}
+        stack_frames: Dict[str, Dict[str, Any]] = {}
+        samples = []
+
+        for ts, tid, stack in self.samples:
+            parent = None
+            path: Tuple = ()
+            for name, filename, _ in stack:
+                path = path + ((name, filename),)
+                frame_id = frames.get(path)
+                if frame_id is None:
+                    frame_id = frames[path] = len(frames) + 1
+                    entry = {"name": f"{name} ({os.path.basename(filename)})", "category": "python"}
+                    if parent is not None:
+                        entry["parent"] = str(parent)
+                    stack_frames[str(frame_id)] = entry
+                parent = frame_id
+            if parent is not None:
+                samples.append({"cpu": 0, "tid": tid, "pid": pid, "ts": ts, "name": "sample",
+                                "sf": str(parent), "weight": 1})
+        return {"stackFrames": stack_frames, "samples": samples}
+
+    def top_functions(self, limit: int = 15) -> List[Tuple[str, int]]:
+        """Functions most often at the top of a sampled stack (self time)."""
+        counts = Counter(
+            f"{stack[-1][0]} ({os.path.basename(stack[-1][1])}:{stack[-1][2]})"
+            for _, _, stack in self.samples if stack
+        )
+        return counts.most_common(limit)
+
+
+# =============================================================================
+# MODULE API
+# =============================================================================
+
+_tracer = Tracer()
+_profiler: Optional[SamplingProfiler] = None
+
+
+def span(name: str, category: str = "agent", **args):
+    """Time a block as a trace span (no-op unless tracing is enabled)."""
+    return _tracer.span(name, category, **args)
+
+
+def instant(name: str, category: str = "agent", **args):
+    """Record an instant trace event (no-op unless tracing is enabled)."""
+    _tracer.instant(name, category, **args)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def start_tracing(profile: bool = False):
+    """Enable span recording, and the sampling profiler if requested."""
+    global _profiler
+    _tracer.start()
+    if profile and _profiler is None:
+        _profiler = SamplingProfiler()
+        _profiler.start()
+
+
+def tracing_enabled() -> bool:
+    return _tracer.enabled
+
+
+def export_chrome_trace(path: str) -> Dict[str, Any]:
+    """Stop tracing and write everything recorded to a Chrome trace JSON file."""
+    global _profiler
+    _tracer.stop()
+    if _profiler is not None:
+        _profiler.stop()
+
+    with _tracer._lock:
+        events = list(_tracer.events)
+    trace: Dict[str, Any] = {
+        "traceEvents": _tracer.metadata_events() + events,
+        "displayTimeUnit": "ms",
+    }
+    if _profiler is not None:
+        trace.update(_profiler.trace_data(_tracer.pid))
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+    return trace
+
+
+def get_profiler() -> Optional[SamplingProfiler]:
+    return _profiler
+
+
+def trace_summary(limit: int = 10) -> List[Tuple[str, int, float]]:
+    """(span name, count, total ms) for the spans with the most total time."""
+    totals: Dict[str, List[float]] = {}
+    with _tracer._lock:
+        for event in _tracer.events:
+            if event.get("ph") == "X":
+                entry = totals.setdefault(event["name"], [0, 0.0])
+                entry[0] += 1
+                entry[1] += event["dur"] / 1000.0
+    ranked = sorted(totals.items(), key=lambda kv: -kv[1][1])[:limit]
+    return [(name, int(count), round(ms, 2)) for name, (count, ms) in ranked]
+
@@ -0,0 +1,28 @@
+"""Shared fixtures: a throwaway project directory and an agent that prints nowhere."""
+
+import io
+
+import pytest
+from rich.console import Console
+
+from codeagent import main as agent
+from codeagent import session_store
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Working directory with one source file; session logs go under tmp_path."""
+    monkeypatch.setattr(session_store, "SESSIONS_DIR", str(tmp_path / "sessions"))
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "app.py").write_text("print('v1')\n", encoding="utf-8")
+    return str(root)
+
+
+@pytest.fixture
+def quiet_agent(monkeypatch):
+    """codeagent.main with output rendered off-screen and model stats off."""
+    monkeypatch.setattr(agent, "console", Console(file=io.StringIO(), width=120))
+    monkeypatch.setattr(agent, "MODEL_STATS_ENABLED", False)
+    monkeypatch.setattr(agent, "SESSIONS_ENABLED", False)
+    return agent
@@ -0,0 +1,107 @@
+"""Minimal OpenAI-compatible server for offline tests and cassette recording."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class FakeOpenAIServer:
+    """
+    Minimal /chat/completions server that replays a script of responses.
+
+    Each script entry is a dict with optional "status", "headers", "delay",
+    "content", "tool_calls" (a list of {"name", "arguments"}) and "usage"
+    keys; requests consume entries in order (the last entry repeats).
+    ``model_delays`` adds per-model latency for hedging tests.
+    """
+
+    def __init__(self, script: List[Dict[str, Any]], model_delays: Optional[Dict[str, float]] = None):
+        self.script = list(script)
+        self.model_delays = model_delays or {}
+        self.requests: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _next_entry(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.requests.append(body)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.script.pop(0) if len(self.script) > 1 else self.script[0]
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                entry = server._next_entry(body)
+                try:
+                    time.sleep(entry.get("delay", 0) + server.model_delays.get(body.get("model"), 0))
+                finally:
+                    server._finished()
+
+                status = entry.get("status", 200)
+                if status == 200:
+                    message = {"role": "assistant", "content": entry.get("content", f"ok from {body.get('model')}")}
+                    if entry.get("tool_calls"):
+                        message["content"] = entry.get("content")
+                        message["tool_calls"] = [
+                            {
+                                "id": f"call_fake_{len(server.requests)}_{i}",
+                                "type": "function",
+                                "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+                            }
+                            for i, call in enumerate(entry["tool_calls"])
+                        ]
+                    payload = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "tool_calls" if entry.get("tool_calls") else "stop",
+                            "message": message,
+                        }],
+                        "usage": entry.get("usage", {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}),
+                    }
+                else:
+                    payload = {"error": {"message": f"fake error {status}", "code": status}}
+
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in entry.get("headers", {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,47 @@
+"""Early-started MCP calls keep the model's call order (no MCP SDK needed)."""
+
+import asyncio
+from types import SimpleNamespace
+
+from codeagent.mcp_integration import GentMCPIntegration, MCPServerConfig, TransportType
+
+
+def part(name, call_id):
+    return SimpleNamespace(function_call=SimpleNamespace(name=name, args={"id": call_id}))
+
+
+def test_only_leading_idempotent_calls_start_early(project, quiet_agent, monkeypatch):
+    events = []
+
+    async def call_tool(tool_name, arguments, server_name=None):
+        events.append(("start", arguments["id"]))
+        await asyncio.sleep(0.05)
+        events.append(("end", arguments["id"]))
+        return tool_name
+
+    integration = GentMCPIntegration()
+    integration.manager.call_tool = call_tool
+    for server_name, idempotent in (("docs", ["*"]), ("browser", None)):
+        integration.manager.configs[server_name] = MCPServerConfig(
+            name=server_name, transport=TransportType.STDIO, idempotent_tools=idempotent
+        )
+    integration.manager.tools = {
+        "docs": [{"name": "search", "server": "docs"}],
+        "browser": [{"name": "navigate", "server": "browser"}, {"name": "click", "server": "browser"}],
+    }
+    monkeypatch.setattr(quiet_agent, "mcp_integration", integration)
+
+    # Behind a native call nothing starts early: it may write what the MCP call reads
+    native_first = [part("write_file", 0), part("mcp_docs_search", 1), part("mcp_docs_search", 2)]
+    assert quiet_agent.start_mcp_calls(native_first) == {}
+
+    parts = [part("mcp_docs_search", 1), part("mcp_docs_search", 2), part("mcp_browser_navigate", 3),
+             part("mcp_browser_click", 4), part("mcp_docs_search", 5)]
+    pending = quiet_agent.start_mcp_calls(parts)
+    assert sorted(pending) == [0, 1]
+    for index, function_call_part in enumerate(parts):
+        quiet_agent.call_function(function_call_part.function_call, project, pending=pending.get(index))
+
+    # The leading lookups overlap; everything from navigate on runs one at a time, in order
+    assert sorted(events[:2]) == [("start", 1), ("start", 2)]
+    assert events[4:] == [("start", 3), ("end", 3), ("start", 4), ("end", 4), ("start", 5), ("end", 5)]
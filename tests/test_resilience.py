@@ -0,0 +1,57 @@
+"""Retries, hedging and async concurrency limits (codeagent/resilience.py) against a fake server."""
+
+import asyncio
+import time
+
+from codeagent.model_provider import AsyncOpenRouterProvider, MockContent, MockPart, OpenRouterProvider
+from codeagent.resilience import RetryPolicy
+from tests.fake_openai import FakeOpenAIServer
+
+MESSAGES = [MockContent(role="user", parts=[MockPart(text="hello")])]
+
+
+def test_retries_rate_limit_and_server_error():
+    # 429 with Retry-After, then a 503, then success
+    script = [
+        {"status": 429, "headers": {"Retry-After": "0.2"}},
+        {"status": 503},
+        {"content": "recovered"},
+    ]
+    with FakeOpenAIServer(script) as server:
+        provider = OpenRouterProvider("test-key", "primary", base_url=server.url)
+        provider.retry_policy = RetryPolicy(max_retries=3, base_delay=0.05, max_delay=1.0)
+        response = provider.generate_content(MESSAGES)
+    assert response.text == "recovered"
+    assert len(server.requests) == 3
+
+
+def test_hedge_to_fallback_wins_when_primary_turns_slow():
+    with FakeOpenAIServer([{}]) as server:
+        provider = OpenRouterProvider("test-key", "primary", base_url=server.url, fallback_model_id="fallback")
+        provider.hedger.min_samples = 3
+        for _ in range(3):
+            provider.generate_content(MESSAGES)
+        server.model_delays["primary"] = 1.0
+        started = time.perf_counter()
+        response = provider.generate_content(MESSAGES)
+        elapsed = time.perf_counter() - started
+        # Let the abandoned primary finish before the server goes away
+        provider.hedger._executor.shutdown(wait=True)
+    assert response.text == "ok from fallback"
+    assert elapsed < 1.0
+
+
+def test_async_provider_bounds_requests_in_flight():
+    from codeagent.http_transport import aclose_http_clients
+
+    async def run():
+        with FakeOpenAIServer([{"delay": 0.2}]) as server:
+            provider = AsyncOpenRouterProvider("test-key", "primary", base_url=server.url, max_concurrency=3)
+            responses = await asyncio.gather(*(provider.generate_content(MESSAGES) for _ in range(10)))
+            await aclose_http_clients()
+        return server, provider, responses
+
+    server, provider, responses = asyncio.run(run())
+    assert len(responses) == 10
+    assert server.max_in_flight <= 3
+    assert provider.rate_limiter.summary()["primary"]["requests"] == 10
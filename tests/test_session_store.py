@@ -0,0 +1,96 @@
+"""Crash-safe session logs and --resume (codeagent/session_store.py)."""
+
+import os
+
+from codeagent.model_provider import MockContent, MockFunctionCall, MockPart, OpenRouterProvider
+from tests.fake_openai import FakeOpenAIServer
+from codeagent.session_store import SessionStore
+
+
+def read_call(file_path="app.py"):
+    return MockPart(function_call=MockFunctionCall("get_file_content", {"file_path": file_path}, "call_1"))
+
+
+def crash_mid_turn(project):
+    """A session whose log ends in a torn tool-result line, as after a crash mid-write."""
+    store = SessionStore.create(project, "show app.py")
+    messages = [
+        MockContent(role="user", parts=[MockPart(text="show app.py")]),
+        MockContent(role="model", parts=[read_call()]),
+    ]
+    store.sync(messages)
+    response = MockPart.from_function_response("get_file_content", {"result": "print('v1')\n"})
+    messages.append(MockContent(role="tool", parts=[response]))
+    store.sync(messages)
+    store.close()
+
+    size = os.path.getsize(store.path)
+    with open(store.path, "r+b") as f:
+        f.truncate(size - 10)
+    return store.session_id
+
+
+def test_torn_last_line_is_dropped_on_resume(project):
+    session_id = crash_mid_turn(project)
+
+    store = SessionStore.open(project, session_id)
+    assert [m.role for m in store.messages] == ["user", "model"]
+    # The model asked for a read whose result never made it to disk
+    pending = store.pending_function_calls()
+    assert [p.function_call.name for p in pending] == ["get_file_content"]
+    assert pending[0].function_call.args == {"file_path": "app.py"}
+
+    # Appending after the torn line starts a fresh line, so the log stays readable
+    store.sync(store.messages + [MockContent(role="user", parts=[MockPart(text="continue")])])
+    store.close()
+    assert [m.role for m in SessionStore.open(project, session_id).messages] == ["user", "model", "user"]
+
+
+def test_resume_finishes_pending_calls_and_continues(project, quiet_agent):
+    session_id = crash_mid_turn(project)
+    store = SessionStore.open(project, "latest")
+    assert store.session_id == session_id
+
+    with FakeOpenAIServer([{"content": "app.py prints v1."}]) as server:
+        provider = OpenRouterProvider("test-key", "scripted/model", base_url=server.url)
+        result = quiet_agent.process_request(provider, None, project, session=store)
+
+    assert result["status"] == "completed"
+    assert result["final_text"] == "app.py prints v1."
+    # The interrupted read was re-run before the model was asked again
+    messages = server.requests[0]["messages"]
+    tool_messages = [m for m in messages if m["role"] == "tool"]
+    assert len(tool_messages) == 1 and "print('v1')" in str(tool_messages[0]["content"])
+
+    resumed = SessionStore.open(project, session_id)
+    assert [m.role for m in resumed.messages] == ["user", "model", "tool", "model"]
+    assert resumed.pending_function_calls() == []
+
+
+def test_logged_read_reused_until_file_changes(project, quiet_agent, monkeypatch):
+    store = SessionStore.create(project, "read app.py")
+    calls = []
+    read = quiet_agent.FUNCTION_MAP["get_file_content"]
+
+    def counting_read(**kwargs):
+        calls.append(kwargs["file_path"])
+        return read(**kwargs)
+
+    monkeypatch.setitem(quiet_agent.FUNCTION_MAP, "get_file_content", counting_read)
+    quiet_agent.call_function(read_call().function_call, project, session=store)
+    store.close()
+    assert calls == ["app.py"]
+
+    # Unchanged file hash: the resumed session answers from its log
+    resumed = SessionStore.open(project, store.session_id)
+    part = quiet_agent.call_function(read_call().function_call, project, session=resumed)
+    assert calls == ["app.py"]
+    assert "print('v1')" in part.function_response.response["result"]
+
+    # Modified file: the hash no longer matches and the read runs again
+    with open(os.path.join(project, "app.py"), "w", encoding="utf-8") as f:
+        f.write("print('v2')\n")
+    part = quiet_agent.call_function(read_call().function_call, project, session=resumed)
+    resumed.close()
+    assert calls == ["app.py", "app.py"]
+    assert "print('v2')" in part.function_response.response["result"]
@@ -0,0 +1,74 @@
+"""Repeated reads within a task (ToolMemo) and across a resume (session log)."""
+
+import os
+
+import pytest
+
+from codeagent.model_provider import MockFunctionCall
+from codeagent.session_store import SessionStore
+from codeagent.tool_memo import ToolMemo
+
+READ = MockFunctionCall("get_file_content", {"file_path": "app.py"}, "call_1")
+WRITE = MockFunctionCall("write_file", {"file_path": "app.py", "content": "print('v2')\n"}, "call_2")
+
+
+@pytest.fixture
+def reads(quiet_agent, monkeypatch):
+    """File paths passed to get_file_content, in call order."""
+    calls = []
+    read = quiet_agent.FUNCTION_MAP["get_file_content"]
+
+    def counting_read(**kwargs):
+        calls.append(kwargs["file_path"])
+        return read(**kwargs)
+
+    monkeypatch.setitem(quiet_agent.FUNCTION_MAP, "get_file_content", counting_read)
+    monkeypatch.setattr(quiet_agent, "quiet_mode", True)
+    return calls
+
+
+def test_live_task_dedupes_through_the_memo_only(project, quiet_agent, reads):
+    store = SessionStore.create(project, "read app.py")
+    memo = ToolMemo()
+
+    quiet_agent.call_function(READ, project, session=store, memo=memo)
+    part = quiet_agent.call_function(READ, project, session=store, memo=memo)
+    assert reads == ["app.py"]
+    assert part.function_response.response["result"] == "print('v1')\n"
+    assert memo.stats()["hits"] == 1
+
+    # Results logged by this task never answer a call; without the memo it re-runs
+    assert store.lookup_tool_call("get_file_content", READ.args, project) is None
+    quiet_agent.call_function(READ, project, session=store)
+    store.close()
+    assert reads == ["app.py", "app.py"]
+
+
+def test_write_between_identical_reads_forces_a_reread(project, quiet_agent, reads):
+    store = SessionStore.create(project, "edit app.py")
+    memo = ToolMemo()
+    quiet_agent.call_function(READ, project, session=store, memo=memo)
+    quiet_agent.call_function(WRITE, project, session=store, memo=memo)
+    part = quiet_agent.call_function(READ, project, session=store, memo=memo)
+    store.close()
+    assert reads == ["app.py", "app.py"]
+    assert "print('v2')" in part.function_response.response["result"]
+    assert memo.stats()["hits"] == 0
+
+    # Resumed: the log answers the first read, then the write invalidates it
+    with open(os.path.join(project, "app.py"), "w", encoding="utf-8") as f:
+        f.write("print('v1')\n")
+    store = SessionStore.create(project, "edit app.py")
+    quiet_agent.call_function(READ, project, session=store)
+    store.close()
+    del reads[:]
+
+    resumed = SessionStore.open(project, store.session_id)
+    memo = ToolMemo()
+    quiet_agent.call_function(READ, project, session=resumed, memo=memo)
+    assert reads == []
+    quiet_agent.call_function(WRITE, project, session=resumed, memo=memo)
+    part = quiet_agent.call_function(READ, project, session=resumed, memo=memo)
+    resumed.close()
+    assert reads == ["app.py"]
+    assert "print('v2')" in part.function_response.response["result"]